@@ -0,0 +1,76 @@
+-- ============================================
+-- 물품신청받기 앱 지출 통계 함수
+-- ============================================
+-- 관리자 📊 통계 화면에서 사용자별 / 월별 / 품목별 합계를 조회
+-- utils/database.py의 get_spend_by_user / get_spend_by_month / get_spend_by_item에서 .rpc()로 호출
+-- 집계는 DB에서 하고 그룹당 1행만 돌려주므로, 앱이 받는 데이터 크기는 품목 수가 아니라 그룹 수에 비례
+--
+-- p_from / p_to: 기간 (p_from 이상, p_to 미만, NULL이면 제한 없음)
+
+-- Step 1: 기간 조건용 인덱스 (submission_summary는 submitted_date 인덱스가 이미 있음)
+CREATE INDEX IF NOT EXISTS submitted_items_submitted_date_idx
+    ON submitted_items (submitted_date);
+
+-- Step 2: 사용자별 합계
+CREATE OR REPLACE FUNCTION spend_by_user(
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (username TEXT, batch_count BIGINT, item_count BIGINT, total_amount BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT s.username, COUNT(*), SUM(s.item_count), SUM(s.total_amount)
+    FROM submission_summary s
+    WHERE (p_from IS NULL OR s.submitted_date >= p_from)
+      AND (p_to IS NULL OR s.submitted_date < p_to)
+    GROUP BY s.username
+    ORDER BY 4 DESC, 1;
+$$;
+
+-- Step 3: 월별 합계 (한국 시간 기준 월, 'YYYY-MM')
+CREATE OR REPLACE FUNCTION spend_by_month(
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS TABLE (month TEXT, batch_count BIGINT, item_count BIGINT, total_amount BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT to_char(s.submitted_date AT TIME ZONE 'Asia/Seoul', 'YYYY-MM'),
+           COUNT(*), SUM(s.item_count), SUM(s.total_amount)
+    FROM submission_summary s
+    WHERE (p_from IS NULL OR s.submitted_date >= p_from)
+      AND (p_to IS NULL OR s.submitted_date < p_to)
+    GROUP BY 1
+    ORDER BY 1;
+$$;
+
+-- Step 4: 품목별 합계 (품목명 앞뒤 공백 무시, 금액 상위 p_limit개)
+CREATE OR REPLACE FUNCTION spend_by_item(
+    p_from TIMESTAMPTZ DEFAULT NULL,
+    p_to TIMESTAMPTZ DEFAULT NULL,
+    p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (item_name TEXT, request_count BIGINT, user_count BIGINT, quantity BIGINT, total_amount BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT btrim(i.item_name), COUNT(*), COUNT(DISTINCT i.username), SUM(i.quantity), SUM(i.total_price)
+    FROM submitted_items i
+    WHERE (p_from IS NULL OR i.submitted_date >= p_from)
+      AND (p_to IS NULL OR i.submitted_date < p_to)
+    GROUP BY 1
+    ORDER BY 5 DESC, 1
+    LIMIT p_limit;
+$$;
+
+-- Step 5: 서비스 역할만 호출 가능
+REVOKE ALL ON FUNCTION spend_by_user(TIMESTAMPTZ, TIMESTAMPTZ) FROM PUBLIC;
+REVOKE ALL ON FUNCTION spend_by_month(TIMESTAMPTZ, TIMESTAMPTZ) FROM PUBLIC;
+REVOKE ALL ON FUNCTION spend_by_item(TIMESTAMPTZ, TIMESTAMPTZ, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION spend_by_user(TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION spend_by_month(TIMESTAMPTZ, TIMESTAMPTZ) TO service_role;
+GRANT EXECUTE ON FUNCTION spend_by_item(TIMESTAMPTZ, TIMESTAMPTZ, INTEGER) TO service_role;
+
+-- ✅ 완료!
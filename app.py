@@ -1,18 +1,37 @@
 import streamlit as st
-import pandas as pd
-from datetime import datetime
-import io
-import zipfile
+import hashlib
+import os
+import uuid
 from utils.database import (
     login,
     logout,
     load_pending_cart,
     add_to_pending_cart,
-    remove_from_pending_cart,
+    add_many_to_pending_cart,
+    save_cart_changes,
+    search_item_catalog,
+    clear_pending_cart,
+    get_backend_health,
+    get_cart_outbox_status,
+    get_rejected_cart_changes,
+    retry_rejected_cart_changes,
+    discard_rejected_cart_changes,
     submit_cart,
     get_submission_history,
-    get_all_submission_history
+    get_submission_history_page,
+    get_spend_by_user,
+    get_spend_by_month,
+    get_spend_by_item,
+    search_submitted_items,
+    SEARCH_LIMIT,
+    fetch_concurrently,
+    concat_history
 )
+from utils.export import build_consolidation, build_consolidation_csv, build_selected_zip
+from utils.cart_import import EDITABLE_FIELDS, decode_upload, diff_cart_edits, parse_amount, parse_cart_lines
+from utils.metrics import metrics_snapshot, metrics_json, metrics_prometheus, reset_metrics
+from utils.profiler import section, is_profiling, profile_rerun
+from utils.warmup import is_warm_up_request, warm_up, start_background_warm_up
 
 st.set_page_config(
     page_title="헬스장 팀 업무",
@@ -20,164 +39,49 @@ st.set_page_config(
     layout="wide"
 )
 
-# Streamlit UI 요소 숨기기
-st.markdown("""
-    <style>
-        /* 상단 헤더 전체 숨김 */
-        header[data-testid="stHeader"] {
-            display: none !important;
-        }
-
-        /* 하단 푸터 숨김 */
-        footer {
-            display: none !important;
-        }
-
-        /* Streamlit 메뉴 버튼 숨김 */
-        #MainMenu {
-            display: none !important;
-        }
-
-        /* 하단 "Made with Streamlit" 숨김 */
-        footer:after {
-            display: none !important;
-        }
-
-        /* 상단 toolbar 전체 숨김 */
-        div[data-testid="stToolbar"] {
-            display: none !important;
-        }
-
-        /* 우측 상단 배포 버튼들 숨김 */
-        div[data-testid="stDecoration"] {
-            display: none !important;
-        }
-
-        /* Fork, GitHub 아이콘 등 숨김 */
-        .viewerBadge_container__1QSob {
-            display: none !important;
-        }
-
-        /* 우측 하단 아이콘들 숨김 */
-        .styles_viewerBadge__1yB5_ {
-            display: none !important;
-        }
-
-        /* 하단 우측 모든 배지 숨김 (Streamlit 아이콘, 왕관 등) */
-        div[data-testid="stStatusWidget"] {
-            display: none !important;
-        }
-
-        /* 모든 iframe 배지 숨김 */
-        iframe[title="streamlit_app"] {
-            display: none !important;
-        }
-
-        /* 우측 하단 고정 배지들 숨김 */
-        .stApp > footer,
-        .stApp > div > div > div > div > footer {
-            display: none !important;
-        }
-
-        /* Streamlit Community Cloud 배지 숨김 */
-        [data-testid="stCommunityCloudBadge"] {
-            display: none !important;
-        }
-
-        /* 추가 배지 타겟팅 */
-        button[kind="header"],
-        a[href*="streamlit.io"],
-        div[class*="viewerBadge"],
-        div[class*="StatusWidget"] {
-            display: none !important;
-        }
-
-        /* 우측 하단 고정 위치 요소 모두 숨김 (가장 강력한 방법) */
-        div[style*="position: fixed"][style*="bottom"],
-        div[style*="position: fixed"][style*="right"],
-        div[style*="position: fixed"][style*="bottom"][style*="right"] {
-            display: none !important;
-        }
-
-        /* z-index 높은 하단 요소들 숨김 */
-        div[style*="z-index"][style*="bottom"] {
-            display: none !important;
-        }
-
-        /* 모든 하단 우측 절대/고정 위치 요소 */
-        [style*="position: absolute; bottom"][style*="right"],
-        [style*="position: fixed; bottom"][style*="right"] {
-            display: none !important;
-        }
-
-        /* Streamlit의 동적 클래스명 모두 타겟 */
-        div[class*="viewerBadge"],
-        div[class*="ViewerBadge"],
-        div[class*="badge"],
-        div[class*="Badge"] {
-            display: none !important;
-            visibility: hidden !important;
-            opacity: 0 !important;
-        }
-    </style>
-
-    <script>
-        // JavaScript로 배지 요소 직접 제거 (가장 강력한 방법)
-        function removeBadges() {
-            // 모든 가능한 배지 셀렉터
-            const selectors = [
-                '[data-testid="stStatusWidget"]',
-                '[data-testid="stCommunityCloudBadge"]',
-                'div[class*="viewerBadge"]',
-                'div[class*="ViewerBadge"]',
-                'div[class*="badge"]',
-                'div[class*="Badge"]',
-                'a[href*="streamlit.io"]',
-                'button[kind="header"]'
-            ];
-
-            // 각 셀렉터로 찾아서 제거
-            selectors.forEach(selector => {
-                const elements = document.querySelectorAll(selector);
-                elements.forEach(el => {
-                    if (el) {
-                        el.remove();
-                    }
-                });
-            });
-
-            // 우측 하단 고정 위치 요소들 제거
-            const allDivs = document.querySelectorAll('div');
-            allDivs.forEach(div => {
-                const style = window.getComputedStyle(div);
-                if (style.position === 'fixed' || style.position === 'absolute') {
-                    const bottom = style.bottom;
-                    const right = style.right;
-                    // 우측 하단에 위치한 요소 제거
-                    if (bottom !== 'auto' && right !== 'auto' &&
-                        parseInt(bottom) < 100 && parseInt(right) < 100) {
-                        // 단, stApp이나 중요한 컨테이너는 제외
-                        if (!div.className.includes('stApp') &&
-                            !div.className.includes('main') &&
-                            div.offsetHeight < 200 && div.offsetWidth < 200) {
-                            div.remove();
-                        }
-                    }
-                }
-            });
-        }
+# 콜드 스타트 준비만 하는 접속 (?warmup=1&token=..., keep-alive 워크플로우용, 토큰은 secrets [warmup])
+if is_warm_up_request(st.query_params):
+    timings = warm_up()
+    st.text("\n".join(f"{name}: {seconds * 1000:.0f} ms" for name, seconds in timings.items()))
+    st.stop()
+
+# 전역 CSS/JS (static/app.css, static/app.js)
+# config.toml의 enableStaticServing으로 app/static/ 경로에 제공되며, 브라우저가 캐시함.
+# 세션의 첫 실행에서만 <head>에 <link>/<script>를 추가하고 이후 rerun에서는 다시 보내지 않음.
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
+def _static_version():
+    """정적 파일 내용 해시 (배포 후 브라우저 캐시 갱신용)"""
+    digest = hashlib.sha1()
+    for name in ("app.css", "app.js"):
+        with open(os.path.join(STATIC_DIR, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+STATIC_ASSETS_HTML = f"""
+<script>
+if (!document.getElementById('gym-app-css')) {{
+    const link = document.createElement('link');
+    link.id = 'gym-app-css';
+    link.rel = 'stylesheet';
+    link.href = 'app/static/app.css?v={_static_version()}';
+    document.head.appendChild(link);
+
+    const script = document.createElement('script');
+    script.src = 'app/static/app.js?v={_static_version()}';
+    document.head.appendChild(script);
+}}
+</script>
+"""
 
-        // 페이지 로드 시 실행
-        if (document.readyState === 'loading') {
-            document.addEventListener('DOMContentLoaded', removeBadges);
-        } else {
-            removeBadges();
-        }
+def load_static_assets():
+    """전역 CSS/JS를 세션당 1번만 불러오기"""
+    if st.session_state.get('static_assets_loaded'):
+        return
+    st.html(STATIC_ASSETS_HTML, unsafe_allow_javascript=True)
+    st.session_state.static_assets_loaded = True
 
-        // 500ms마다 계속 체크해서 제거 (배지가 동적으로 추가될 수 있음)
-        setInterval(removeBadges, 500);
-    </script>
-""", unsafe_allow_html=True)
+load_static_assets()
 
 # 세션 상태 초기화
 if 'logged_in' not in st.session_state:
@@ -188,11 +92,22 @@ if 'name' not in st.session_state:
     st.session_state.name = None
 
 def main():
+    # 관리자가 프로파일링 모드를 켜 두면 rerun마다 전체를 측정 (진단 화면에서 확인)
+    if st.session_state.get('profiling'):
+        label = st.session_state.get('main_view') or "📝 신청"
+        profile_rerun(show_app, label, st.session_state.setdefault('profiles', []))
+    else:
+        show_app()
+
+def show_app():
     # 로그인 체크
     if not st.session_state.logged_in:
-        show_login_page()
+        with section("로그인"):
+            show_login_page()
     else:
-        show_main_page()
+        # 페이지 너비: static/app.css의 .st-key-main_page
+        with st.container(key="main_page"):
+            show_main_page()
 
 def show_login_page():
     # 중앙 정렬을 위한 여백
@@ -204,24 +119,8 @@ def show_login_page():
     # 로그인 카드
     col1, col2, col3 = st.columns([2, 1, 2])
 
-    with col2:
-        st.markdown("""
-            <style>
-            .stTextInput > div > div > input {
-                background-color: white !important;
-                color: black !important;
-            }
-            .stButton > button {
-                background-color: #FF8C00 !important;
-                color: white !important;
-                border: none !important;
-            }
-            .stButton > button:hover {
-                background-color: #FF7F00 !important;
-            }
-            </style>
-        """, unsafe_allow_html=True)
-
+    # 스타일은 static/app.css의 .st-key-login_card
+    with col2.container(key="login_card"):
         st.markdown("<h3 style='text-align: center; margin-bottom: 30px; color: #333;'>로그인</h3>", unsafe_allow_html=True)
 
         with st.form("login_form"):
@@ -230,7 +129,7 @@ def show_login_page():
 
             st.markdown("<br>", unsafe_allow_html=True)
 
-            submitted = st.form_submit_button("로그인", use_container_width=True)
+            submitted = st.form_submit_button("로그인", width="stretch")
 
             if submitted:
                 result = login(username, password)
@@ -243,17 +142,6 @@ def show_login_page():
                     st.error(result['message'])
 
 def show_main_page():
-    # 페이지 너비 설정: 최대 1280px 또는 화면의 2/3
-    st.markdown("""
-        <style>
-        .main .block-container {
-            max-width: min(1280px, 66.67vw);
-            padding-left: 2rem;
-            padding-right: 2rem;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
     # 헤더
     st.title(f"소모품 신청")
     st.caption(f"안녕하세요, {st.session_state.name}님")
@@ -262,38 +150,57 @@ def show_main_page():
     admin_username = "차현석"
     is_admin = (st.session_state.username == admin_username)
 
-    # 탭 생성 (관리자는 3개, 일반 사용자는 2개)
-    if is_admin:
-        tab1, tab2, tab3 = st.tabs(["📝 신청", "📜 내역", "📋 전체내역"])
-    else:
-        tab1, tab2 = st.tabs(["📝 신청", "📜 내역"])
-
-    with tab1:
-        show_request_tab()
-
-    with tab2:
-        show_history_tab()
-
+    # 화면 목록 (관리자는 6개, 일반 사용자는 2개)
+    # st.tabs는 모든 탭 내용을 매번 실행하므로, 선택된 화면만 그리도록 직접 전환
+    views = {
+        "📝 신청": show_request_tab,
+        "📜 내역": show_history_tab,
+    }
     if is_admin:
-        with tab3:
-            show_all_history_tab()
+        views["📋 전체내역"] = show_all_history_tab
+        views["🔎 품목검색"] = show_item_search_tab
+        views["📊 통계"] = show_analytics_tab
+        views["🩺 진단"] = show_diagnostics_tab
+
+    selected_view = st.segmented_control(
+        "화면",
+        list(views),
+        default="📝 신청",
+        required=True,
+        key="main_view",
+        label_visibility="collapsed"
+    )
+
+    with section(selected_view or "📝 신청"):
+        views.get(selected_view, show_request_tab)()
 
 def show_request_tab():
-    # 버튼 색상 스타일
-    st.markdown("""
-        <style>
-        div[data-testid="stForm"] button[kind="primary"],
-        div.stButton > button[kind="primary"] {
-            background-color: #FF8C00 !important;
-            color: white !important;
-            border: none !important;
-        }
-        div[data-testid="stForm"] button[kind="primary"]:hover,
-        div.stButton > button[kind="primary"]:hover {
-            background-color: #FF7F00 !important;
-        }
-        </style>
-    """, unsafe_allow_html=True)
+    # 버튼 색상: static/app.css의 .st-key-request_tab
+    with st.container(key="request_tab"):
+        show_cart_section()
+
+@st.fragment
+def show_cart_section():
+    """입력 폼 + 장바구니 (이 영역만 다시 실행됨)"""
+    # 이전에 신청한 품목 찾기 (고르면 아래 입력 폼을 채움)
+    query = st.text_input(
+        "🔍 이전에 신청한 품목 찾기",
+        key="catalog_query",
+        placeholder="품목 이름이나 옵션 일부를 입력하고 Enter (예: 요가)"
+    )
+    if query.strip():
+        matches = search_item_catalog(query)
+        if matches:
+            for index, entry in enumerate(matches):
+                option = f" · {entry.option_name}" if entry.option_name else ""
+                st.button(
+                    f"{entry.item_name}{option} · {entry.unit_price:,}원 · {entry.count}회 신청",
+                    key=f"catalog_match_{index}",
+                    on_click=fill_item_form,
+                    args=(entry,)
+                )
+        else:
+            st.caption("일치하는 품목이 없습니다.")
 
     # 입력 폼
     with st.form("add_item_form", clear_on_submit=True):
@@ -302,21 +209,21 @@ def show_request_tab():
         col1, col2, col3, col4, col5 = st.columns(5)
 
         with col1:
-            item_name = st.text_input("이름", placeholder="예: 요가매트")
+            item_name = st.text_input("이름", key="form_item_name", placeholder="예: 요가매트")
 
         with col2:
-            purchase_link = st.text_input("링크", placeholder="https://...")
+            purchase_link = st.text_input("링크", key="form_purchase_link", placeholder="https://...")
 
         with col3:
-            option_name = st.text_input("옵션명(정확하게)", placeholder="예: 퍼플, 10mm")
+            option_name = st.text_input("옵션명(정확하게)", key="form_option_name", placeholder="예: 퍼플, 10mm")
 
         with col4:
-            quantity_text = st.text_input("총수량", placeholder="예: 5")
+            quantity_text = st.text_input("총수량", key="form_quantity", placeholder="예: 5")
 
         with col5:
-            unit_price_text = st.text_input("1개당 금액(배송비제외)", placeholder="예: 15,000")
+            unit_price_text = st.text_input("1개당 금액(배송비제외)", key="form_unit_price", placeholder="예: 15,000")
 
-        submitted = st.form_submit_button("➕ 담기", use_container_width=True)
+        submitted = st.form_submit_button("➕ 담기", width="stretch")
 
         if submitted:
             if not item_name or not purchase_link or not quantity_text or not unit_price_text:
@@ -324,8 +231,8 @@ def show_request_tab():
             else:
                 try:
                     # 콤마 제거 및 숫자 변환
-                    quantity = int(quantity_text.replace(',', '').strip())
-                    unit_price = int(unit_price_text.replace(',', '').strip())
+                    quantity = parse_amount(quantity_text)
+                    unit_price = parse_amount(unit_price_text)
                     total_price = quantity * unit_price
 
                     result = add_to_pending_cart(
@@ -338,293 +245,799 @@ def show_request_tab():
                         total_price
                     )
                     if result['success']:
+                        # 아래 장바구니는 같은 실행에서 새로 불러오므로 rerun 불필요
                         st.success("✅ 장바구니에 담았습니다!")
-                        st.rerun()
                     else:
                         st.error(result['message'])
                 except ValueError:
                     st.error("수량과 금액은 숫자만 입력해주세요.")
 
+    # 여러 품목 한 번에 담기 (시트 붙여넣기 / CSV)
+    with st.expander("📋 여러 품목 한 번에 담기 (엑셀 붙여넣기 / CSV)"):
+        show_bulk_add_form()
+
     st.markdown("---")
 
-    # 담긴 품목
+    # 신청 결과 메시지
+    submit_result = st.session_state.pop('submit_result', None)
+    if submit_result:
+        if submit_result['success']:
+            st.success("✅ 신청이 완료되었습니다!")
+        else:
+            st.error(submit_result['message'])
+
+    # 표 편집 저장 결과 메시지
+    edit_result = st.session_state.pop('cart_edit_result', None)
+    if edit_result:
+        if edit_result['success']:
+            st.success(f"✅ {edit_result['count']}개 행의 변경을 저장했습니다!")
+        else:
+            st.error(edit_result['message'])
+
+    # 담긴 품목 (표 하나로 그리고 칸에서 바로 수정)
     cart_items = load_pending_cart(st.session_state.username)
 
+    # 저장소가 거부해서 보류된 변경 (다시 시도하거나 버릴 때까지 계속 보내지 않음)
+    rejected_changes = get_rejected_cart_changes(st.session_state.username)
+    if rejected_changes:
+        show_rejected_cart_changes(rejected_changes, cart_items)
+
     if cart_items:
         st.markdown(f"### 담긴 품목 ({len(cart_items)}개)")
+        st.caption("칸을 눌러 바로 고칠 수 있습니다. 행 추가는 표 아래 ＋, 삭제는 행 왼쪽을 선택한 뒤 🗑️")
+
+        import pandas as pd
+
+        editor_key = cart_editor_key(cart_items)
+        edited = st.data_editor(
+            pd.DataFrame(cart_items, columns=EDITABLE_FIELDS + ['total_price']),
+            key=editor_key,
+            num_rows="dynamic",
+            hide_index=True,
+            width="stretch",
+            disabled=['total_price'],
+            column_config={
+                'item_name': st.column_config.TextColumn("이름", required=True),
+                'purchase_link': st.column_config.TextColumn("링크", required=True),
+                'option_name': st.column_config.TextColumn("옵션"),
+                'quantity': st.column_config.NumberColumn("수량", min_value=0, step=1, format="%d개", required=True),
+                'unit_price': st.column_config.NumberColumn("개당금액", min_value=0, step=1, format="%,d원", required=True),
+                'total_price': st.column_config.NumberColumn("총금액", format="%,d원"),
+            }
+        )
 
-        # 헤더
-        col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([0.5, 1.5, 1.5, 1, 0.8, 1, 1, 0.3])
-        with col1:
-            st.markdown("**No**")
-        with col2:
-            st.markdown("**이름**")
-        with col3:
-            st.markdown("**링크**")
-        with col4:
-            st.markdown("**옵션**")
-        with col5:
-            st.markdown("**수량**")
-        with col6:
-            st.markdown("**개당금액**")
-        with col7:
-            st.markdown("**총금액**")
-        with col8:
-            st.markdown("**삭제**")
-
-        st.markdown("---")
-
-        total_amount = 0
-
-        # 품목 행
-        for idx, item in enumerate(cart_items):
-            col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([0.5, 1.5, 1.5, 1, 0.8, 1, 1, 0.3])
+        # 편집 중이면 표에 보이는 값으로 다시 계산 (총금액 칸은 저장하면 바뀜)
+        edits = st.session_state[editor_key]
+        has_edits = bool(edits['edited_rows'] or edits['added_rows'] or edits['deleted_rows'])
+        quantities = pd.to_numeric(edited['quantity'], errors='coerce').fillna(0)
+        unit_prices = pd.to_numeric(edited['unit_price'], errors='coerce').fillna(0)
+        total_amount = int((quantities * unit_prices).sum())
 
+        if has_edits:
+            col1, col2 = st.columns([4, 1])
             with col1:
-                st.write(f"{idx + 1}")
+                st.warning("저장하지 않은 변경이 있습니다. 신청하기 전에 저장해주세요.")
             with col2:
-                st.write(item['item_name'])
-            with col3:
-                st.write(item['purchase_link'][:30] + "..." if len(item['purchase_link']) > 30 else item['purchase_link'])
-            with col4:
-                st.write(item['option_name'] if item['option_name'] else "-")
-            with col5:
-                st.write(f"{item['quantity']}개")
-            with col6:
-                st.write(f"{item['unit_price']:,}원")
-            with col7:
-                st.write(f"{item['total_price']:,}원")
-            with col8:
-                if st.button("삭제", key=f"delete_{idx}", use_container_width=True):
-                    remove_from_pending_cart(st.session_state.username, idx)
-                    st.rerun()
-
-            total_amount += item['total_price']
-
-            # 행 구분선
-            st.markdown("---")
+                st.button(
+                    "💾 변경 저장",
+                    type="primary",
+                    width="stretch",
+                    on_click=save_cart_edits,
+                    args=(cart_items, editor_key)
+                )
 
         col1, col2, col3, col4 = st.columns([2, 2, 1, 1])
 
         with col1:
-            st.markdown(f"**총 품목 수:** {len(cart_items)}개")
+            st.markdown(f"**총 품목 수:** {len(edited)}개")
 
         with col2:
             st.markdown(f"**총 금액:** {total_amount:,}원")
 
         with col3:
-            if st.button("전체 삭제", use_container_width=True):
-                for i in range(len(cart_items)):
-                    remove_from_pending_cart(st.session_state.username, 0)
-                st.rerun()
+            # 화면에 보이는 항목만 한 번에 삭제
+            st.button(
+                "전체 삭제",
+                width="stretch",
+                on_click=clear_pending_cart,
+                args=(st.session_state.username, cart_items)
+            )
 
         with col4:
-            if st.button("신청하기", type="primary", use_container_width=True):
-                with st.spinner("신청 처리 중..."):
-                    result = submit_cart(st.session_state.username, cart_items)
-                    if result['success']:
-                        # 캐시 클리어 (전체내역이 즉시 업데이트되도록)
-                        get_submission_history.clear()
-                        get_all_submission_history.clear()
-                        st.success("✅ 신청이 완료되었습니다!")
-                        st.rerun()
-                    else:
-                        st.error(result['message'])
+            # 같은 장바구니의 중복 제출(더블클릭 등) 방지용 키 (장바구니 내용이 바뀔 때만 새로 만듦)
+            # 버튼을 그릴 때의 키를 인자로 넘기므로, 먼저 눌린 클릭과 나중 클릭이 같은 키로 제출됨
+            content = cart_content_hash(cart_items)
+            submit_key = st.session_state.get('submit_key')
+            if submit_key is None or submit_key[0] != content:
+                submit_key = st.session_state.submit_key = (content, str(uuid.uuid4()))
+
+            st.button(
+                "신청하기",
+                type="primary",
+                width="stretch",
+                disabled=has_edits,
+                on_click=submit_cart_items,
+                args=(cart_items, submit_key[1])
+            )
     else:
         st.info("추가된 품목이 없습니다. 위에서 품목을 추가해주세요.")
 
+def show_rejected_cart_changes(changes, cart_items):
+    """보류된 장바구니 변경: 내용과 오류를 보여주고 다시 시도 / 버리기"""
+    # 삭제 변경은 품목 내용이 없으므로 장바구니에 남아 있는 항목에서 이름을 찾음
+    names = {}
+    for item in cart_items:
+        names[item.get('client_id') or item['id']] = item['item_name']
+
+    st.warning(
+        f"저장하지 못한 장바구니 변경이 {len(changes)}건 있습니다. "
+        "내용을 확인하고 다시 시도하거나 버려주세요. (담기/수정은 장바구니에 보이지 않습니다)"
+    )
+    st.dataframe(
+        [
+            {
+                '변경': '담기/수정' if change['op'] == 'add' else '삭제',
+                '품목': change['row']['item_name'] if change['row']
+                        else names.get(change['client_id'] or change['item_id'], ''),
+                '오류': change['last_error'],
+            }
+            for change in changes
+        ],
+        hide_index=True,
+        width="stretch"
+    )
+
+    seqs = [change['seq'] for change in changes]
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button(
+            "🔁 다시 시도",
+            key="retry_rejected_cart",
+            width="stretch",
+            on_click=retry_rejected_cart_changes,
+            args=(st.session_state.username, seqs)
+        )
+    with col2:
+        st.button(
+            "🗑️ 버리기",
+            key="discard_rejected_cart",
+            width="stretch",
+            on_click=discard_rejected_cart_changes,
+            args=(st.session_state.username, seqs)
+        )
+
+def fill_item_form(entry):
+    """품목 찾기 결과 선택: 입력 폼에 이름/링크/옵션/최근 단가를 채우고 검색어 지우기"""
+    st.session_state.form_item_name = entry.item_name
+    st.session_state.form_purchase_link = entry.purchase_link
+    st.session_state.form_option_name = entry.option_name
+    st.session_state.form_unit_price = f"{entry.unit_price:,}"
+    st.session_state.catalog_query = ""
+
+def show_bulk_add_form():
+    """붙여넣은 행 / CSV 파일을 한 번에 검사하고, 올바른 행을 한 번에 담음"""
+    st.caption("열 순서: 이름, 링크, 옵션명, 총수량, 1개당 금액 (첫 줄이 제목이면 제목으로 열을 찾습니다)")
+
+    with st.form("bulk_add_form", clear_on_submit=True):
+        pasted = st.text_area(
+            "엑셀/구글 시트에서 복사한 행",
+            height=150,
+            placeholder="요가매트\thttps://...\t퍼플, 10mm\t5\t15,000"
+        )
+        uploaded = st.file_uploader("또는 CSV 파일", type=["csv"])
+        submitted = st.form_submit_button("➕ 모두 담기", width="stretch")
+
+    if not submitted:
+        return
+
+    # 붙여넣기와 CSV는 제목 줄 / 줄 번호가 따로이므로 각각 검사
+    sources = []
+    if pasted.strip():
+        sources.append(("붙여넣기", pasted))
+    if uploaded is not None:
+        try:
+            sources.append((uploaded.name, decode_upload(uploaded.getvalue())))
+        except UnicodeDecodeError:
+            st.error("CSV 파일을 읽을 수 없습니다. UTF-8 또는 엑셀 CSV 형식으로 저장해주세요.")
+    if not sources:
+        st.error("붙여넣을 행이나 CSV 파일을 넣어주세요.")
+        return
+
+    items, errors = [], []
+    for source, text in sources:
+        source_items, source_errors = parse_cart_lines(text)
+        items.extend(source_items)
+        errors.extend((source, line, message, row) for line, message, row in source_errors)
+
+    if items:
+        result = add_many_to_pending_cart(st.session_state.username, items)
+        if result['success']:
+            st.success(f"✅ {result['count']}개 품목을 장바구니에 담았습니다!")
+        else:
+            st.error(result['message'])
+
+    if errors:
+        # 잘못된 행은 담지 않음 → 원래 내용을 고쳐서 다시 붙여넣을 수 있게 표시
+        st.warning(f"{len(errors)}개 행은 담지 않았습니다. 아래 내용을 고쳐서 다시 붙여넣어 주세요.")
+        st.dataframe(
+            [{'파일': source, '줄': line, '오류': message, '내용': row} for source, line, message, row in errors],
+            hide_index=True,
+            width="stretch"
+        )
+
+def cart_content_hash(cart_items):
+    """장바구니 내용(항목 ID + 입력 값) 요약 문자열 (내용이 같으면 같은 값)"""
+    content = repr([
+        (item.get('client_id') or item['id'], *(item[field] for field in EDITABLE_FIELDS))
+        for item in cart_items
+    ])
+    return hashlib.md5(content.encode()).hexdigest()[:12]
+
+def cart_editor_key(cart_items):
+    """장바구니 표의 위젯 키 (장바구니 내용이 바뀌면 새 표로 다시 시작)
+
+    편집 상태는 행 번호 기준이므로, 저장 후나 다른 화면에서 장바구니가 바뀌면
+    이전 편집 상태를 새 내용에 적용하지 않도록 키를 바꿈.
+    """
+    version = st.session_state.get('cart_editor_version', 0)
+    return f"cart_editor_{cart_content_hash(cart_items)}_{version}"
+
+def save_cart_edits(cart_items, editor_key):
+    """변경 저장 버튼: 표 편집 내용 중 바뀐 행만 저장 후 결과를 세션에 저장 (다음 실행에서 표시)"""
+    added, updated, removed, errors = diff_cart_edits(cart_items, st.session_state[editor_key])
+    if errors:
+        # 하나라도 잘못되면 저장하지 않음 (표의 편집 내용은 그대로 남아 있어 고칠 수 있음)
+        st.session_state.cart_edit_result = {
+            'success': False,
+            'message': " / ".join(f"{row}번째 행: {message}" for row, message in errors)
+        }
+        return
+    if not (added or updated or removed):
+        # 값을 바꿨다가 되돌린 경우 등: 저장할 것이 없으므로 편집 상태만 비움
+        st.session_state.cart_editor_version = st.session_state.get('cart_editor_version', 0) + 1
+        return
+
+    st.session_state.cart_edit_result = save_cart_changes(
+        st.session_state.username, added=added, updated=updated, removed=removed
+    )
+
+def submit_cart_items(cart_items, submit_key):
+    """신청하기 버튼: 장바구니 제출 후 결과를 세션에 저장 (다음 실행에서 표시)
+
+    submit_key: 버튼을 그릴 때 정한 중복 제출 방지 키. 더블클릭으로 이전 화면의 버튼이
+    한 번 더 눌려도 같은 키라서 새 신청이 만들어지지 않음 (이미 성공한 키면 다시 보내지도 않음).
+    """
+    if st.session_state.get('submitted_key') == submit_key:
+        return
+    result = submit_cart(st.session_state.username, cart_items, submit_key)
+    if result['success']:
+        st.session_state.submitted_key = submit_key
+        st.session_state.pop('submit_key', None)
+    st.session_state.submit_result = result
+
+# 품목 표 표시 형식 (숫자는 그대로 두고 화면에서만 단위/콤마 표시)
+ITEM_COLUMN_CONFIG = {
+    'No': st.column_config.NumberColumn(format="%d"),
+    '수량': st.column_config.NumberColumn(format="%d개"),
+    '1개당 금액': st.column_config.NumberColumn(format="%,d원"),
+    '총금액': st.column_config.NumberColumn(format="%,d원")
+}
+
+def toggle_expanded(batch_id):
+    """신청 내역 펼침/접힘 전환"""
+    expanded = st.session_state.expanded_batches
+    if batch_id in expanded:
+        expanded.discard(batch_id)
+    else:
+        expanded.add(batch_id)
+
+@st.fragment
+def show_submission_accordion(batch_id, summary, items, key_prefix, title):
+    """신청 1건의 토글 버튼 + 품목 표 (클릭 시 이 항목만 다시 실행됨)"""
+    import pandas as pd
+
+    is_expanded = batch_id in st.session_state.expanded_batches
+
+    # 토글 버튼 (클릭 시 펼침/접힘)
+    st.button(
+        f"{'▼' if is_expanded else '▶'} {title}",
+        key=f"{key_prefix}_{batch_id}",
+        width="stretch",
+        on_click=toggle_expanded,
+        args=(batch_id,)
+    )
+
+    # 펼쳐진 항목만 내용 표시
+    if is_expanded:
+        # 해당 batch의 품목만 골라 표시용 DataFrame 생성
+        batch_items = items[items['batch_id'] == batch_id]
+        df = pd.DataFrame({
+            'No': range(1, len(batch_items) + 1),
+            '이름': batch_items['item_name'].to_numpy(),
+            '링크': batch_items['purchase_link'].to_numpy(),
+            '옵션': batch_items['option_name'].replace('', '-').to_numpy(),
+            '수량': batch_items['quantity'].to_numpy(),
+            '1개당 금액': batch_items['unit_price'].to_numpy(),
+            '총금액': batch_items['total_price'].to_numpy()
+        })
+        st.dataframe(df, width="stretch", hide_index=True, column_config=ITEM_COLUMN_CONFIG)
+
+        st.markdown("")  # 여백
+
+        # 품목 수와 총 금액
+        col1, col2, col3 = st.columns([2, 1, 1])
+        with col1:
+            st.write("")  # 빈 공간
+        with col2:
+            st.markdown(f"**품목 수:** {summary.item_count}개")
+        with col3:
+            st.markdown(f"**총 금액:** {summary.total_amount:,}원")
+
+        st.markdown("")  # 여백
+
 def show_history_tab():
     st.subheader("신청 내역")
 
     history = get_submission_history(st.session_state.username)
 
-    # Accordion 상태 초기화 (기본: 모두 닫힘)
-    if 'expanded_idx' not in st.session_state:
-        st.session_state.expanded_idx = None
-
-    if history:
-        for idx, submission in enumerate(history):
-            # 날짜 형식 변환: 2025-12-18T11:17:16.876878 → 2025년 12월 18일 오전 11시 17분
-            dt = datetime.fromisoformat(submission['submitted_date'].replace('Z', '+00:00'))
-            submit_date = dt.strftime("%Y년 %m월 %d일 %p %I시 %M분").replace('AM', '오전').replace('PM', '오후')
-
-            is_expanded = (idx == st.session_state.expanded_idx)
-
-            # 토글 버튼 (클릭 시 펼침/접힘)
-            if st.button(f"{'▼' if is_expanded else '▶'} {submit_date}", key=f"btn_{idx}", use_container_width=True):
-                # 이미 펼쳐진 항목을 다시 클릭하면 접기
-                st.session_state.expanded_idx = None if is_expanded else idx
-                st.rerun()
-
-            # 선택된 항목만 내용 표시
-            if is_expanded:
-                # DataFrame 생성
-                items_data = []
-                for item_idx, item in enumerate(submission['items'], 1):
-                    items_data.append({
-                        'No': str(item_idx),
-                        '이름': item['item_name'],
-                        '링크': item['purchase_link'],
-                        '옵션': item['option_name'] if item['option_name'] else '-',
-                        '수량': f"{item['quantity']}개",
-                        '1개당 금액': f"{item['unit_price']:,}원",
-                        '총금액': f"{item['total_price']:,}원"
-                    })
-
-                df = pd.DataFrame(items_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-
-                st.markdown("")  # 여백
-
-                # 품목 수와 총 금액
-                col1, col2, col3 = st.columns([2, 1, 1])
-                with col1:
-                    st.write("")  # 빈 공간
-                with col2:
-                    st.markdown(f"**품목 수:** {submission['item_count']}개")
-                with col3:
-                    st.markdown(f"**총 금액:** {submission['total_amount']:,}원")
-
-                st.markdown("")  # 여백
+    # Accordion 상태 초기화 (기본: 모두 닫힘, 펼친 batch_id 저장)
+    if 'expanded_batches' not in st.session_state:
+        st.session_state.expanded_batches = set()
+
+    if not history.summaries.empty:
+        for summary in history.summaries.itertuples():
+            show_submission_accordion(summary.Index, summary, history.items, "btn", summary.submit_date_label)
     else:
         st.info("아직 신청 내역이 없습니다.")
 
 def show_all_history_tab():
     st.subheader("전체 신청 내역 (관리자)")
 
-    history = get_all_submission_history()
-
     # 상태 초기화
-    if 'all_expanded_idx' not in st.session_state:
-        st.session_state.all_expanded_idx = None  # None = 전체 닫힘
+    if 'expanded_batches' not in st.session_state:
+        st.session_state.expanded_batches = set()  # 펼친 batch_id
     if 'selected_submissions' not in st.session_state:
-        st.session_state.selected_submissions = set()
-
-    if history:
-        # 상단 일괄 다운로드 버튼
-        if st.session_state.selected_submissions:
-            st.markdown("---")
-            selected_count = len(st.session_state.selected_submissions)
-
-            # 선택된 항목들의 ZIP 파일 생성
-            zip_buffer = io.BytesIO()
-            with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-                for idx in st.session_state.selected_submissions:
-                    submission = history[idx]
-                    batch_id = submission['batch_id']
-                    # 날짜 형식 변환
-                    dt = datetime.fromisoformat(submission['submitted_date'].replace('Z', '+00:00'))
-                    submit_date = dt.strftime("%Y년 %m월 %d일 %p %I시 %M분").replace('AM', '오전').replace('PM', '오후')
-                    username = submission['username']
-
-                    for item_idx, item in enumerate(submission['items'], 1):
-                        md_content = f"""---
-품목명: {item['item_name']}
-신청자: {username}
-요청일: {submit_date}
-구매링크: {item['purchase_link']}
-옵션명: {item['option_name'] if item['option_name'] else ''}
-수량: {item['quantity']}
-개당금액: {item['unit_price']}
-신청일:
-상태: 리스트업
----
+        st.session_state.selected_submissions = set()  # 선택된 batch_id
+    if 'all_history_cursors' not in st.session_state:
+        st.session_state.all_history_cursors = [None]  # 불러온 페이지들의 커서
+    if 'all_history_filters' not in st.session_state:
+        st.session_state.all_history_filters = {}
+
+    # 검색 필터 (서버에서 적용)
+    with st.form("all_history_filter_form"):
+        col1, col2, col3, col4 = st.columns([1.5, 2, 1, 1])
+        with col1:
+            filter_username = st.text_input("신청자", placeholder="아이디")
+        with col2:
+            filter_dates = st.date_input("기간", value=(), format="YYYY-MM-DD")
+        with col3:
+            filter_min = st.number_input("최소 금액", min_value=0, value=None, step=10000)
+        with col4:
+            filter_max = st.number_input("최대 금액", min_value=0, value=None, step=10000)
+
+        if st.form_submit_button("🔍 조회", width="stretch"):
+            date_from = filter_dates[0] if len(filter_dates) > 0 else None
+            date_to = filter_dates[1] if len(filter_dates) > 1 else date_from
+            st.session_state.all_history_filters = {
+                'username': filter_username.strip() or None,
+                'date_from': date_from,
+                'date_to': date_to,
+                'min_amount': filter_min,
+                'max_amount': filter_max
+            }
+            # 필터가 바뀌면 첫 페이지부터 다시
+            st.session_state.all_history_cursors = [None]
+
+    # 불러온 페이지들 합치기 (각 페이지는 캐시되며, 캐시가 없는 페이지는 동시에 조회)
+    filters = st.session_state.all_history_filters
+    with section("전체내역: 조회"):
+        pages = fetch_concurrently([
+            (get_submission_history_page, (cursor,), filters)
+            for cursor in st.session_state.all_history_cursors
+        ])
+        history = concat_history(page['history'] for page in pages)
+    next_cursor = pages[-1]['next_cursor']
+
+    if not history.summaries.empty:
+        with section("전체내역: 목록 그리기"):
+            show_admin_selection(history)
+
+        # 다음 페이지 불러오기
+        if next_cursor:
+            st.button(
+                "더 보기",
+                key="all_history_more",
+                width="stretch",
+                on_click=st.session_state.all_history_cursors.append,
+                args=(next_cursor,)
+            )
+    else:
+        st.info("아직 신청 내역이 없습니다.")
 
-"""
-                        filename = f"{batch_id}_{item_idx}.md"
-                        zip_file.writestr(filename, md_content)
+def toggle_selected(batch_id):
+    """다운로드 선택 체크박스 변경 반영"""
+    if st.session_state[f"check_{batch_id}"]:
+        st.session_state.selected_submissions.add(batch_id)
+    else:
+        st.session_state.selected_submissions.discard(batch_id)
+
+def clear_selected():
+    """다운로드 선택 초기화"""
+    for batch_id in st.session_state.selected_submissions:
+        st.session_state[f"check_{batch_id}"] = False
+    st.session_state.selected_submissions = set()
+
+@st.fragment
+def show_admin_selection(history):
+    """다운로드 버튼 + 선택 체크박스 목록 (체크 시 이 영역만 다시 실행됨)"""
+    # 상단 일괄 다운로드 버튼
+    if st.session_state.selected_submissions:
+        st.markdown("---")
+        selected_count = len(st.session_state.selected_submissions)
 
-            zip_buffer.seek(0)
+        # ZIP은 다운로드 버튼을 눌렀을 때만 생성 (선택 조합별 캐시)
+        selected_batch_ids = tuple(sorted(st.session_state.selected_submissions))
+        zip_data = lambda: build_selected_zip(selected_batch_ids)
+        if is_profiling():
+            # 프로파일링 중에는 ZIP 생성 시간도 이번 rerun에 포함되도록 미리 생성
+            with section("내보내기 (ZIP)"):
+                zip_data = build_selected_zip(selected_batch_ids)
 
-            col1, col2 = st.columns([3, 1])
-            with col1:
-                st.download_button(
-                    label=f"📥 선택한 항목 다운로드 ({selected_count}개)",
-                    data=zip_buffer,
-                    file_name="물품신청_선택항목.zip",
-                    mime="application/zip",
-                    key="download_selected",
-                    use_container_width=True
-                )
-            with col2:
-                if st.button("선택 초기화", use_container_width=True):
-                    st.session_state.selected_submissions = set()
-                    st.rerun()
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            st.download_button(
+                label=f"📥 선택한 항목 다운로드 ({selected_count}개)",
+                data=zip_data,
+                file_name="물품신청_선택항목.zip",
+                mime="application/zip",
+                key="download_selected",
+                on_click="ignore",
+                width="stretch"
+            )
+        with col2:
+            st.button("선택 초기화", width="stretch", on_click=clear_selected)
 
-            st.markdown("---")
-
-        # 각 신청 항목 표시
-        for idx, submission in enumerate(history):
-            # 날짜 형식 변환: 2025-12-18T11:17:16.876878 → 2025년 12월 18일 오전 11시 17분
-            dt = datetime.fromisoformat(submission['submitted_date'].replace('Z', '+00:00'))
-            submit_date = dt.strftime("%Y년 %m월 %d일 %p %I시 %M분").replace('AM', '오전').replace('PM', '오후')
-            username = submission['username']
-            is_expanded = (idx == st.session_state.all_expanded_idx)
-
-            # 체크박스 + 토글 버튼
-            col_check, col_btn = st.columns([0.5, 9.5])
-
-            with col_check:
-                is_checked = st.checkbox(
-                    "",
-                    value=idx in st.session_state.selected_submissions,
-                    key=f"check_{idx}",
-                    label_visibility="collapsed"
-                )
-                # 상태 업데이트
-                if is_checked:
-                    if idx not in st.session_state.selected_submissions:
-                        st.session_state.selected_submissions.add(idx)
-                        st.rerun()
-                else:
-                    if idx in st.session_state.selected_submissions:
-                        st.session_state.selected_submissions.discard(idx)
-                        st.rerun()
-
-            with col_btn:
-                if st.button(
-                    f"{'▼' if is_expanded else '▶'} {submit_date} [{username}]",
-                    key=f"all_btn_{idx}",
-                    use_container_width=True
-                ):
-                    # 토글: 같은 항목 클릭 시 닫기
-                    if st.session_state.all_expanded_idx == idx:
-                        st.session_state.all_expanded_idx = None
-                    else:
-                        st.session_state.all_expanded_idx = idx
-                    st.rerun()
+        # 켰을 때만 계산 (선택 조합별 캐시)
+        if st.toggle("🧾 같은 품목 합쳐 보기", key="show_consolidation"):
+            show_consolidation(selected_batch_ids)
 
-            # 선택된 항목만 내용 표시
-            if is_expanded:
-                items_data = []
-                for item_idx, item in enumerate(submission['items'], 1):
-                    items_data.append({
-                        'No': str(item_idx),
-                        '이름': item['item_name'],
-                        '링크': item['purchase_link'],
-                        '옵션': item['option_name'] if item['option_name'] else '-',
-                        '수량': f"{item['quantity']}개",
-                        '1개당 금액': f"{item['unit_price']:,}원",
-                        '총금액': f"{item['total_price']:,}원"
-                    })
-
-                df = pd.DataFrame(items_data)
-                st.dataframe(df, use_container_width=True, hide_index=True)
-
-                st.markdown("")  # 여백
-
-                # 품목 수와 총 금액
-                col1, col2, col3 = st.columns([2, 1, 1])
-                with col1:
-                    st.write("")
-                with col2:
-                    st.markdown(f"**품목 수:** {submission['item_count']}개")
-                with col3:
-                    st.markdown(f"**총 금액:** {submission['total_amount']:,}원")
-
-                st.markdown("")  # 여백
+        st.markdown("---")
+
+    # 각 신청 항목 표시 (체크박스 + 토글 버튼)
+    for summary in history.summaries.itertuples():
+        batch_id = summary.Index
+        col_check, col_btn = st.columns([0.5, 9.5])
+
+        with col_check:
+            # 페이지를 다시 불러와도 선택 상태가 유지되도록 위젯 상태를 선택 목록에 맞춤
+            check_key = f"check_{batch_id}"
+            if check_key not in st.session_state:
+                st.session_state[check_key] = batch_id in st.session_state.selected_submissions
+            st.checkbox(
+                "선택",
+                key=check_key,
+                label_visibility="collapsed",
+                on_change=toggle_selected,
+                args=(batch_id,)
+            )
+
+        with col_btn:
+            title = f"{summary.submit_date_label} [{summary.username}]"
+            show_submission_accordion(batch_id, summary, history.items, "all_btn", title)
+
+def show_consolidation(batch_ids):
+    """선택한 신청들의 같은 품목(구매 링크 + 옵션)을 합친 표 + CSV 다운로드"""
+    try:
+        with section("전체내역: 같은 품목 합치기"):
+            consolidated = build_consolidation(batch_ids)
+    except ValueError as e:
+        # 빠진 품목이 있으면 합친 표를 보여주지 않음 (주문 수량이 모자라게 나오지 않도록)
+        st.error(f"합친 표를 만들 수 없습니다: {str(e)}. 잠시 후 다시 시도해주세요.")
+        return
+
+    if consolidated.empty:
+        st.info("선택한 신청에 품목이 없습니다.")
+        return
+
+    shared = int((consolidated['requester_count'] > 1).sum())
+    st.caption(
+        f"품목 {int(consolidated['line_count'].sum()):,}개 → 주문할 품목 {len(consolidated):,}개 "
+        f"(여러 명이 신청한 품목 {shared:,}개) · 총 {int(consolidated['total_price'].sum()):,}원"
+    )
+    st.dataframe(
+        consolidated,
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'item_name': "품목",
+            'option_name': "옵션",
+            'purchase_link': st.column_config.LinkColumn("링크"),
+            'quantity': "총수량",
+            'total_price': st.column_config.NumberColumn("총금액", format="%,d원"),
+            'line_count': "신청 품목 수",
+            'requester_count': "신청자 수",
+            'requesters': "신청자",
+        }
+    )
+    st.download_button(
+        label="📥 합친 표 다운로드 (CSV)",
+        data=lambda: build_consolidation_csv(batch_ids),
+        file_name="물품신청_품목합치기.csv",
+        mime="text/csv",
+        key="download_consolidation",
+        on_click="ignore",
+        width="stretch"
+    )
+
+def show_item_search_tab():
+    """전체 신청 품목 검색 (관리자 전용, 검색은 저장소의 색인에서 처리)"""
+    st.subheader("품목 검색 (관리자)")
+
+    query = st.text_input(
+        "검색어",
+        placeholder="품목명 / 옵션 / 링크 / 신청자 (공백으로 나누면 모두 포함하는 품목)",
+        key="item_search_query"
+    )
+    if not query.strip():
+        st.caption("지금까지 제출된 모든 품목에서 찾습니다.")
+        return
+
+    with section("품목검색: 조회"):
+        results = search_submitted_items(query)
+
+    if results.empty:
+        st.info("검색 결과가 없습니다.")
+        return
+
+    if len(results) >= SEARCH_LIMIT:
+        st.caption(f"최근 {SEARCH_LIMIT}건만 표시합니다. 검색어를 더 입력해서 좁혀 보세요.")
     else:
-        st.info("아직 신청 내역이 없습니다.")
+        st.caption(f"{len(results)}건")
+
+    st.dataframe(
+        results,
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'submitted_date': "신청일",
+            'username': "신청자",
+            'item_name': "품목",
+            'option_name': "옵션",
+            'quantity': "수량",
+            'unit_price': st.column_config.NumberColumn("1개당 금액", format="%,d원"),
+            'total_price': st.column_config.NumberColumn("총 금액", format="%,d원"),
+            'purchase_link': st.column_config.LinkColumn("링크"),
+            'status': "상태",
+            'batch_id': "신청 번호",
+            'batch_item_count': "신청 품목 수",
+            'batch_total_amount': st.column_config.NumberColumn("신청 총액", format="%,d원"),
+        }
+    )
+
+def show_analytics_tab():
+    """지출 통계 (관리자 전용, DB에서 집계한 행만 받아서 그림)"""
+    st.subheader("지출 통계 (관리자)")
+
+    if 'analytics_range' not in st.session_state:
+        st.session_state.analytics_range = (None, None)
+
+    with st.form("analytics_filter_form"):
+        col1, col2 = st.columns([3, 1])
+        with col1:
+            range_dates = st.date_input("기간", value=(), format="YYYY-MM-DD")
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            if st.form_submit_button("🔍 조회", width="stretch"):
+                date_from = range_dates[0] if len(range_dates) > 0 else None
+                date_to = range_dates[1] if len(range_dates) > 1 else date_from
+                st.session_state.analytics_range = (date_from, date_to)
+
+    # 세 가지 통계는 서로 독립적이므로 동시에 조회
+    date_range = st.session_state.analytics_range
+    by_month, by_user, by_item = fetch_concurrently([
+        (get_spend_by_month, date_range, {}),
+        (get_spend_by_user, date_range, {}),
+        (get_spend_by_item, date_range, {}),
+    ])
+
+    if by_month.empty:
+        st.info("해당 기간의 신청 내역이 없습니다.")
+        return
+
+    # 전체 합계 (월별 합계를 더하면 됨)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("총 금액", f"{int(by_month['total_amount'].sum()):,}원")
+    col2.metric("신청 건수", f"{int(by_month['batch_count'].sum()):,}건")
+    col3.metric("품목 수", f"{int(by_month['item_count'].sum()):,}개")
+
+    st.markdown("**월별 금액**")
+    st.bar_chart(by_month, x='month', y='total_amount', x_label="월", y_label="금액(원)")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**사용자별 금액**")
+        st.bar_chart(by_user, x='username', y='total_amount', x_label="금액(원)", y_label="", horizontal=True)
+        st.dataframe(
+            by_user,
+            hide_index=True,
+            width="stretch",
+            column_config={
+                'username': "신청자",
+                'batch_count': "신청 건수",
+                'item_count': "품목 수",
+                'total_amount': st.column_config.NumberColumn("금액", format="%,d원"),
+            }
+        )
+    with col2:
+        st.markdown(f"**품목별 금액 (상위 {len(by_item)}개)**")
+        st.dataframe(
+            by_item,
+            hide_index=True,
+            width="stretch",
+            column_config={
+                'item_name': "품목",
+                'request_count': "신청 횟수",
+                'user_count': "신청자 수",
+                'quantity': "수량",
+                'total_amount': st.column_config.NumberColumn("금액", format="%,d원"),
+            }
+        )
+
+def show_diagnostics_tab():
+    """데이터 계층 호출 통계 (관리자 전용)"""
+    import pandas as pd
+
+    st.subheader("진단 (관리자)")
+    st.caption("앱이 시작된 뒤(또는 초기화 뒤) 이 서버 프로세스에서 누적된 값입니다.")
+
+    # 저장소 서킷 브레이커 상태
+    health = get_backend_health()
+    if health:
+        state_labels = {'closed': "🟢 정상", 'half_open': "🟡 복구 확인 중", 'open': "🔴 차단 (캐시된 내용 표시 중)"}
+        st.markdown(f"저장소 상태: **{state_labels[health['state']]}** · 연속 실패 {health['failures']}회")
+
+    # 장바구니 outbox (저장소로 아직 보내지 않은 담기/삭제)
+    outbox = get_cart_outbox_status()
+    if outbox['pending']:
+        st.markdown(
+            f"장바구니 전송 대기: **{outbox['pending']}건** · 가장 오래된 기록 {outbox['oldest'][:19]} (UTC)"
+            f" · 최대 재시도 {outbox['max_attempts']}회"
+        )
+        if outbox['last_error']:
+            st.caption(f"마지막 전송 오류: {outbox['last_error']}")
+    else:
+        st.markdown("장바구니 전송 대기: **0건**")
+    if outbox['rejected']:
+        st.markdown(f"저장소가 거부해 보류된 변경: **{outbox['rejected']}건** (사용자 장바구니 화면에서 다시 시도 / 버리기)")
+
+    snapshot = metrics_snapshot()
+
+    # 함수별 호출 통계 (캐시 hit는 저장소를 조회하지 않으므로 호출 수에 포함되지 않음)
+    rows = []
+    for name in sorted(set(snapshot['operations']) | set(snapshot['caches'])):
+        operation = snapshot['operations'].get(name, {})
+        cache = snapshot['caches'].get(name)
+        rows.append({
+            '함수': name,
+            '호출': operation.get('calls', 0),
+            '오류': operation.get('errors', 0),
+            '평균 ms': operation.get('avg_ms', 0.0),
+            'p50 ms': operation.get('p50_ms', 0.0),
+            'p95 ms': operation.get('p95_ms', 0.0),
+            '최대 ms': operation.get('max_ms', 0.0),
+            '반환 행': operation.get('rows', 0),
+            '캐시 hit': cache['hits'] if cache else None,
+            '캐시 miss': cache['misses'] if cache else None,
+            '캐시 적중률': cache['hit_rate'] if cache else None,
+        })
+
+    if rows:
+        st.dataframe(
+            pd.DataFrame(rows),
+            hide_index=True,
+            width="stretch",
+            column_config={
+                '평균 ms': st.column_config.NumberColumn(format="%.1f"),
+                'p50 ms': st.column_config.NumberColumn(format="≤ %.0f"),
+                'p95 ms': st.column_config.NumberColumn(format="≤ %.0f"),
+                '최대 ms': st.column_config.NumberColumn(format="%.1f"),
+                '캐시 적중률': st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="percent"),
+            }
+        )
+    else:
+        st.info("아직 기록된 호출이 없습니다.")
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button(
+            "📥 Prometheus 텍스트",
+            data=metrics_prometheus,
+            file_name="metrics.prom",
+            mime="text/plain",
+            on_click="ignore",
+            width="stretch"
+        )
+    with col2:
+        st.download_button(
+            "📥 JSON",
+            data=metrics_json,
+            file_name="metrics.json",
+            mime="application/json",
+            on_click="ignore",
+            width="stretch"
+        )
+    with col3:
+        st.button("통계 초기화", width="stretch", on_click=reset_metrics)
+
+    show_profiler_section()
+
+def toggle_profiling():
+    """프로파일링 모드 on/off (화면을 옮겨도 유지되도록 위젯 상태와 별도로 저장)"""
+    st.session_state.profiling = st.session_state.profiling_toggle
+
+def show_profiler_section():
+    """rerun 프로파일링 모드 + 최근 측정 결과"""
+    import pandas as pd
+
+    st.markdown("---")
+    st.markdown("**⏱ rerun 프로파일링**")
+    st.toggle(
+        "프로파일링 모드 (켜 두면 이 세션의 화면 전환/버튼 클릭마다 측정)",
+        value=st.session_state.get('profiling', False),
+        key="profiling_toggle",
+        on_change=toggle_profiling
+    )
+
+    profiles = st.session_state.get('profiles', [])
+    if not profiles:
+        st.caption("프로파일링 모드를 켜고 살펴볼 화면으로 이동한 뒤 다시 이 화면으로 돌아오세요.")
+        return
+
+    index = st.selectbox(
+        "측정 결과",
+        range(len(profiles)),
+        format_func=lambda i: f"{pd.Timestamp(profiles[i].started_at, unit='s'):%H:%M:%S} {profiles[i].label} ({profiles[i].total * 1000:,.0f} ms)"
+    )
+    profile = profiles[index]
+
+    # 구간은 서로 포함될 수 있음 (예: 전체내역 ⊃ 전체내역: 조회)
+    st.dataframe(
+        pd.DataFrame(
+            [(name, seconds * 1000, seconds / profile.total if profile.total else 0.0)
+             for name, seconds in profile.sections],
+            columns=['구간', 'ms', '비율']
+        ),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            'ms': st.column_config.NumberColumn(format="%.1f"),
+            '비율': st.column_config.ProgressColumn(min_value=0.0, max_value=1.0, format="percent"),
+        }
+    )
+
+    if profile.functions:
+        with st.expander("누적 시간 상위 함수"):
+            st.dataframe(
+                pd.DataFrame(profile.functions),
+                hide_index=True,
+                width="stretch",
+                column_config={
+                    'self_ms': st.column_config.NumberColumn(format="%.1f"),
+                    'cumulative_ms': st.column_config.NumberColumn(format="%.1f"),
+                }
+            )
+        st.download_button(
+            "📥 프로파일 (.prof)",
+            data=profile.prof,
+            file_name=f"rerun_{profile.started_at:.0f}.prof",
+            mime="application/octet-stream",
+            on_click="ignore",
+            help="python -m pstats 또는 snakeviz로 열 수 있습니다."
+        )
+    else:
+        st.caption("다른 프로파일러가 동작 중이어서 구간 시간만 기록했습니다.")
 
 if __name__ == "__main__":
     main()
+    # 첫 화면을 그린 뒤 나머지 준비 작업은 백그라운드에서 (프로세스당 1번)
+    start_background_warm_up()
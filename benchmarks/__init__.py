@@ -0,0 +1 @@
+# Benchmarks / load tests (Supabase 대신 utils/local_backend.py 사용)
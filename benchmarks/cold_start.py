@@ -0,0 +1,96 @@
+"""콜드 스타트 측정
+
+매번 새 Python 프로세스에서 app.py를 처음 실행해서 첫 화면(로그인)이 그려질 때까지의
+시간과, 로그인 직후 첫 화면 / 관리자 전체내역 첫 화면까지의 시간을 측정함.
+저장소는 임시 SQLite 파일(utils/local_backend.py)을 사용함.
+
+실행:
+    python -m benchmarks.cold_start
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# 무거운 모듈: 첫 화면 시점에 이미 import 됐는지 함께 출력
+HEAVY_MODULES = ("pandas", "supabase", "httpx")
+
+def _child(think):
+    """새 프로세스 안에서 실행: 단계별 시간(초)을 JSON으로 출력
+
+    think: 단계 사이 대기 시간(초, 아이디/비밀번호 입력 등 사용자 동작). 측정에서 제외됨.
+    """
+    process_start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    from benchmarks.seed import ADMIN_USERNAME, PASSWORD
+
+    timings = {'import streamlit': time.perf_counter() - process_start}
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    start = time.perf_counter()
+    at.run()
+    timings['first render (login)'] = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    time.sleep(think)
+    at.text_input(key="login_username").input(ADMIN_USERNAME)
+    at.text_input(key="login_password").input(PASSWORD)
+    start = time.perf_counter()
+    at.button[0].click().run()
+    timings['login → request tab'] = time.perf_counter() - start
+
+    time.sleep(think)
+    start = time.perf_counter()
+    at.segmented_control[0].set_value("📋 전체내역").run()
+    timings['→ all history tab'] = time.perf_counter() - start
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    print(json.dumps({'timings': timings, 'loaded': loaded}))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--think", type=float, default=3.0, help="단계 사이 사용자 대기 시간(초)")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.think)
+        return 0
+
+    from benchmarks.seed import seed
+    from utils.local_backend import LocalClient
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "cold_start.db")
+        seed(LocalClient(db_path), users=50, batches=500)
+
+        env = dict(os.environ, STORAGE_BACKEND="local", SQLITE_PATH=db_path)
+        runs = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.cold_start", "--child", "--think", str(args.think)],
+                env=env, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            result['timings']['process total'] = time.perf_counter() - start - 2 * args.think
+            runs.append(result)
+
+    print(f"{'step':<24} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for step in runs[0]['timings']:
+        values = [run['timings'][step] * 1000 for run in runs]
+        print(f"{step:<24} {statistics.median(values):>10.0f} {min(values):>8.0f} {max(values):>8.0f}")
+    print(f"첫 화면 시점에 import된 모듈: {', '.join(runs[0]['loaded']) or '-'}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
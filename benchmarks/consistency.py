@@ -0,0 +1,191 @@
+"""동시성 / 저장소 분리 검사
+
+벤치마크와 달리 시간을 재지 않고, 여러 경로가 겹칠 때 데이터가 사라지거나
+엉뚱한 저장소로 가지 않는지 확인함. 검사 하나라도 실패하면 종료 코드 1.
+
+실행:
+    python -m benchmarks.consistency
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+
+from utils import database as db
+from utils.cache import clear_caches
+from utils.local_backend import LocalClient
+from utils.outbox import CartOutbox
+
+def _cart_item(name):
+    return {
+        'item_name': name,
+        'purchase_link': 'https://shop.example.com/consistency',
+        'option_name': '',
+        'quantity': 1,
+        'unit_price': 1000,
+        'total_price': 1000,
+    }
+
+class _PausedQuery:
+    """execute() 결과를 받은 뒤 client.release가 설정될 때까지 기다리는 쿼리 (지정한 스레드에서만)"""
+
+    def __init__(self, query, client):
+        self._query = query
+        self._client = client
+
+    def __getattr__(self, name):
+        method = getattr(self._query, name)
+
+        def call(*args, **kwargs):
+            self._query = method(*args, **kwargs)
+            return self
+
+        return call
+
+    def execute(self):
+        response = self._query.execute()
+        if threading.current_thread() is self._client.paused_thread:
+            self._client.reached.set()
+            self._client.release.wait(10)
+        return response
+
+class _PausingClient:
+    """paused_thread의 pending_cart 조회만 저장소를 읽은 직후에 멈추는 클라이언트"""
+
+    def __init__(self, client):
+        self._client = client
+        self.paused_thread = None
+        self.reached = threading.Event()
+        self.release = threading.Event()
+
+    def table(self, name):
+        query = self._client.table(name)
+        return _PausedQuery(query, self) if name == "pending_cart" else query
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+def check_outbox_per_storage():
+    """로컬 SQLite 파일 저장소는 Supabase용 기본 outbox 파일을 같이 쓰지 않음"""
+    failures = []
+    saved_env = {name: os.environ.pop(name, None) for name in ("STORAGE_BACKEND", "SQLITE_PATH", "CART_OUTBOX_PATH")}
+    saved_client = db._supabase_client
+    try:
+        db.set_supabase_client(None)
+        with tempfile.TemporaryDirectory() as directory:
+            sqlite_path = os.path.join(directory, "local.db")
+            os.environ["STORAGE_BACKEND"] = "local"
+            os.environ["SQLITE_PATH"] = sqlite_path
+            path = db._outbox_path()
+            if path == db._DEFAULT_OUTBOX_PATH or os.path.dirname(path) != directory:
+                failures.append(f"로컬 파일 저장소의 outbox 경로: {path}")
+
+            # 다른 저장소가 기록된 outbox 파일은 열지 않음
+            shared = os.path.join(directory, "shared.db")
+            CartOutbox(shared, storage="supabase:https://example.supabase.co")
+            try:
+                CartOutbox(shared, storage=db._storage_id())
+            except ValueError:
+                pass
+            else:
+                failures.append("다른 저장소의 outbox 파일을 열 수 있음")
+    finally:
+        db.set_supabase_client(saved_client)
+        for name, value in saved_env.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+    return failures
+
+def check_flush_during_cart_load():
+    """전송 전에 저장소를 읽은 장바구니 조회가 전송 뒤에 끝나도 전송된 항목이 사라지지 않음"""
+    client = _PausingClient(LocalClient())
+    outbox = CartOutbox()
+    saved_client, saved_get_outbox = db._supabase_client, db._get_outbox
+    db.set_supabase_client(client)
+    db._get_outbox = lambda: (outbox, None)
+    clear_caches()
+    try:
+        username = "consistency"
+        outbox.add(username, _cart_item("전송 중에 담은 품목"))
+
+        # 1) 조회: 저장소를 읽음 (아직 전송 전이라 비어 있음) → 멈춤
+        reader = threading.Thread(target=db.load_saved_cart, args=(username,))
+        client.paused_thread = reader
+        reader.start()
+        client.reached.wait(10)
+        # 2) 전송: 저장소에 추가 → 캐시 무효화 → outbox에서 삭제
+        db.flush_cart_outbox(outbox)
+        # 3) 조회가 이어서 끝남 (전송 전 내용을 캐시하려 함)
+        client.release.set()
+        reader.join(10)
+
+        names = [item['item_name'] for item in db.load_pending_cart(username)]
+        if names != ["전송 중에 담은 품목"]:
+            return [f"전송 직후 장바구니: {names}"]
+        return []
+    finally:
+        db.set_supabase_client(saved_client)
+        db._get_outbox = saved_get_outbox
+        clear_caches()
+
+def check_submit_during_catalog_scan():
+    """품목 카탈로그를 만드는 동안 제출된 품목도 빠지지 않고 한 번만 들어감"""
+    client = LocalClient()
+    saved_client, saved_page = db._supabase_client, db._CATALOG_SCAN_PAGE
+    db.set_supabase_client(client)
+    db._CATALOG_SCAN_PAGE = 5
+    clear_caches()
+    try:
+        username = "consistency"
+        client.rpc("submit_cart_batch", {
+            "p_username": username,
+            "p_batch_id": "seed",
+            "p_idempotency_key": "consistency-seed",
+            "p_items": [_cart_item(f"기존 품목 {index}") for index in range(12)],
+        }).execute()
+
+        def scan():
+            # 첫 페이지를 읽은 뒤 제출 (남은 페이지에서 다시 읽힘) + 마지막 페이지를 읽은 뒤 제출
+            for index, row in enumerate(db._scan_catalog_rows()):
+                yield row
+                if index == db._CATALOG_SCAN_PAGE - 1:
+                    db.submit_cart(username, [dict(_cart_item("훑는 중에 제출한 품목"), purchase_link="https://a")])
+            db.submit_cart(username, [dict(_cart_item("다 훑은 뒤 제출한 품목"), purchase_link="https://b")])
+
+        catalog = db._get_item_catalog()
+        catalog.ensure_loaded(scan)
+
+        failures = []
+        for name in ("훑는 중에 제출한 품목", "다 훑은 뒤 제출한 품목"):
+            counts = [entry.count for entry in catalog.search(name)]
+            if counts != [1]:
+                failures.append(f"{name}: 신청 횟수 {counts}")
+        return failures
+    finally:
+        db.set_supabase_client(saved_client)
+        db._CATALOG_SCAN_PAGE = saved_page
+        clear_caches()
+
+CHECKS = [
+    check_outbox_per_storage,
+    check_flush_during_cart_load,
+    check_submit_during_catalog_scan,
+]
+
+def main(argv=None):
+    # 저장소 외부에서 실행하므로 Streamlit 경고는 숨김
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    failed = False
+    for check in CHECKS:
+        failures = check()
+        print(f"{'FAIL' if failures else 'OK  '} {check.__name__}: {check.__doc__}")
+        for line in failures:
+            print(f"       {line}")
+        failed = failed or bool(failures)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
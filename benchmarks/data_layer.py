@@ -0,0 +1,244 @@
+"""데이터 계층 벤치마크
+
+utils/database.py의 각 함수를 로컬 SQLite 저장소(utils/local_backend.py)에 대해 실행하고
+걸린 시간, 저장소 호출(왕복) 횟수, 돌려받은 데이터 크기를 표로 출력함.
+작은 데이터와 큰 데이터에서 호출 횟수가 달라지는 함수가 있으면(= 데이터 크기에 따라
+왕복이 늘어나면) 종료 코드 1로 실패함. 저장소의 최대 행 수(max_rows)만큼 꽉 채워 받은
+호출(다 찬 페이지)은 나눠 읽기에 필요한 것이므로 비교에서 뺌.
+
+로컬 저장소도 Supabase처럼 한 번에 최대 1000행만 돌려주므로, 전체 내역을 불러오는
+함수가 돌려준 행 수를 저장소의 실제 행 수와 비교해서 잘린 결과가 있으면 함께 실패함.
+
+실행:
+    python -m benchmarks.data_layer
+    python -m benchmarks.data_layer --users 500 --batches 10000
+"""
+import argparse
+import logging
+import sys
+import time
+import uuid
+
+from benchmarks.recording import RecordingClient
+from benchmarks.seed import seed
+from utils import database as db
+from utils.cache import clear_caches
+from utils.export import build_consolidation
+from utils.local_backend import LocalClient
+
+def _new_cart_item(index):
+    return {
+        "item_name": f"벤치 품목 {index}",
+        "purchase_link": "https://shop.example.com/bench",
+        "option_name": "",
+        "quantity": 2,
+        "unit_price": 1000,
+        "total_price": 2000
+    }
+
+def _walk_pages(pages):
+    """pages번째 페이지의 커서 구하기 (측정 전 준비)"""
+    cursor = None
+    for _ in range(pages):
+        cursor = db.get_submission_history_page(cursor)['next_cursor']
+        if cursor is None:
+            break
+    return cursor
+
+def _operations(usernames):
+    """(이름, 준비 함수, 측정 함수) 목록. 준비 함수의 반환값이 측정 함수 인자로 전달됨"""
+    cart_user = usernames[1]
+    history_user = usernames[2]
+
+    def submit_once(username):
+        cart = [_new_cart_item(i) for i in range(3)]
+        db.submit_cart(username, cart, str(uuid.uuid4()))
+
+    def prepare_submit():
+        for i in range(10):
+            db.add_to_pending_cart(cart_user, **_new_cart_item(i))
+        return db.load_pending_cart(cart_user)
+
+    def prepare_delta(loader, *args):
+        def prepare():
+            loader(*args)
+            submit_once(history_user)
+            loader.expire(*args)
+        return prepare
+
+    def then_flush(func):
+        # 담기/삭제는 outbox에 기록만 하므로 저장소 전송(flush)까지 포함해서 측정
+        def measure(arg):
+            func(arg)
+            db.flush_cart_outbox()
+        return measure
+
+    return [
+        ("load_pending_cart", lambda: None,
+         lambda _: db.load_pending_cart(cart_user)),
+        ("add_to_pending_cart (outbox only)", lambda: None,
+         lambda _: db.add_to_pending_cart(cart_user, **_new_cart_item(0))),
+        ("add_to_pending_cart (+flush)", lambda: None,
+         then_flush(lambda _: db.add_to_pending_cart(cart_user, **_new_cart_item(0)))),
+        ("add_many_to_pending_cart (40, +flush)", lambda: [_new_cart_item(i) for i in range(40)],
+         then_flush(lambda items: db.add_many_to_pending_cart(cart_user, items))),
+        ("save_cart_changes (+1 ~1 -1, +flush)", lambda: db.load_pending_cart(cart_user),
+         then_flush(lambda items: db.save_cart_changes(
+             cart_user,
+             added=[_new_cart_item(0)],
+             updated=[dict(items[0], quantity=items[0]['quantity'] + 1,
+                           total_price=(items[0]['quantity'] + 1) * items[0]['unit_price'])],
+             removed=[items[1]]
+         ))),
+        ("remove_from_pending_cart (+flush)", lambda: db.load_pending_cart(cart_user)[0],
+         then_flush(lambda item: db.remove_from_pending_cart(cart_user, item))),
+        ("clear_pending_cart (+flush)", lambda: db.load_pending_cart(cart_user),
+         then_flush(lambda items: db.clear_pending_cart(cart_user, items))),
+        ("submit_cart", prepare_submit,
+         lambda cart: db.submit_cart(cart_user, cart, str(uuid.uuid4()))),
+        ("get_submission_history", lambda: None,
+         lambda _: db.get_submission_history(history_user)),
+        ("get_submission_history (delta)", prepare_delta(db.get_submission_history, history_user),
+         lambda _: db.get_submission_history(history_user)),
+        ("get_all_submission_history", lambda: None,
+         lambda _: db.get_all_submission_history()),
+        ("get_all_submission_history (delta)", prepare_delta(db.get_all_submission_history),
+         lambda _: db.get_all_submission_history()),
+        ("get_submission_history_page (1st)", lambda: None,
+         lambda _: db.get_submission_history_page(None)),
+        ("get_submission_history_page (10th)", lambda: _walk_pages(9),
+         lambda cursor: db.get_submission_history_page(cursor)),
+        ("get_submission_history_page (filtered)", lambda: None,
+         lambda _: db.get_submission_history_page(None, username=history_user, min_amount=50000)),
+        ("get_submissions_by_batch_ids (20)",
+         lambda: tuple(sorted(db.get_submission_history_page(None)['history'].summaries.index)),
+         lambda batch_ids: db.get_submissions_by_batch_ids(batch_ids)),
+        ("search_item_catalog", db.load_item_catalog,
+         lambda _: db.search_item_catalog("매트")),
+        # 로컬 저장소는 첫 검색 때 색인을 만들므로 다른 검색어로 미리 만든 뒤 측정
+        ("search_submitted_items", lambda: db.search_submitted_items("-"),
+         lambda _: db.search_submitted_items("매트")),
+        ("get_spend_by_user", lambda: None,
+         lambda _: db.get_spend_by_user()),
+        ("get_spend_by_month", lambda: None,
+         lambda _: db.get_spend_by_month()),
+        ("get_spend_by_item", lambda: None,
+         lambda _: db.get_spend_by_item()),
+    ]
+
+def _count(client, sql, params=()):
+    with client.transaction() as conn:
+        return conn.execute(sql, params).fetchone()[0]
+
+def _check_complete(client, usernames):
+    """전체를 불러오는 함수가 저장소의 행을 빠짐없이 돌려주는지 확인, 빠진 항목 설명 목록 반환"""
+    history_user = usernames[2]
+    with client.transaction() as conn:
+        all_batch_ids = tuple(sorted(row[0] for row in conn.execute('SELECT batch_id FROM submission_summary')))
+    checks = [
+        ("get_all_submission_history", db.get_all_submission_history(),
+         'SELECT COUNT(*) FROM submission_summary', 'SELECT COUNT(*) FROM submitted_items', ()),
+        ("get_submission_history", db.get_submission_history(history_user),
+         'SELECT COUNT(*) FROM submission_summary WHERE username = ?',
+         'SELECT COUNT(*) FROM submitted_items WHERE username = ?', (history_user,)),
+        ("get_submissions_by_batch_ids (전체)", db.get_submissions_by_batch_ids(all_batch_ids),
+         'SELECT COUNT(*) FROM submission_summary', 'SELECT COUNT(*) FROM submitted_items', ()),
+    ]
+    missing = []
+    for name, history, summary_sql, item_sql, params in checks:
+        expected = (_count(client, summary_sql, params), _count(client, item_sql, params))
+        actual = (len(history.summaries), len(history.items))
+        if actual != expected:
+            missing.append(f"{name}: 요약 {actual[0]}/{expected[0]}, 품목 {actual[1]}/{expected[1]}")
+
+    # 같은 품목 합치기는 선택한 신청의 품목을 모두 더해야 함
+    expected_items = _count(client, 'SELECT COUNT(*) FROM submitted_items')
+    try:
+        line_count = int(build_consolidation(all_batch_ids)['line_count'].sum())
+    except ValueError as e:
+        missing.append(f"build_consolidation (전체): {e}")
+    else:
+        if line_count != expected_items:
+            missing.append(f"build_consolidation (전체): 품목 {line_count}/{expected_items}")
+    return missing
+
+def run(users, batches):
+    """데이터를 채우고 각 함수를 캐시 없이 한 번씩 측정
+
+    반환: (함수별 결과, 잘린 결과 설명 목록)
+    """
+    local = LocalClient()
+    client = RecordingClient(local)
+    db.set_supabase_client(client)
+    usernames = seed(client, users=users, batches=batches)
+
+    results = {}
+    for name, prepare, measure in _operations(usernames):
+        clear_caches()
+        arg = prepare()
+        # 준비 단계에서 outbox에 쌓인 변경은 측정 전에 보냄
+        db.flush_cart_outbox()
+        client.log.reset()
+        start = time.perf_counter()
+        measure(arg)
+        elapsed = time.perf_counter() - start
+        summary = client.log.summary()
+        results[name] = {
+            'wall_ms': elapsed * 1000,
+            'calls': summary['calls'],
+            'full_pages': summary['full_pages'],
+            'bytes': summary['bytes']
+        }
+
+    clear_caches()
+    return results, _check_complete(local, usernames)
+
+def _print_table(title, results):
+    print(f"\n## {title}")
+    print(f"{'operation':<42} {'wall ms':>9} {'calls':>6} {'pages':>6} {'bytes':>12}")
+    for name, result in results.items():
+        print(f"{name:<42} {result['wall_ms']:>9.1f} {result['calls']:>6} {result['full_pages']:>6} "
+              f"{result['bytes']:>12,}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--batches", type=int, default=3000)
+    args = parser.parse_args(argv)
+
+    # 저장소 외부에서 실행하므로 Streamlit 경고는 숨김
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+
+    small, small_missing = run(max(10, args.users // 10), max(100, args.batches // 10))
+    large, large_missing = run(args.users, args.batches)
+    _print_table(f"small ({max(10, args.users // 10)} users, {max(100, args.batches // 10)} batches)", small)
+    _print_table(f"large ({args.users} users, {args.batches} batches)", large)
+
+    # 왕복 횟수는 데이터 크기와 무관해야 함 (다 찬 페이지는 제외)
+    def partial_calls(result):
+        return result['calls'] - result['full_pages']
+
+    regressions = [
+        f"{name}: {partial_calls(small[name])} → {partial_calls(large[name])} calls"
+        for name in small
+        if partial_calls(large[name]) > partial_calls(small[name])
+    ]
+    failed = False
+    if regressions:
+        print("\nFAIL: 데이터 크기에 따라 호출 횟수가 늘어나는 함수")
+        for line in regressions:
+            print(f"  {line}")
+        failed = True
+    if small_missing or large_missing:
+        print("\nFAIL: 저장소 최대 행 수에 걸려 잘린 결과")
+        for line in small_missing + large_missing:
+            print(f"  {line}")
+        failed = True
+    if failed:
+        return 1
+
+    print("\nOK: 모든 함수의 호출 횟수가 데이터 크기와 무관하고 결과가 잘리지 않음")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+"""Streamlit 앱 부하 테스트
+
+AppTest로 app.py 세션 여러 개를 동시에 실행해서 월말 일괄 신청 상황을 흉내 냄.
+저장소는 로컬 SQLite(utils/local_backend.py)를 사용하고, 시나리오별로
+스크립트 재실행(rerun) 지연 시간 p50/p95/p99와 최대 메모리 사용량을 출력함.
+
+AppTest는 실행할 때마다 프로세스 전역 Runtime을 바꿔 끼우므로 rerun 자체는
+한 번에 하나씩만 실행됨 (세션들은 번갈아 가며 진행). 그래서 두 가지 시간을 기록함:
+  - 응답 시간: 사용자가 체감하는 시간 (다른 세션 rerun 대기 포함)
+  - 처리 시간: rerun 1회 실행에 걸린 시간
+GIL 때문에 실제 서버에서도 스크립트 실행은 CPU를 나눠 쓰므로 응답 시간이
+단일 프로세스 서버의 혼잡도를 대략 보여줌.
+
+실행:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --sessions 50 --batches 5000
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.seed import ADMIN_USERNAME, PASSWORD, seed
+from utils import database as db
+from utils.cache import clear_caches
+from utils.export import build_selected_zip
+from utils.local_backend import LocalClient
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# AppTest 기본 제한(3초)은 동시 실행 시 부족함
+RERUN_TIMEOUT = 60
+
+# AppTest rerun은 동시에 실행할 수 없음 (전역 Runtime 공유)
+_RUN_LOCK = threading.Lock()
+
+class Session:
+    """AppTest 세션 1개 + rerun마다 (응답 시간, 처리 시간) 기록"""
+
+    def __init__(self, timings):
+        self.at = AppTest.from_file(APP_PATH, default_timeout=RERUN_TIMEOUT)
+        self.timings = timings
+
+    def _timed(self, action):
+        start = time.perf_counter()
+        with _RUN_LOCK:
+            run_start = time.perf_counter()
+            action()
+            end = time.perf_counter()
+        self.timings.append((end - start, end - run_start))
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def run(self):
+        self._timed(self.at.run)
+
+    def click(self, label):
+        button = next(b for b in self.at.button if b.label == label)
+        self._timed(button.click().run)
+
+    def login(self, username):
+        self.run()
+        self.at.text_input(key="login_username").input(username)
+        self.at.text_input(key="login_password").input(PASSWORD)
+        self.click("로그인")
+
+    def open_view(self, label):
+        self._timed(self.at.segmented_control[0].set_value(label).run)
+
+def _add_items(session, items, prefix):
+    """입력 폼으로 품목 items개 담기"""
+    for index in range(items):
+        session.at.text_input(key="form_item_name").input(f"{prefix} {index}")
+        session.at.text_input(key="form_purchase_link").input("https://shop.example.com/load-test")
+        session.at.text_input(key="form_option_name").input("옵션")
+        session.at.text_input(key="form_quantity").input("3")
+        session.at.text_input(key="form_unit_price").input("12,000")
+        session.click("➕ 담기")
+
+def staff_session(username, items, timings):
+    """직원: 로그인 → 품목 담기 → 전체 삭제 → 다시 담기 → 신청 → 내역 확인
+
+    표(st.data_editor)에서 하는 행 수정/삭제는 AppTest로 조작할 수 없어서
+    삭제는 '전체 삭제' 버튼으로 측정 (outbox에 삭제 기록 + 저장소 delete 전송).
+    """
+    session = Session(timings)
+    session.login(username)
+    _add_items(session, items, "부하 테스트 품목")
+    session.click("전체 삭제")
+    _add_items(session, items, "부하 테스트 다시 담은 품목")
+    session.click("신청하기")
+    session.open_view("📜 내역")
+
+def admin_session(pages, selections, timings, export_timings):
+    """관리자: 전체내역 → 페이지 더 보기 → 선택/펼치기 → ZIP 내보내기"""
+    session = Session(timings)
+    session.login(ADMIN_USERNAME)
+    session.open_view("📋 전체내역")
+    for _ in range(pages - 1):
+        session.click("더 보기")
+
+    # rerun 후에는 요소 트리가 바뀌므로 매번 다시 찾음
+    for index in range(min(selections, len(session.at.checkbox))):
+        session._timed(session.at.checkbox[index].check().run)
+    for _ in range(2):
+        toggle = next((b for b in session.at.button if b.label.startswith("▶")), None)
+        if toggle is None:
+            break
+        session._timed(toggle.click().run)
+
+    # 다운로드 버튼은 클릭 시 별도 스레드에서 ZIP을 만들므로 같은 함수를 직접 측정
+    selected = tuple(sorted(session.at.session_state["selected_submissions"]))
+    start = time.perf_counter()
+    build_selected_zip(selected)
+    export_timings.append(time.perf_counter() - start)
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def run_scenario(name, jobs, workers):
+    """jobs(인자 없는 함수 목록)를 동시에 실행하고 결과 요약"""
+    clear_caches()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for future in [executor.submit(job) for job in jobs]:
+            future.result()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    return name, elapsed, peak
+
+def _report(name, elapsed, peak, timings, export_timings=None):
+    ms = [total * 1000 for total, _ in timings]
+    service_ms = [service * 1000 for _, service in timings]
+    print(
+        f"{name:<28} {len(ms):>7} {_percentile(ms, 50):>9.0f} {_percentile(ms, 95):>9.0f} "
+        f"{_percentile(ms, 99):>9.0f} {_percentile(service_ms, 50):>10.0f} "
+        f"{peak / 1024 / 1024:>9.1f} {elapsed:>8.1f}"
+    )
+    if export_timings:
+        export_ms = [t * 1000 for t in export_timings]
+        print(f"{'  └ export (ZIP)':<28} {len(export_ms):>7} {_percentile(export_ms, 50):>9.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="동시 직원 세션 수")
+    parser.add_argument("--items", type=int, default=5, help="세션당 담는 품목 수")
+    parser.add_argument("--users", type=int, default=300)
+    parser.add_argument("--batches", type=int, default=3000)
+    parser.add_argument("--pages", type=int, default=3, help="관리자가 불러오는 페이지 수")
+    args = parser.parse_args(argv)
+
+    db.set_supabase_client(LocalClient())
+    usernames = seed(db.get_supabase_client(), users=args.users, batches=args.batches)
+    staff = usernames[1:args.sessions + 1]
+
+    tracemalloc.start()
+    print(
+        f"{'scenario':<28} {'reruns':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+        f"{'run p50':>10} {'peak MB':>9} {'total s':>8}"
+    )
+
+    # 1) 월말: 직원 동시 신청
+    timings = []
+    result = run_scenario(
+        f"month-end ({len(staff)} staff)",
+        [lambda u=u: staff_session(u, args.items, timings) for u in staff],
+        workers=len(staff)
+    )
+    _report(*result, timings)
+
+    # 2) 관리자 단독: 페이지/선택/내보내기
+    timings, export_timings = [], []
+    result = run_scenario(
+        "admin browse + export",
+        [lambda: admin_session(args.pages, 5, timings, export_timings)],
+        workers=1
+    )
+    _report(*result, timings, export_timings)
+
+    # 3) 직원 신청 중 관리자 조회
+    staff_timings, admin_timings, export_timings = [], [], []
+    jobs = [lambda u=u: staff_session(u, args.items, staff_timings) for u in staff]
+    jobs.append(lambda: admin_session(args.pages, 5, admin_timings, export_timings))
+    name, elapsed, peak = run_scenario("mixed", jobs, workers=len(jobs))
+    _report(f"mixed: staff ({len(staff)})", elapsed, peak, staff_timings)
+    _report("mixed: admin", elapsed, peak, admin_timings, export_timings)
+
+    tracemalloc.stop()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
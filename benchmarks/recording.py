@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from collections import defaultdict
+
+# ============================================
+# 호출 기록용 클라이언트
+# ============================================
+# 실제 클라이언트(LocalClient 또는 Supabase)를 감싸서 execute() 한 번을
+# 왕복 1회로 보고, 걸린 시간과 돌려받은 데이터 크기(JSON bytes) / 행 수를 기록함.
+
+class CallLog:
+    """execute() 호출 기록 (스레드 안전)
+
+    page_size: 저장소의 한 번 최대 행 수 (그만큼 받은 호출 = 다 찬 페이지)
+    """
+
+    def __init__(self, page_size=None):
+        self._lock = threading.Lock()
+        self.page_size = page_size
+        self.calls = []  # (대상, 걸린 시간(초), bytes, 행 수)
+
+    def record(self, target, elapsed, data):
+        size = len(json.dumps(data, ensure_ascii=False, default=str).encode('utf-8'))
+        rows = len(data) if isinstance(data, list) else 1
+        with self._lock:
+            self.calls.append((target, elapsed, size, rows))
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    def summary(self):
+        """{'calls': 횟수, 'full_pages': 다 찬 페이지 수, 'seconds': 합계, 'bytes': 합계, 'by_target': {대상: 횟수}}"""
+        with self._lock:
+            by_target = defaultdict(int)
+            for target, _, _, _ in self.calls:
+                by_target[target] += 1
+            return {
+                'calls': len(self.calls),
+                'full_pages': sum(
+                    1 for _, _, _, rows in self.calls
+                    if self.page_size is not None and rows >= self.page_size
+                ),
+                'seconds': sum(elapsed for _, elapsed, _, _ in self.calls),
+                'bytes': sum(size for _, _, size, _ in self.calls),
+                'by_target': dict(by_target)
+            }
+
+class _RecordingQuery:
+    """메서드 체인을 그대로 전달하고 execute()만 기록"""
+
+    def __init__(self, query, target, log):
+        self._query = query
+        self._target = target
+        self._log = log
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        def chained(*args, **kwargs):
+            result = attr(*args, **kwargs)
+            return _RecordingQuery(result, self._target, self._log)
+
+        return chained
+
+    def execute(self):
+        start = time.perf_counter()
+        response = self._query.execute()
+        self._log.record(self._target, time.perf_counter() - start, response.data)
+        return response
+
+class RecordingClient:
+    """table()/rpc() 결과의 execute()를 CallLog에 기록하는 클라이언트 래퍼"""
+
+    def __init__(self, client, log=None):
+        self.client = client
+        self.log = log or CallLog(page_size=getattr(client, 'max_rows', None))
+
+    def table(self, name):
+        return _RecordingQuery(self.client.table(name), name, self.log)
+
+    def rpc(self, name, params=None):
+        return _RecordingQuery(self.client.rpc(name, params), f"rpc:{name}", self.log)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
@@ -0,0 +1,84 @@
+import random
+import uuid
+from datetime import datetime, timedelta, timezone
+
+# ============================================
+# 벤치마크용 테스트 데이터
+# ============================================
+
+ADMIN_USERNAME = "차현석"
+PASSWORD = "bench"
+
+# 자주 신청되는 소모품 (품목명, 구매링크, 옵션 후보, 개당 금액)
+CATALOG = [
+    ("요가매트", "https://shop.example.com/yoga-mat", ["퍼플 10mm", "블랙 8mm", "그린 6mm"], 15000),
+    ("폼롤러", "https://shop.example.com/foam-roller", ["45cm", "90cm"], 12000),
+    ("덤벨", "https://shop.example.com/dumbbell", ["2kg", "5kg", "10kg"], 22000),
+    ("밴드", "https://shop.example.com/band", ["라이트", "미디엄", "헤비"], 8000),
+    ("소독티슈", "https://mart.example.com/wipes", ["100매", "200매"], 4500),
+    ("타월", "https://mart.example.com/towel", ["화이트", "그레이"], 3000),
+    ("샴푸", "https://mart.example.com/shampoo", ["1L", "500ml"], 9000),
+    ("바디워시", "https://mart.example.com/bodywash", ["1L"], 9500),
+    ("종이컵", "https://mart.example.com/cups", ["1000개"], 11000),
+    ("케틀벨", "https://shop.example.com/kettlebell", ["8kg", "12kg", "16kg"], 35000),
+    ("짐볼", "https://shop.example.com/gymball", ["55cm", "65cm"], 18000),
+    ("스트랩", "https://shop.example.com/strap", ["", "블랙"], 7000),
+]
+
+def _iso(dt):
+    return dt.astimezone(timezone.utc).isoformat(timespec='microseconds')
+
+def _random_item(rng):
+    name, link, options, price = rng.choice(CATALOG)
+    quantity = rng.randint(1, 20)
+    return {
+        "item_name": name,
+        "purchase_link": link,
+        "option_name": rng.choice(options),
+        "quantity": quantity,
+        "unit_price": price,
+        "total_price": quantity * price
+    }
+
+def seed(client, users=300, batches=3000, items_per_batch=(3, 17), cart_items=5, days=365, seed_value=0):
+    """사용자/장바구니/제출 내역을 채우고 사용자 이름 목록 반환
+
+    batches개의 신청을 최근 days일에 고르게 흩어 넣음. 품목 수는 batch마다
+    items_per_batch 범위에서 무작위 (기본값이면 평균 10개, 총 3만 개 정도).
+    """
+    rng = random.Random(seed_value)
+    usernames = [ADMIN_USERNAME] + [f"staff{i:03d}" for i in range(users - 1)]
+
+    client.table("users").insert([
+        {"username": username, "password": PASSWORD, "name": username}
+        for username in usernames
+    ]).execute()
+
+    # 제출 내역
+    now = datetime.now(timezone.utc)
+    summaries, items = [], []
+    for index in range(batches):
+        username = rng.choice(usernames)
+        batch_id = uuid.UUID(int=rng.getrandbits(128)).hex[:8]
+        submitted_date = _iso(now - timedelta(days=days) + timedelta(days=days) * index / batches)
+        batch_items = [_random_item(rng) for _ in range(rng.randint(*items_per_batch))]
+        for item in batch_items:
+            items.append(dict(item, username=username, batch_id=batch_id, submitted_date=submitted_date))
+        summaries.append({
+            "username": username,
+            "batch_id": batch_id,
+            "item_count": len(batch_items),
+            "total_amount": sum(item["total_price"] for item in batch_items),
+            "submitted_date": submitted_date
+        })
+
+    client.table("submission_summary").insert(summaries).execute()
+    client.table("submitted_items").insert(items).execute()
+
+    # 장바구니 (일부 사용자만)
+    carts = []
+    for username in usernames[: max(1, users // 10)]:
+        carts.extend(dict(_random_item(rng), username=username) for _ in range(cart_items))
+    client.table("pending_cart").insert(carts).execute()
+
+    return usernames
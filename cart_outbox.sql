@@ -0,0 +1,15 @@
+-- ============================================
+-- 물품신청받기 앱 장바구니 client_id 추가
+-- ============================================
+-- 담기/삭제는 앱 서버의 로컬 outbox(utils/outbox.py)에 먼저 기록하고 백그라운드에서 보냄.
+-- 재전송해도 같은 항목이 두 번 담기지 않도록 항목마다 앱에서 만든 client_id로 upsert함
+-- (utils/database.py의 flush_cart_outbox).
+
+-- Step 1: client_id 컬럼 (이전에 담긴 항목은 NULL)
+ALTER TABLE pending_cart ADD COLUMN IF NOT EXISTS client_id TEXT;
+
+-- Step 2: upsert(on_conflict=client_id)에 필요한 UNIQUE 인덱스 (NULL은 여러 개 허용)
+CREATE UNIQUE INDEX IF NOT EXISTS pending_cart_client_id_key
+    ON pending_cart (client_id);
+
+-- ✅ 완료!
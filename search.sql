@@ -0,0 +1,102 @@
+-- ============================================
+-- 물품신청받기 앱 전체 품목 검색 함수
+-- ============================================
+-- 관리자 🔎 품목검색 화면에서 submitted_items를 이름 / 옵션 / 링크 / 신청자로 검색
+-- utils/database.py의 search_submitted_items에서 .rpc()로 호출
+-- 검색 대상 문자열(소문자로 이어 붙인 네 컬럼)에 trigram GIN 색인을 만들어
+-- '%검색어%' 조건도 전체를 훑지 않고 색인으로 찾음 (품목이 수만 개여도 수 ms)
+--
+-- 3글자 미만 검색어(한글 대부분: '매트', '공')는 trigram이 나오지 않아 trigram 색인으로 찾을 수 없음
+-- (LIKE로 두면 GIN 색인 전체를 훑게 됨). 그래서 짧은 검색어는 strpos 조건으로 바꿔 색인을 쓰지 않게 하고,
+-- - 긴 검색어가 함께 있으면: 긴 검색어로 색인에서 찾은 행만 짧은 검색어로 거름
+-- - 짧은 검색어만 있으면: 최근 순 색인을 거꾸로 따라가며 거르다 p_limit개가 차면 멈춤
+--   (자주 나오는 짧은 검색어는 금방 차서 빠르고, 드문 검색어는 전체를 훑는 것과 같음 → 수만 개까지는 수십 ms)
+--
+-- p_query: 공백으로 나눈 검색어를 모두 포함하는 품목 (대소문자 무시)
+-- p_limit: 최근 순 최대 개수
+
+-- Step 1: trigram 확장 + 검색 색인 (검색 함수의 조건식과 같은 식이어야 색인을 사용함)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS submitted_items_search_idx
+    ON submitted_items USING gin (
+        lower(item_name || ' ' || coalesce(option_name, '') || ' ' || coalesce(purchase_link, '') || ' ' || username)
+        gin_trgm_ops
+    );
+
+-- 최근 순 정렬 + 짧은 검색어 대체 경로 (ORDER BY와 같은 순서)
+CREATE INDEX IF NOT EXISTS submitted_items_recent_idx
+    ON submitted_items (submitted_date DESC, id DESC);
+
+-- Step 2: 검색 함수 (품목 + 소속 신청 건의 품목 수 / 총액)
+-- 검색어 개수만큼 조건을 붙인 쿼리를 EXECUTE로 실행 → 실제 검색어 기준으로 계획을 세워 색인을 사용
+-- ($1: LIKE 패턴 배열, $2: p_limit, $3: 소문자 검색어 배열)
+CREATE OR REPLACE FUNCTION search_submitted_items(
+    p_query TEXT,
+    p_limit INTEGER DEFAULT 200
+)
+RETURNS TABLE (
+    id BIGINT,
+    batch_id TEXT,
+    username TEXT,
+    item_name TEXT,
+    option_name TEXT,
+    purchase_link TEXT,
+    quantity BIGINT,
+    unit_price BIGINT,
+    total_price BIGINT,
+    submitted_date TIMESTAMPTZ,
+    status TEXT,
+    batch_item_count BIGINT,
+    batch_total_amount BIGINT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    v_terms TEXT[];
+    v_patterns TEXT[];
+    v_where TEXT := '';
+    -- 색인과 같은 식
+    v_document CONSTANT TEXT := 'lower(i.item_name || '' '' || coalesce(i.option_name, '''') || '' '' || '
+                                'coalesce(i.purchase_link, '''') || '' '' || i.username)';
+BEGIN
+    -- 검색어별 LIKE 패턴 (%, _, \는 글자 그대로 찾도록 이스케이프)
+    SELECT array_agg(lower(term)),
+           array_agg('%' || replace(replace(replace(lower(term), '\', '\\'), '%', '\%'), '_', '\_') || '%')
+    INTO v_terms, v_patterns
+    FROM regexp_split_to_table(btrim(coalesce(p_query, '')), '\s+') AS term
+    WHERE term <> '';
+
+    IF v_terms IS NULL THEN
+        RETURN;
+    END IF;
+
+    FOR i IN 1 .. array_length(v_terms, 1) LOOP
+        IF char_length(v_terms[i]) >= 3 THEN
+            v_where := v_where || format(' AND %s LIKE $1[%s]', v_document, i);
+        ELSE
+            -- 3글자 미만: trigram 색인을 쓰지 않는 조건 (위 설명 참고)
+            v_where := v_where || format(' AND strpos(%s, $3[%s]) > 0', v_document, i);
+        END IF;
+    END LOOP;
+
+    RETURN QUERY EXECUTE
+        'SELECT i.id::BIGINT, i.batch_id::TEXT, i.username::TEXT, i.item_name::TEXT, '
+        '       i.option_name::TEXT, i.purchase_link::TEXT, i.quantity::BIGINT, i.unit_price::BIGINT, '
+        '       i.total_price::BIGINT, i.submitted_date::TIMESTAMPTZ, i.status::TEXT, '
+        '       s.item_count::BIGINT, s.total_amount::BIGINT '
+        'FROM submitted_items i '
+        'LEFT JOIN submission_summary s ON s.batch_id = i.batch_id '
+        'WHERE TRUE' || v_where || ' '
+        'ORDER BY i.submitted_date DESC, i.id DESC '
+        'LIMIT $2'
+    USING v_patterns, p_limit, v_terms;
+END;
+$$;
+
+-- Step 3: 서비스 역할만 호출 가능
+REVOKE ALL ON FUNCTION search_submitted_items(TEXT, INTEGER) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION search_submitted_items(TEXT, INTEGER) TO service_role;
+
+-- ✅ 완료!
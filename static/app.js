@@ -0,0 +1,67 @@
+// ============================================
+// Streamlit 배지 제거 (app.py에서 세션당 1번 불러옴)
+// ============================================
+// 예전에는 500ms마다 모든 div에 getComputedStyle을 호출했지만,
+// 여기서는 처음에 한 번 훑고 이후에는 새로 추가된 요소만 MutationObserver로 확인함.
+(function () {
+    if (window.__gymBadgeObserver) {
+        return;
+    }
+
+    // 모든 가능한 배지 셀렉터
+    const BADGE_SELECTOR = [
+        '[data-testid="stStatusWidget"]',
+        '[data-testid="stCommunityCloudBadge"]',
+        'div[class*="viewerBadge"]',
+        'div[class*="ViewerBadge"]',
+        'div[class*="badge"]',
+        'div[class*="Badge"]',
+        'a[href*="streamlit.io"]',
+        'button[kind="header"]'
+    ].join(',');
+
+    // 우측 하단에 고정된 작은 요소인지 (stApp이나 중요한 컨테이너는 제외)
+    function isCornerWidget(div) {
+        const style = window.getComputedStyle(div);
+        if (style.position !== 'fixed' && style.position !== 'absolute') {
+            return false;
+        }
+        const bottom = style.bottom;
+        const right = style.right;
+        return bottom !== 'auto' && right !== 'auto' &&
+            parseInt(bottom) < 100 && parseInt(right) < 100 &&
+            !div.className.includes('stApp') &&
+            !div.className.includes('main') &&
+            div.offsetHeight < 200 && div.offsetWidth < 200;
+    }
+
+    function removeBadgesIn(root) {
+        root.querySelectorAll(BADGE_SELECTOR).forEach(el => el.remove());
+    }
+
+    // 처음 한 번: 이미 있는 요소 전체 확인
+    removeBadgesIn(document);
+    document.querySelectorAll('div').forEach(div => {
+        if (isCornerWidget(div)) {
+            div.remove();
+        }
+    });
+
+    // 이후: 새로 추가된 요소만 확인
+    const observer = new MutationObserver(mutations => {
+        for (const mutation of mutations) {
+            for (const node of mutation.addedNodes) {
+                if (node.nodeType !== Node.ELEMENT_NODE) {
+                    continue;
+                }
+                if (node.matches(BADGE_SELECTOR) || (node.tagName === 'DIV' && isCornerWidget(node))) {
+                    node.remove();
+                    continue;
+                }
+                removeBadgesIn(node);
+            }
+        }
+    });
+    observer.observe(document.body, { childList: true, subtree: true });
+    window.__gymBadgeObserver = observer;
+})();
@@ -0,0 +1,72 @@
+-- ============================================
+-- 물품신청받기 앱 신청 제출 함수 (submit_cart_batch)
+-- ============================================
+-- 품목 일괄 추가 + 요약 추가 + 제출된 장바구니 항목 삭제를 하나의 트랜잭션으로 처리
+-- p_items의 각 항목에는 pending_cart의 client_id / id가 함께 들어 있음
+-- (제출 화면을 그린 뒤 다른 탭에서 담겨 저장된 항목은 지우지 않음)
+-- utils/database.py의 submit_cart()에서 .rpc()로 호출
+
+-- Step 1: 중복 제출 방지용 멱등성 키
+ALTER TABLE submission_summary ADD COLUMN IF NOT EXISTS idempotency_key TEXT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS submission_summary_idempotency_key_idx
+    ON submission_summary (idempotency_key);
+
+-- Step 2: 제출 함수
+CREATE OR REPLACE FUNCTION submit_cart_batch(
+    p_username TEXT,
+    p_batch_id TEXT,
+    p_idempotency_key TEXT,
+    p_items JSONB
+)
+RETURNS TEXT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_batch_id TEXT;
+BEGIN
+    -- 같은 키의 동시 호출은 순서대로 처리
+    PERFORM pg_advisory_xact_lock(hashtext(p_idempotency_key));
+
+    -- 이미 처리된 키면 기존 batch_id 반환 (더블클릭 등)
+    SELECT batch_id INTO v_batch_id
+    FROM submission_summary
+    WHERE idempotency_key = p_idempotency_key;
+
+    IF FOUND THEN
+        RETURN v_batch_id;
+    END IF;
+
+    -- submitted_items 일괄 추가 (submitted_date, status는 DEFAULT)
+    INSERT INTO submitted_items
+        (username, batch_id, item_name, purchase_link, option_name, quantity, unit_price, total_price)
+    SELECT p_username, p_batch_id, x.item_name, x.purchase_link, x.option_name, x.quantity, x.unit_price, x.total_price
+    FROM jsonb_to_recordset(p_items) AS x(
+        item_name TEXT,
+        purchase_link TEXT,
+        option_name TEXT,
+        quantity INTEGER,
+        unit_price INTEGER,
+        total_price INTEGER
+    );
+
+    -- submission_summary 요약 추가
+    INSERT INTO submission_summary (username, batch_id, item_count, total_amount, idempotency_key)
+    SELECT p_username, p_batch_id, COUNT(*), COALESCE(SUM(x.total_price), 0), p_idempotency_key
+    FROM jsonb_to_recordset(p_items) AS x(total_price INTEGER);
+
+    -- 제출된 항목만 pending_cart에서 삭제 (client_id로, client_id가 없는 예전 항목은 id로)
+    DELETE FROM pending_cart c
+    USING jsonb_to_recordset(p_items) AS x(id BIGINT, client_id TEXT)
+    WHERE c.username = p_username
+      AND (c.client_id = x.client_id OR c.id = x.id);
+
+    RETURN p_batch_id;
+END;
+$$;
+
+-- Step 3: 서비스 역할만 호출 가능
+REVOKE ALL ON FUNCTION submit_cart_batch(TEXT, TEXT, TEXT, JSONB) FROM PUBLIC;
+GRANT EXECUTE ON FUNCTION submit_cart_batch(TEXT, TEXT, TEXT, JSONB) TO service_role;
+
+-- ✅ 완료!
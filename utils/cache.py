@@ -0,0 +1,197 @@
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+# ============================================
+# 키 단위 무효화가 가능한 프로세스 캐시
+# ============================================
+# st.cache_data는 .clear()가 모든 사용자의 항목을 지우므로,
+# 한 사용자가 장바구니에 담을 때마다 다른 세션도 전부 DB를 다시 조회하게 됨.
+# 여기서는 함수 인자(username 등)별로 항목을 관리해서 바뀐 사용자만 무효화함.
+#
+# 주의: 캐시된 값은 복사하지 않고 그대로 돌려주므로 호출하는 쪽에서 수정하면 안 됨.
+#
+# 키마다 세대(generation)를 두고 invalidate/expire/clear 때마다 올림.
+# 계산을 시작할 때의 세대와 저장할 때의 세대가 다르면 저장하지 않음
+# (무효화 전에 읽은 이전 내용이 무효화 뒤에 캐시되어 TTL 동안 남지 않도록).
+
+# 이름별 캐시 목록 (통계 조회용)
+_caches = {}
+
+class KeyedCache:
+    """TTL + 최대 개수(LRU) 제한이 있는 키-값 캐시"""
+
+    def __init__(self, name, ttl, max_entries=1000):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (저장 시각, 값)
+        self._generations = {}  # key -> 무효화 횟수 (한 번도 무효화되지 않은 키는 없음)
+        self._epoch = 0  # clear() 횟수
+        self._lock = threading.Lock()
+
+    def lookup(self, key):
+        """(유효 여부, 값) 반환
+
+        만료됐지만 남아 있는 항목은 (False, 이전 값)으로 돌려줘서
+        증분 갱신(refresh)에 쓸 수 있게 함. 항목이 없으면 (False, None).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry[0] < self.ttl:
+                self.hits += 1
+                return True, entry[1]
+            self.misses += 1
+            return False, entry[1]
+
+    def has(self, key):
+        """만료 여부와 상관없이 항목이 남아 있는지"""
+        with self._lock:
+            return key in self._entries
+
+    def peek(self, key):
+        """만료 여부와 상관없이 남아 있는 값 (없으면 None, 통계에 포함 안 됨)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[1] if entry is not None else None
+
+    def generation(self, key):
+        """키의 현재 세대 (계산을 시작하기 전에 읽어서 set()에 넘김)"""
+        with self._lock:
+            return self._epoch, self._generations.get(key, 0)
+
+    def _bump(self, key):
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def set(self, key, value, generation=None):
+        """값 저장 (개수 초과 시 가장 오래 안 쓴 항목부터 제거)
+
+        generation: 계산을 시작할 때의 세대. 그 사이 무효화됐으면 저장하지 않고 False 반환.
+        """
+        with self._lock:
+            if generation is not None and generation != (self._epoch, self._generations.get(key, 0)):
+                return False
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def invalidate(self, key):
+        """해당 키만 삭제 (다음 조회 시 전체 재조회)"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._bump(key)
+
+    def expire(self, key):
+        """값은 남겨두고 만료 처리 (다음 조회 시 증분 갱신)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (float('-inf'), entry[1])
+            self._bump(key)
+
+    def clear(self):
+        """전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._epoch += 1
+
+    def reset_stats(self):
+        """hit/miss 횟수 초기화 (항목은 유지)"""
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """hit/miss 통계"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries)
+            }
+
+def _make_key(signature, args, kwargs):
+    """함수 인자로 캐시 키 생성 (위치 인자/키워드 인자/기본값 어느 쪽으로 넘겨도 같은 키)"""
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return tuple(bound.arguments.values())
+
+def keyed_cache(ttl, max_entries=1000, refresh=None):
+    """함수 결과를 인자별로 캐시하는 데코레이터
+
+    refresh(이전 값, *args, **kwargs)를 주면 만료된 항목은 전체 재조회 대신
+    refresh로 증분 갱신함. 전체 재조회는 invalidate()/clear() 후에만 일어남.
+
+    사용 예:
+        @keyed_cache(ttl=30)
+        def load_saved_cart(username): ...
+
+        load_saved_cart.invalidate(username)  # 해당 사용자만 무효화
+        load_saved_cart.expire(username)      # 해당 사용자만 증분 갱신 대상으로
+        load_saved_cart.clear()               # 전체 무효화
+        load_saved_cart.peek(username)        # 만료됐어도 남아 있는 값 (저장소 장애 시 대체용)
+    """
+    def decorator(func):
+        cache = KeyedCache(func.__name__, ttl, max_entries)
+        _caches[func.__name__] = cache
+        signature = inspect.signature(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = _make_key(signature, args, kwargs)
+            fresh, value = cache.lookup(key)
+            if fresh:
+                return value
+            generation = cache.generation(key)
+            if refresh is not None and cache.has(key):
+                value = refresh(value, *args, **kwargs)
+            else:
+                value = func(*args, **kwargs)
+            # 계산하는 동안 무효화됐으면 이번 호출에만 쓰고 캐시하지 않음
+            cache.set(key, value, generation)
+            return value
+
+        def invalidate(*args, **kwargs):
+            cache.invalidate(_make_key(signature, args, kwargs))
+
+        def expire(*args, **kwargs):
+            cache.expire(_make_key(signature, args, kwargs))
+
+        def peek(*args, **kwargs):
+            return cache.peek(_make_key(signature, args, kwargs))
+
+        wrapper.invalidate = invalidate
+        wrapper.expire = expire
+        wrapper.peek = peek
+        wrapper.clear = cache.clear
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+def get_cache_stats():
+    """모든 캐시의 hit/miss 통계 {함수 이름: {...}}"""
+    return {name: cache.stats() for name, cache in _caches.items()}
+
+def reset_cache_stats():
+    """모든 캐시의 hit/miss 횟수 초기화"""
+    for cache in _caches.values():
+        cache.reset_stats()
+
+def clear_caches():
+    """모든 캐시 비우기 (벤치마크/테스트용)"""
+    for cache in _caches.values():
+        cache.clear()
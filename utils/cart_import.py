@@ -0,0 +1,171 @@
+import csv
+
+# ============================================
+# 장바구니 입력 검사 (여러 품목 한 번에 담기 / 표에서 수정)
+# ============================================
+# 엑셀/구글 시트에서 복사한 행(탭 구분)이나 CSV 파일을 한 번에 검사해서
+# 올바른 행은 장바구니 행으로, 잘못된 행은 줄 번호와 이유로 돌려줌.
+# 열 순서: 이름, 링크, 옵션명, 총수량, 1개당 금액 (첫 줄이 제목이면 제목으로 열을 찾음)
+#
+# 장바구니 표(st.data_editor)에서 편집한 내용도 같은 규칙으로 검사하고,
+# 처음 불러온 장바구니와 비교해서 바뀐 행만 돌려줌 (diff_cart_edits).
+
+# 열 이름 → 장바구니 필드 (제목 줄 인식용, 공백 제거 / 소문자로 비교)
+COLUMN_ALIASES = {
+    'item_name': ('이름', '품목', '품목명', 'name', 'item', 'item_name'),
+    'purchase_link': ('링크', '구매링크', 'link', 'url', 'purchase_link'),
+    'option_name': ('옵션', '옵션명', '옵션명(정확하게)', 'option', 'option_name'),
+    'quantity': ('수량', '총수량', 'quantity', 'qty'),
+    'unit_price': ('금액', '단가', '개당금액', '1개당금액', '1개당금액(배송비제외)', 'price', 'unit_price'),
+}
+
+# 제목 줄이 없을 때의 열 순서 (입력 폼과 같은 순서)
+DEFAULT_COLUMNS = ['item_name', 'purchase_link', 'option_name', 'quantity', 'unit_price']
+
+# 사용자가 입력하는 필드 (total_price는 수량 × 금액으로 계산)
+EDITABLE_FIELDS = ['item_name', 'purchase_link', 'option_name', 'quantity', 'unit_price']
+
+# 한 번에 담을 수 있는 최대 행 수
+MAX_ROWS = 200
+
+def parse_amount(text):
+    """'15,000' 같은 숫자 문자열을 정수로 변환 (콤마/공백 제거, 숫자가 아니면 ValueError)"""
+    return int(str(text).replace(',', '').strip())
+
+def _to_int(value):
+    """표(숫자 칸)의 값 또는 문자열을 정수로 (소수면 ValueError)"""
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    if isinstance(value, int):
+        return value
+    return parse_amount(value)
+
+def _is_blank(value):
+    # 표의 빈 칸은 None 또는 NaN
+    return value is None or value != value or str(value).strip() == ''
+
+def validate_cart_row(item_name, purchase_link, option_name, quantity, unit_price):
+    """입력 폼과 같은 규칙으로 검사: (장바구니 행, None) 또는 (None, 오류 메시지)
+
+    이름/링크/수량/금액 필수, 수량/금액은 콤마를 뺀 정수.
+    """
+    if any(_is_blank(value) for value in (item_name, purchase_link, quantity, unit_price)):
+        return None, "필수 항목(이름, 링크, 총수량, 금액)이 비어 있습니다."
+    try:
+        quantity = _to_int(quantity)
+        unit_price = _to_int(unit_price)
+    except ValueError:
+        return None, "수량과 금액은 숫자만 입력해주세요."
+
+    return {
+        'item_name': str(item_name).strip(),
+        'purchase_link': str(purchase_link).strip(),
+        'option_name': '' if _is_blank(option_name) else str(option_name).strip(),
+        'quantity': quantity,
+        'unit_price': unit_price,
+        'total_price': quantity * unit_price,
+    }, None
+
+def decode_upload(data):
+    """업로드된 CSV 바이트를 문자열로 (UTF-8, 안 되면 엑셀 기본 저장 형식인 CP949)"""
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return data.decode('cp949')
+
+def _split_rows(text):
+    """텍스트를 행 목록으로 (탭이 있으면 시트 붙여넣기, 없으면 CSV)"""
+    lines = [line for line in text.splitlines() if line.strip()]
+    if not lines:
+        return []
+    if any('\t' in line for line in lines):
+        return [line.split('\t') for line in lines]
+    return list(csv.reader(lines))
+
+def _header_columns(row):
+    """제목 줄이면 열 번호 → 필드 딕셔너리, 아니면 None"""
+    columns = {}
+    for index, cell in enumerate(row):
+        name = cell.strip().lower().replace(' ', '')
+        for field, aliases in COLUMN_ALIASES.items():
+            if name in aliases:
+                columns[field] = index
+    return columns if 'item_name' in columns and 'quantity' in columns else None
+
+def parse_cart_lines(text):
+    """붙여넣은 행 / CSV 내용 검사
+
+    반환: (장바구니 행 목록, [(줄 번호, 오류 메시지, 원래 행), ...])
+    원래 행은 탭으로 이어 붙인 내용이라 고쳐서 다시 붙여넣을 수 있음.
+    입력 폼과 같은 규칙: 이름/링크/수량/금액 필수, 수량/금액은 콤마를 뺀 정수.
+    """
+    rows = _split_rows(text)
+    if not rows:
+        return [], []
+
+    columns = _header_columns(rows[0])
+    first_line = 1
+    if columns is None:
+        columns = {field: index for index, field in enumerate(DEFAULT_COLUMNS)}
+    else:
+        rows = rows[1:]
+        first_line = 2
+
+    items, errors = [], []
+    for index, row in enumerate(rows):
+        line = first_line + index
+        if index >= MAX_ROWS:
+            errors.append((line, f"한 번에 최대 {MAX_ROWS}개까지 담을 수 있습니다. "
+                                 f"이 줄부터 {len(rows) - index}개 행은 다시 나눠서 넣어주세요.", '\t'.join(row)))
+            break
+
+        def cell(field):
+            index = columns.get(field)
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        item, error = validate_cart_row(*(cell(field) for field in EDITABLE_FIELDS))
+        if error:
+            errors.append((line, error, '\t'.join(row)))
+        else:
+            items.append(item)
+    return items, errors
+
+def diff_cart_edits(items, edits):
+    """장바구니 표 편집 내용을 처음 불러온 장바구니와 비교
+
+    items: 표를 그릴 때 쓴 load_pending_cart의 행 (표의 행 번호 = 목록 순서)
+    edits: st.data_editor의 세션 상태 {'edited_rows', 'added_rows', 'deleted_rows'}
+    반환: (추가할 행, 수정된 행, 삭제할 항목, [(표의 행 번호, 오류 메시지), ...])
+    값이 실제로 바뀌지 않은 행은 수정된 행에 넣지 않음.
+    """
+    deleted = {int(index) for index in edits.get('deleted_rows', [])}
+    removed = [items[index] for index in sorted(deleted)]
+
+    updated, errors = [], []
+    for index, changes in edits.get('edited_rows', {}).items():
+        index = int(index)
+        if index in deleted:
+            continue
+        item = items[index]
+        row, error = validate_cart_row(*(changes.get(field, item[field]) for field in EDITABLE_FIELDS))
+        if error:
+            errors.append((index + 1, error))
+            continue
+        # 저장된 값도 같은 규칙으로 맞춘 뒤 비교 (옵션 None ↔ '' 등은 변경이 아님)
+        original, _ = validate_cart_row(*(item[field] for field in EDITABLE_FIELDS))
+        if row != original:
+            updated.append(dict(item, **row))
+
+    added = []
+    for offset, values in enumerate(edits.get('added_rows', [])):
+        if all(_is_blank(values.get(field)) for field in EDITABLE_FIELDS):
+            continue  # 추가만 하고 비워 둔 행
+        row, error = validate_cart_row(*(values.get(field) for field in EDITABLE_FIELDS))
+        if error:
+            errors.append((len(items) + offset + 1, error))
+        else:
+            added.append(row)
+
+    return added, updated, removed, errors
@@ -0,0 +1,173 @@
+import threading
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# ============================================
+# 품목 카탈로그 (이전에 신청한 품목 자동완성)
+# ============================================
+# 지금까지 제출된 submitted_items를 구매 링크 + 옵션 기준으로 합쳐서
+# 마지막 이름/링크/옵션/단가와 신청 횟수를 메모리에 보관함.
+# 이름/옵션의 글자 2개 조각(bigram) 색인으로 찾으므로 항목이 수천 개여도 검색은 수 마이크로초.
+#
+# 처음 사용할 때 한 번만 저장소를 훑어서 만들고(ensure_loaded),
+# 이후에는 신청이 제출될 때 제출된 품목만 더함(add) → 다시 훑지 않음.
+# 훑는 동안 제출된 품목은 모아 두었다가 다 훑은 뒤 반영함 (훑기에 이미 들어간 행은 빼고).
+
+# 검색 결과 최대 개수
+DEFAULT_LIMIT = 8
+
+def normalize_link(link):
+    """구매 링크 비교용 정규화
+
+    앞뒤 공백, 스킴/호스트 대소문자, # 이후, utm_* 추적 파라미터, 끝의 /는 무시.
+    """
+    parts = urlsplit((link or '').strip())
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_')
+    ])
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), query, ''))
+
+def normalize_option(option):
+    """옵션명 비교용 정규화 (대소문자, 연속 공백 무시)"""
+    return ' '.join((option or '').split()).lower()
+
+def _search_text(text):
+    """검색용 문자열 (소문자, 공백 제거)"""
+    return ''.join((text or '').split()).lower()
+
+def _grams(text):
+    """색인 조각: 1글자면 그 글자, 아니면 연속된 2글자 조각들"""
+    if len(text) < 2:
+        return {text} if text else set()
+    return {text[i:i + 2] for i in range(len(text) - 1)}
+
+def _row_key(row):
+    """scan 행과 add() 행이 같은 품목인지 비교하는 키"""
+    return (row.get('batch_id'), row['item_name'], row['purchase_link'], row['option_name'] or '')
+
+class CatalogEntry:
+    """같은 구매 링크 + 옵션으로 신청된 품목 (표시 값은 가장 최근 신청 기준)"""
+
+    __slots__ = ('item_name', 'purchase_link', 'option_name', 'unit_price', 'count', 'last_date', 'search_text')
+
+    def __init__(self):
+        self.count = 0
+        self.search_text = ''
+
+class ItemCatalog:
+    """구매 링크 + 옵션별 품목 목록 + 검색 색인 (프로세스 전체에서 공유)"""
+
+    def __init__(self):
+        self._entries = {}  # (정규화 링크, 정규화 옵션) -> CatalogEntry
+        self._index = {}    # 조각 -> 항목 키 집합 (조각 1개 / 2개 모두)
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()  # 만들기는 한 번에 하나만 (검색/추가는 막지 않음)
+        self._loaded = False
+        self._pending = None  # 만드는 동안 add()로 들어온 행 (만드는 중이 아니면 None)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def ensure_loaded(self, scan):
+        """처음 한 번만 scan()이 돌려주는 submitted_items 행으로 카탈로그 생성
+
+        scan은 _lock 밖에서 실행하므로 그동안 검색/추가가 기다리지 않음.
+        scan 도중 add()로 들어온 행은 scan에 없는 것만 마지막에 반영함
+        (같은 batch_id의 같은 품목 개수만큼 scan에 있으면 이미 읽은 것으로 봄).
+        scan 도중 오류가 나면 아무것도 반영하지 않고 다음 호출에서 다시 시도함.
+        """
+        if self._loaded:
+            return
+        with self._load_lock:
+            if self._loaded:
+                return
+            with self._lock:
+                self._pending = []
+            try:
+                rows = list(scan())
+            except Exception:
+                with self._lock:
+                    self._pending = None
+                raise
+
+            with self._lock:
+                pending, self._pending = self._pending, None
+                pending_batch_ids = {row.get('batch_id') for row in pending}
+                scanned = Counter(
+                    _row_key(row) for row in rows if row.get('batch_id') in pending_batch_ids
+                )
+                for row in rows:
+                    self._add_row(row)
+                for row in pending:
+                    key = _row_key(row)
+                    if scanned[key]:
+                        scanned[key] -= 1
+                        continue
+                    self._add_row(row)
+                self._loaded = True
+
+    def add(self, rows):
+        """새로 제출된 품목 반영 (rows에 batch_id 포함)
+
+        만드는 중이면 모아 두었다가 다 만든 뒤 반영함 (제출이 카탈로그 생성을 기다리지 않음).
+        아직 만들기 시작하지 않았으면 무시 → 만들 때 저장소에서 함께 읽음.
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.extend(rows)
+                return
+            if not self._loaded:
+                return
+            for row in rows:
+                self._add_row(row)
+
+    def _add_row(self, row):
+        """행 1개 반영 (행은 제출 순서대로 들어온다고 보고 표시 값을 덮어씀)"""
+        key = (normalize_link(row['purchase_link']), normalize_option(row['option_name']))
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = CatalogEntry()
+        old_text = entry.search_text
+
+        entry.item_name = row['item_name']
+        entry.purchase_link = row['purchase_link']
+        entry.option_name = row['option_name'] or ''
+        entry.unit_price = row['unit_price']
+        entry.last_date = row.get('submitted_date')
+        entry.count += 1
+        entry.search_text = _search_text(f"{entry.item_name} {entry.option_name}")
+
+        # 이름/옵션이 바뀐 경우에만 색인 갱신
+        if entry.search_text != old_text:
+            for gram in _grams(old_text) | set(old_text):
+                keys = self._index.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+            for gram in _grams(entry.search_text) | set(entry.search_text):
+                self._index.setdefault(gram, set()).add(key)
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """이름/옵션에 query가 들어 있는 품목 (이름이 query로 시작하는 것 → 신청 횟수 → 최근 순)"""
+        text = _search_text(query)
+        if not text:
+            return []
+        with self._lock:
+            postings = [self._index.get(gram) for gram in _grams(text)]
+            if not postings or any(keys is None for keys in postings):
+                return []
+            # 작은 집합부터 교집합 (조각이 모두 들어 있어도 순서가 다를 수 있으므로 마지막에 확인)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for keys in postings[1:]:
+                candidates &= keys
+                if not candidates:
+                    return []
+            matches = [
+                entry for entry in (self._entries[key] for key in candidates)
+                if text in entry.search_text
+            ]
+        # 최근 순으로 정렬한 뒤(안정 정렬) 이름 시작 일치 / 신청 횟수 순으로 다시 정렬
+        matches.sort(key=lambda entry: entry.last_date or '', reverse=True)
+        matches.sort(key=lambda entry: (not entry.search_text.startswith(text), -entry.count))
+        return matches[:limit]
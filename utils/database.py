@@ -1,25 +1,209 @@
 import streamlit as st
-from supabase import create_client, Client
-from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+import os
 import uuid
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from utils.cache import keyed_cache
+from utils.catalog import DEFAULT_LIMIT, ItemCatalog
+from utils.local_backend import LocalClient
+from utils.metrics import instrument, record_error
+from utils.outbox import CartOutbox, FlushWorker
+from utils.resilience import CircuitBreaker, CircuitOpenError, ResilientClient, is_transient
 
-# Supabase 클라이언트 (싱글톤)
-_supabase_client: Client = None
+# 동시 조회 시 최대 스레드 수
+_MAX_CONCURRENT_FETCHES = 4
+
+# 요청 1회 제한 시간(초), 일시적 오류 재시도 횟수 기본값 (secrets [supabase] timeout / retries)
+_DEFAULT_TIMEOUT = 10
+_DEFAULT_RETRIES = 2
+
+# 연속 실패 횟수 / 차단 시간(초): 이 횟수만큼 연속 실패하면 차단 시간 동안 저장소를 호출하지 않음
+_BREAKER_FAILURE_THRESHOLD = 5
+_BREAKER_RESET_TIMEOUT = 30
+
+# 재시도해도 중복 처리되지 않는 RPC
+# submit_cart_batch는 idempotency_key로 중복 제출 방지, spend_* / search_submitted_items는 조회 전용
+_IDEMPOTENT_RPCS = (
+    "submit_cart_batch", "spend_by_user", "spend_by_month", "spend_by_item", "search_submitted_items"
+)
+
+# 증분 갱신 때 high-water mark보다 이만큼 앞선 시각부터 다시 조회
+# (제출 트랜잭션이 시작 시각 순서와 다르게 커밋되는 경우 대비, 제출 RPC 제한 시간보다 넉넉하게)
+_HISTORY_LOOKBACK = timedelta(minutes=5)
+
+# 저장소가 한 번에 돌려주는 최대 행 수 (Supabase/PostgREST 기본 max-rows, 넘는 행은 오류 없이 잘림)
+_MAX_ROWS = 1000
+
+# in_("batch_id", ...) 한 번에 넣는 batch_id 수 (요청 URL 길이 제한)
+_BATCH_ID_CHUNK = 100
+
+# 장바구니 outbox 한 번에 보낼 최대 변경 수
+_OUTBOX_BATCH_SIZE = 500
+
+# 장바구니 outbox 기본 파일 (Supabase 저장소용, 앱 폴더, .gitignore의 *.db)
+_DEFAULT_OUTBOX_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cart_outbox.db")
+
+# 직접 지정한 클라이언트 (벤치마크/부하 테스트용, 없으면 _create_client 결과 사용)
+_supabase_client = None
+
+def _storage_settings():
+    """저장소 설정 (환경변수 STORAGE_BACKEND/SQLITE_PATH가 secrets [storage]보다 우선)"""
+    backend = os.environ.get("STORAGE_BACKEND")
+    sqlite_path = os.environ.get("SQLITE_PATH")
+    if backend is None:
+        try:
+            storage = st.secrets.get("storage", {})
+        except FileNotFoundError:
+            storage = {}
+        backend = storage.get("backend", "supabase")
+        sqlite_path = sqlite_path or storage.get("sqlite_path")
+    return backend, sqlite_path or ":memory:"
+
+@st.cache_resource(show_spinner=False)  # 프로세스 전체에서 1개만 생성 (모든 세션 공유)
+def _create_client(backend, sqlite_path):
+    """저장소 클라이언트 생성 (재시도 + 서킷 브레이커 래퍼 포함)"""
+    if backend == "local":
+        # 오프라인 개발/벤치마크용 SQLite 저장소
+        client = LocalClient(sqlite_path)
+        retries = _DEFAULT_RETRIES
+    else:
+        # supabase/httpx는 import가 느려서(약 0.5초) 실제로 클라이언트를 만들 때 불러옴
+        import httpx
+        from supabase import create_client
+        from supabase.lib.client_options import SyncClientOptions
+
+        settings = st.secrets["supabase"]
+        url = settings["url"]
+        # service_role_key 사용 (RLS 정책 적용)
+        service_role_key = settings["service_role_key"]
+        timeout = float(settings.get("timeout", _DEFAULT_TIMEOUT))
+        retries = int(settings.get("retries", _DEFAULT_RETRIES))
+
+        # keep-alive 연결을 재사용하는 HTTP 클라이언트 (기본 설정은 제한 시간 120초)
+        http_client = httpx.Client(
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=60),
+            follow_redirects=True,
+            http2=True
+        )
+        client = create_client(url, service_role_key, options=SyncClientOptions(httpx_client=http_client))
+
+    return ResilientClient(
+        client,
+        CircuitBreaker(_BREAKER_FAILURE_THRESHOLD, _BREAKER_RESET_TIMEOUT),
+        retries=retries,
+        idempotent_rpcs=_IDEMPOTENT_RPCS
+    )
 
 def get_supabase_client():
     """Supabase 클라이언트 가져오기"""
+    if _supabase_client is not None:
+        return _supabase_client
+    return _create_client(*_storage_settings())
+
+def _storage_id():
+    """outbox가 변경을 보낼 저장소 구분 값 (직접 지정한 클라이언트면 None)"""
+    if _supabase_client is not None:
+        return None
+    backend, sqlite_path = _storage_settings()
+    if backend == "local":
+        return f"local:{os.path.abspath(sqlite_path) if sqlite_path != ':memory:' else sqlite_path}"
+    return f"supabase:{st.secrets['supabase']['url']}"
+
+def _outbox_path():
+    """장바구니 outbox 파일 경로 (저장소마다 따로 둠, 환경변수 CART_OUTBOX_PATH가 있으면 그 경로)
+
+    - 직접 지정한 클라이언트 / 메모리 저장소(로컬 :memory:): 메모리
+      (저장소보다 오래 남은 변경이 새 저장소로 보내지지 않도록)
+    - 로컬 SQLite 파일: 그 파일 옆 (local.db → local.cart_outbox.db)
+    - Supabase: secrets [storage] outbox_path, 없으면 앱 폴더의 cart_outbox.db
+    로컬 저장소의 변경이 Supabase용 outbox에 쌓였다가 운영 저장소로 보내지지 않도록
+    로컬 저장소는 outbox_path / 기본 파일을 쓰지 않음.
+    """
+    path = os.environ.get("CART_OUTBOX_PATH")
+    if path:
+        return path
+    if _supabase_client is not None:
+        return ":memory:"
+    backend, sqlite_path = _storage_settings()
+    if backend == "local":
+        if sqlite_path == ":memory:":
+            return ":memory:"
+        return os.path.splitext(sqlite_path)[0] + ".cart_outbox.db"
+    try:
+        path = st.secrets.get("storage", {}).get("outbox_path")
+    except FileNotFoundError:
+        path = None
+    return path or _DEFAULT_OUTBOX_PATH
+
+@st.cache_resource(show_spinner=False)  # 프로세스 전체에서 1개만 생성 (모든 세션 공유)
+def _create_outbox(path, storage):
+    """장바구니 outbox + 전송 작업자 생성 (이전 실행에서 남은 변경도 바로 전송 시작)
+
+    storage: 저장소 구분 값. 파일에 다른 저장소가 기록돼 있으면 ValueError (변경을 엉뚱한 저장소로 보내지 않음)
+    """
+    outbox = CartOutbox(path, storage=storage)
+    worker = FlushWorker(lambda: flush_cart_outbox(outbox)).start()
+    return outbox, worker
+
+def _get_outbox():
+    """(outbox, 작업자)"""
+    return _create_outbox(_outbox_path(), _storage_id())
+
+def get_backend_health():
+    """서킷 브레이커 상태 {'state': closed/open/half_open, 'failures': 연속 실패 수} (진단 화면용)"""
+    breaker = getattr(get_supabase_client(), 'breaker', None)
+    if breaker is None:
+        return None
+    return {'state': breaker.state, 'failures': breaker.failures}
+
+_STALE_MESSAGE = "저장소 연결이 불안정해 이전에 불러온 내용을 표시합니다. ({error})"
+
+def _serve_stale(cached_func, *args, error=None):
+    """저장소 오류 시 캐시에 남아 있는 이전 값을 돌려줌 (없으면 None)
+
+    돌려준 값은 다시 캐시되므로 TTL 동안은 저장소를 다시 호출하지 않음.
+    """
+    stale = cached_func.peek(*args)
+    if stale is not None:
+        st.warning(_STALE_MESSAGE.format(error=error))
+    return stale
+
+def set_supabase_client(client):
+    """사용할 클라이언트를 직접 지정 (벤치마크/부하 테스트에서 기록용 클라이언트 주입)"""
     global _supabase_client
-    if _supabase_client is None:
-        url = st.secrets["supabase"]["url"]
-        # service_role_key 사용 (RLS 정책 적용)
-        service_role_key = st.secrets["supabase"]["service_role_key"]
-        _supabase_client = create_client(url, service_role_key)
-    return _supabase_client
+    _supabase_client = client
+
+def fetch_concurrently(calls):
+    """서로 독립적인 조회 함수들을 동시에 실행하고 결과를 순서대로 반환
+
+    calls: [(함수, args 튜플, kwargs 딕셔너리), ...]
+    조회 함수 안의 st.error가 동작하도록 현재 스크립트 컨텍스트를 스레드에 붙임.
+    """
+    if len(calls) <= 1:
+        return [func(*args, **kwargs) for func, args, kwargs in calls]
+
+    ctx = get_script_run_ctx()
+
+    def run(call):
+        func, args, kwargs = call
+        return func(*args, **kwargs)
+
+    def attach_ctx():
+        if ctx is not None:
+            add_script_run_ctx(ctx=ctx)
+
+    with ThreadPoolExecutor(max_workers=min(len(calls), _MAX_CONCURRENT_FETCHES),
+                            initializer=attach_ctx) as executor:
+        return list(executor.map(run, calls))
 
 # ============================================
 # 인증 관련 함수
 # ============================================
 
+@instrument
 def login(username, password):
     """사용자 로그인"""
     try:
@@ -41,6 +225,7 @@ def login(username, password):
             }
 
     except Exception as e:
+        record_error()
         return {
             'success': False,
             'message': f'로그인 중 오류가 발생했습니다: {str(e)}'
@@ -56,9 +241,15 @@ def logout():
 # 장바구니 (pending_cart) 관련 함수
 # ============================================
 
-@st.cache_data(ttl=30)  # 30초 동안 캐시
-def load_pending_cart(username):
-    """사용자의 장바구니 불러오기"""
+# 담기/삭제는 로컬 outbox(utils/outbox.py)에 먼저 기록하고 바로 응답함.
+# 저장소(pending_cart)에는 백그라운드 작업자가 묶어서 보냄 (flush_cart_outbox).
+# 화면에는 저장소 내용 + 아직 안 보낸 변경을 합쳐서 보여줌 (load_pending_cart).
+# 장바구니 항목은 client_id로 식별 (cart_outbox.sql 이전에 담긴 항목은 client_id 없이 id만 있음).
+
+@keyed_cache(ttl=30)  # 30초 동안 캐시 (인자별로 무효화 가능)
+@instrument
+def load_saved_cart(username):
+    """저장소(pending_cart)에 저장된 장바구니 불러오기 (outbox의 변경은 제외)"""
     try:
         supabase = get_supabase_client()
 
@@ -75,113 +266,370 @@ def load_pending_cart(username):
             return []
 
     except Exception as e:
+        record_error()
+        stale = _serve_stale(load_saved_cart, username, error=e)
+        if stale is not None:
+            return stale
         st.error(f"장바구니 불러오기 오류: {str(e)}")
         return []
 
+def load_pending_cart(username):
+    """사용자의 장바구니 불러오기 (저장된 항목 + 아직 저장소로 안 보낸 변경)"""
+    saved = load_saved_cart(username)
+    adds, removed_client_ids, removed_ids = _get_outbox()[0].pending(username)
+    if not adds and not removed_client_ids and not removed_ids:
+        return saved
+
+    # 같은 항목(client_id)이 저장소와 outbox 양쪽에 있으면 outbox 내용(최신 수정)을 사용
+    latest = {row['client_id']: row for row in adds if row['client_id'] not in removed_client_ids}
+    cart = []
+    for item in saved:
+        if item.get('client_id') in removed_client_ids or item.get('id') in removed_ids:
+            continue
+        row = latest.pop(item.get('client_id'), None)
+        cart.append(dict(row, id=item['id']) if row is not None else item)
+    cart.extend(dict(row, id=None) for row in latest.values())
+    return cart
+
+@instrument
 def add_to_pending_cart(username, item_name, purchase_link, option_name, quantity, unit_price, total_price):
-    """장바구니에 품목 추가"""
+    """장바구니에 품목 추가 (outbox에 기록 후 바로 반환, 저장소 전송은 백그라운드)"""
     try:
-        supabase = get_supabase_client()
+        outbox, worker = _get_outbox()
 
         data = {
-            "username": username,
             "item_name": item_name,
             "purchase_link": purchase_link,
             "option_name": option_name,
             "quantity": quantity,
             "unit_price": unit_price,
             "total_price": total_price
-            # added_date는 DB에서 자동 설정 (DEFAULT NOW())
+            # username / client_id / added_date는 outbox에서 채움
         }
 
-        response = supabase.table("pending_cart").insert(data).execute()
+        row = outbox.add(username, data)
+        worker.notify()
 
-        # 캐시 무효화
-        load_pending_cart.clear()
+        return {'success': True, 'item': row}
 
-        return {'success': True}
+    except Exception as e:
+        record_error()
+        return {
+            'success': False,
+            'message': f'장바구니 추가 오류: {str(e)}'
+        }
+
+@instrument
+def add_many_to_pending_cart(username, items):
+    """여러 품목을 한 번에 장바구니에 추가 (여러 품목 한 번에 담기)
+
+    items: utils/cart_import.parse_cart_lines의 행 목록.
+    outbox에 한 트랜잭션으로 기록하고, 저장소에는 다른 담기와 함께 upsert 한 번으로 전송됨.
+    """
+    try:
+        outbox, worker = _get_outbox()
+        rows = outbox.add_many(username, items)
+        worker.notify()
+
+        return {'success': True, 'count': len(rows)}
 
     except Exception as e:
+        record_error()
         return {
             'success': False,
             'message': f'장바구니 추가 오류: {str(e)}'
         }
 
-def remove_from_pending_cart(username, item_index):
-    """장바구니에서 품목 삭제"""
+@instrument
+def save_cart_changes(username, added=(), updated=(), removed=()):
+    """장바구니 표에서 편집한 내용 저장 (바뀐 행만, 한 번에)
+
+    added: 새 행 (품목 필드만), updated: load_pending_cart의 행에 새 값을 덮어쓴 행,
+    removed: load_pending_cart의 행. outbox에 한 트랜잭션으로 기록하고,
+    저장소에는 추가/수정은 upsert 한 번, 삭제는 delete 한 번으로 전송됨.
+    """
     try:
-        supabase = get_supabase_client()
+        outbox, worker = _get_outbox()
+        outbox.apply_changes(username, added=added, updated=updated, removed=removed)
+        worker.notify()
 
-        # 사용자의 항목 먼저 조회
-        response = supabase.table("pending_cart")\
-            .select("id")\
-            .eq("username", username)\
-            .order("added_date", desc=False)\
-            .execute()
+        return {'success': True, 'count': len(added) + len(updated) + len(removed)}
+
+    except Exception as e:
+        record_error()
+        return {
+            'success': False,
+            'message': f'장바구니 저장 오류: {str(e)}'
+        }
 
-        if response.data and len(response.data) > item_index:
-            item_id = response.data[item_index]['id']
+def remove_from_pending_cart(username, item):
+    """장바구니에서 품목 삭제 (item: load_pending_cart의 행)"""
+    return clear_pending_cart(username, [item])
 
-            # 해당 항목 삭제
-            supabase.table("pending_cart").delete().eq("id", item_id).execute()
+@instrument
+def clear_pending_cart(username, items=None):
+    """장바구니 품목 일괄 삭제 (outbox에 기록 후 바로 반환)
 
-            # 캐시 무효화
-            load_pending_cart.clear()
+    items: load_pending_cart의 행 목록. 없으면 현재 장바구니 전체.
+    저장소에서는 username 조건을 항상 함께 적용하므로 다른 사용자의 항목은 지워지지 않음.
+    """
+    try:
+        if items is None:
+            items = load_pending_cart(username)
+        if not items:
+            return {'success': True}
+
+        outbox, worker = _get_outbox()
+        outbox.remove(username, items)
+        worker.notify()
 
         return {'success': True}
 
     except Exception as e:
+        record_error()
         st.error(f"삭제 오류: {str(e)}")
         return {'success': False}
 
+def _send_cart_adds(supabase, ops):
+    """추가/수정할 행들을 upsert 한 번으로 전송 (client_id 기준, 재전송해도 중복 없음)"""
+    # 같은 항목을 여러 번 수정했으면 마지막 내용만 (한 upsert 안에 같은 키가 두 번 있으면 안 됨)
+    rows = {op['client_id']: op['row'] for op in ops}
+    supabase.table("pending_cart")\
+        .upsert(list(rows.values()), on_conflict="client_id")\
+        .execute()
+
+def _send_cart_removes(supabase, username, ops):
+    """사용자 1명의 삭제를 client_id / id별로 delete 한 번씩 전송"""
+    client_ids = [op['client_id'] for op in ops if op['client_id']]
+    item_ids = [op['item_id'] for op in ops if not op['client_id']]
+    for column, values in (("client_id", client_ids), ("id", item_ids)):
+        if values:
+            supabase.table("pending_cart").delete().eq("username", username).in_(column, values).execute()
+
+@instrument
+def flush_cart_outbox(outbox=None, limit=_OUTBOX_BATCH_SIZE):
+    """outbox의 장바구니 변경을 저장소로 전송 (백그라운드 작업자가 호출, 벤치마크/테스트에서 직접 호출 가능)
+
+    추가는 모든 사용자 것을 upsert 한 번으로, 삭제는 사용자별 delete 한 번으로 묶어서 보냄.
+    추가 묶음이 일시적이지 않은 오류로 거부되면 한 행씩 다시 보내서 문제 행만 남김.
+    한 변경이 outbox.MAX_REJECTIONS번 거부되면 보류해서 더 보내지 않음 (화면에서 다시 시도 / 버리기).
+    반환: {'sent': 보낸 수, 'failed': 실패 수, 'remaining': 남은 변경이 있는지}
+    """
+    if outbox is None:
+        outbox = _get_outbox()[0]
+
+    with outbox.flush_lock:
+        ops = outbox.take(limit)
+        if not ops:
+            return {'sent': 0, 'failed': 0, 'remaining': False}
+
+        batches = []
+        adds = [op for op in ops if op['op'] == 'add']
+        if adds:
+            batches.append((adds, _send_cart_adds, ()))
+        removes_by_user = {}
+        for op in ops:
+            if op['op'] == 'remove':
+                removes_by_user.setdefault(op['username'], []).append(op)
+        for username, user_ops in removes_by_user.items():
+            batches.append((user_ops, _send_cart_removes, (username,)))
+
+        sent = failed = 0
+        try:
+            supabase = get_supabase_client()
+        except Exception as e:
+            record_error()
+            outbox.fail([op['seq'] for op in ops], e)
+            return {'sent': 0, 'failed': len(ops), 'remaining': True}
+
+        while batches:
+            batch, send, args = batches.pop(0)
+            try:
+                send(supabase, *args, batch)
+            except Exception as e:
+                record_error()
+                rejected = not isinstance(e, CircuitOpenError) and not is_transient(e)
+                if send is _send_cart_adds and len(batch) > 1 and rejected:
+                    batches[:0] = [([op], send, args) for op in batch]
+                    continue
+                outbox.fail([op['seq'] for op in batch], e, rejected=rejected)
+                failed += len(batch)
+                continue
+
+            # 캐시 비우기 → outbox에서 삭제 → 다시 비우기
+            # 두 번째 무효화로 세대가 바뀌므로, 전송 전에 저장소를 읽고 있던 조회는 결과를 캐시하지 않음
+            # (전송 전 내용이 캐시되어 outbox에서 빠진 항목이 TTL 동안 사라져 보이지 않도록)
+            usernames = {op['username'] for op in batch}
+            for username in usernames:
+                load_saved_cart.invalidate(username)
+            outbox.complete([op['seq'] for op in batch])
+            for username in usernames:
+                load_saved_cart.invalidate(username)
+            sent += len(batch)
+
+        return {'sent': sent, 'failed': failed, 'remaining': failed == 0 and len(ops) == limit}
+
+def get_cart_outbox_status():
+    """장바구니 outbox 상태 (진단 화면용)"""
+    return _get_outbox()[0].stats()
+
+@instrument
+def get_rejected_cart_changes(username):
+    """저장소가 거부해서 보류된 장바구니 변경 (outbox.rejected 참고)"""
+    try:
+        return _get_outbox()[0].rejected(username)
+
+    except Exception as e:
+        record_error()
+        st.error(f"보류된 변경 불러오기 오류: {str(e)}")
+        return []
+
+@instrument
+def retry_rejected_cart_changes(username, seqs):
+    """보류된 변경을 다시 전송"""
+    try:
+        outbox, worker = _get_outbox()
+        outbox.retry_rejected(username, seqs)
+        worker.notify()
+        return {'success': True}
+
+    except Exception as e:
+        record_error()
+        st.error(f"다시 보내기 오류: {str(e)}")
+        return {'success': False}
+
+@instrument
+def discard_rejected_cart_changes(username, seqs):
+    """보류된 변경 버리기"""
+    try:
+        _get_outbox()[0].discard_rejected(username, seqs)
+        return {'success': True}
+
+    except Exception as e:
+        record_error()
+        st.error(f"버리기 오류: {str(e)}")
+        return {'success': False}
+
+# ============================================
+# 품목 카탈로그 (이전에 신청한 품목 자동완성)
+# ============================================
+
+# 카탈로그를 처음 만들 때 한 번에 읽는 submitted_items 행 수 (id 순서로 이어서 읽음)
+_CATALOG_SCAN_PAGE = _MAX_ROWS
+
+@st.cache_resource(show_spinner=False)  # 프로세스 전체에서 1개만 생성 (모든 세션 공유)
+def _create_item_catalog(storage):
+    """빈 품목 카탈로그 (storage: 저장소 구분용 키, 저장소가 바뀌면 새로 만듦)"""
+    return ItemCatalog()
+
+def _get_item_catalog():
+    storage = id(_supabase_client) if _supabase_client is not None else _storage_settings()
+    return _create_item_catalog(storage)
+
+def _scan_catalog_rows():
+    """카탈로그용 submitted_items 전체 (필요한 컬럼만, id 기준으로 나눠서 조회)"""
+    supabase = get_supabase_client()
+    last_id = 0
+    while True:
+        rows = supabase.table("submitted_items")\
+            .select("id,batch_id,item_name,purchase_link,option_name,unit_price,submitted_date")\
+            .gt("id", last_id)\
+            .order("id", desc=False)\
+            .limit(_CATALOG_SCAN_PAGE)\
+            .execute().data or []
+        yield from rows
+        if len(rows) < _CATALOG_SCAN_PAGE:
+            return
+        last_id = rows[-1]['id']
+
+@instrument
+def load_item_catalog():
+    """품목 카탈로그 준비 (처음 한 번만 저장소 조회, warm-up에서 미리 호출)"""
+    try:
+        catalog = _get_item_catalog()
+        catalog.ensure_loaded(_scan_catalog_rows)
+        return catalog
+
+    except Exception as e:
+        record_error()
+        st.error(f"품목 목록 불러오기 오류: {str(e)}")
+        return None
+
+@instrument
+def search_item_catalog(query, limit=DEFAULT_LIMIT):
+    """이전에 신청한 품목 중 이름/옵션에 query가 들어 있는 것 (CatalogEntry 목록)"""
+    catalog = load_item_catalog()
+    if catalog is None:
+        return []
+    return catalog.search(query, limit)
+
 # ============================================
 # 신청 제출 관련 함수
 # ============================================
 
-def submit_cart(username, cart_items):
-    """장바구니 품목들을 제출"""
+@instrument
+def submit_cart(username, cart_items, idempotency_key=None):
+    """장바구니 품목들을 제출
+
+    품목 추가, 요약 추가, 제출된 장바구니 항목 삭제를 submit_cart_batch RPC 한 번으로 처리
+    (submit_cart.sql 참고). 화면을 그린 뒤 다른 탭에서 담긴 항목은 장바구니에 남음. 같은 idempotency_key로 다시 호출하면 새 batch를 만들지 않고
+    기존 batch_id를 돌려줌.
+    """
     try:
         supabase = get_supabase_client()
 
         batch_id = str(uuid.uuid4())[:8]
-        submitted_date = datetime.now().isoformat()
+        if idempotency_key is None:
+            idempotency_key = str(uuid.uuid4())
 
-        # submitted_items 테이블에 추가
-        for item in cart_items:
-            item_data = {
-                "username": username,
+        items = [
+            {
                 "item_name": item['item_name'],
                 "purchase_link": item['purchase_link'],
                 "option_name": item['option_name'],
                 "quantity": item['quantity'],
                 "unit_price": item['unit_price'],
                 "total_price": item['total_price'],
-                "batch_id": batch_id
-                # submitted_date와 status는 DB에서 자동 설정
+                # 저장소에서 지울 pending_cart 행 (outbox에만 있는 항목은 id 없음)
+                "client_id": item.get('client_id'),
+                "id": item.get('id')
             }
-            supabase.table("submitted_items").insert(item_data).execute()
-
-        # submission_summary 테이블에 요약 추가
-        total_amount = sum(item['total_price'] for item in cart_items)
-        summary_data = {
-            "username": username,
-            "item_count": len(cart_items),
-            "total_amount": total_amount,
-            "batch_id": batch_id
-            # submitted_date는 DB에서 자동 설정
-        }
-        supabase.table("submission_summary").insert(summary_data).execute()
+            for item in cart_items
+        ]
 
-        # pending_cart에서 사용자 항목 모두 삭제
-        supabase.table("pending_cart").delete().eq("username", username).execute()
+        # 제출은 저장소에서 제출된 항목을 지우므로, 그 사이 outbox 전송이 끼어들어
+        # 제출된 항목을 다시 추가하지 않도록 전송 잠금을 잡고 처리
+        outbox = _get_outbox()[0]
+        with outbox.flush_lock:
+            response = supabase.rpc("submit_cart_batch", {
+                "p_username": username,
+                "p_batch_id": batch_id,
+                "p_idempotency_key": idempotency_key,
+                "p_items": items
+            }).execute()
+            outbox.discard_submitted(username, cart_items)
 
-        # 캐시 무효화
-        load_pending_cart.clear()
-        get_submission_history.clear()
+        # 품목 카탈로그에 제출된 품목만 더함 (저장소를 다시 훑지 않음)
+        submitted_date = datetime.now(timezone.utc).isoformat()
+        _get_item_catalog().add([
+            dict(item, batch_id=response.data, submitted_date=submitted_date) for item in items
+        ])
 
-        return {'success': True}
+        # 캐시 무효화 (해당 사용자 + 관리자 전체내역)
+        # 내역은 추가만 되므로 만료 처리만 해서 새 batch만 증분 조회
+        load_saved_cart.invalidate(username)
+        get_submission_history.expire(username)
+        get_all_submission_history.expire()
+        get_submission_history_page.clear()
+        get_spend_by_user.clear()
+        get_spend_by_month.clear()
+        get_spend_by_item.clear()
+        search_submitted_items.clear()
+
+        return {'success': True, 'batch_id': response.data}
 
     except Exception as e:
+        record_error()
         return {
             'success': False,
             'message': f'제출 오류: {str(e)}'
@@ -191,117 +639,436 @@ def submit_cart(username, cart_items):
 # 내역 조회 관련 함수
 # ============================================
 
-@st.cache_data(ttl=30)  # 30초 동안 캐시
-def get_submission_history(username):
-    """사용자의 신청 내역 조회"""
-    try:
-        supabase = get_supabase_client()
+# pandas는 import가 느려서(약 0.6초) 로그인 화면에는 필요 없으므로 내역을 만들 때 불러옴
+# 신청 내역은 batch별 dict 목록 대신 표 2개로 보관
+# summaries: batch_id 인덱스, 최신순 (username, submitted_date, submit_date_label, item_count, total_amount)
+# items: 품목 1행씩, 추가된 순서 (batch_id, item_name, purchase_link, option_name, quantity, unit_price, total_price)
+# 캐시된 값을 그대로 돌려주므로 화면 쪽에서 수정하면 안 됨
+History = namedtuple('History', ['summaries', 'items'])
+
+SUMMARY_COLUMNS = ['batch_id', 'username', 'submitted_date', 'item_count', 'total_amount']
+ITEM_COLUMNS = ['batch_id', 'item_name', 'purchase_link', 'option_name', 'quantity', 'unit_price', 'total_price']
+
+def format_submit_dates(submitted_dates):
+    """날짜 Series 일괄 변환: 2025-12-18 11:17:16 → 2025년 12월 18일 오전 11시 17분"""
+    return submitted_dates.dt.strftime("%Y년 %m월 %d일 %p %I시 %M분")\
+        .str.replace('AM', '오전')\
+        .str.replace('PM', '오후')
+
+def _to_history(summaries, items):
+    """조회 결과(행 목록)를 History 표로 변환 (날짜는 여기서 한 번만 파싱)"""
+    import pandas as pd
+
+    summaries_df = pd.DataFrame(summaries, columns=SUMMARY_COLUMNS)
+    summaries_df['submitted_date'] = pd.to_datetime(summaries_df['submitted_date'], format='ISO8601')
+    summaries_df['submit_date_label'] = format_submit_dates(summaries_df['submitted_date'])
+    summaries_df = summaries_df.set_index('batch_id')
+
+    items_df = pd.DataFrame(items, columns=ITEM_COLUMNS)
+    items_df['option_name'] = items_df['option_name'].fillna('')
+
+    return History(summaries_df, items_df)
+
+def concat_history(histories):
+    """History 여러 개를 순서대로 이어 붙이기"""
+    import pandas as pd
+
+    histories = list(histories)
+    if not histories:
+        return _to_history([], [])
+    return History(
+        pd.concat([history.summaries for history in histories]),
+        pd.concat([history.items for history in histories], ignore_index=True)
+    )
+
+def _select_all(build_query):
+    """조건에 맞는 행 전체를 id 순서로 _MAX_ROWS개씩 나눠서 조회
+
+    build_query: 필터까지 붙인 select 쿼리를 새로 만드는 함수 (페이지마다 호출, "id" 컬럼 포함)
+    왕복 횟수는 행 수 / _MAX_ROWS + 1 (다 찬 페이지만 추가로 늘어남).
+    """
+    rows, last_id = [], 0
+    while True:
+        page = build_query()\
+            .gt("id", last_id)\
+            .order("id", desc=False)\
+            .limit(_MAX_ROWS)\
+            .execute().data or []
+        rows.extend(page)
+        if len(page) < _MAX_ROWS:
+            return rows
+        last_id = page[-1]['id']
 
-        # submission_summary에서 사용자의 요약 정보 조회
-        summary_response = supabase.table("submission_summary")\
+def _select_by_batch_ids(table, batch_ids):
+    """table에서 batch_id가 batch_ids에 든 행 전체 (id 순서)
+
+    batch_id를 _BATCH_ID_CHUNK개씩 나눠서(요청 URL 길이 제한) 각각 id 순서로 끝까지 읽음.
+    """
+    supabase = get_supabase_client()
+    batch_ids = list(batch_ids)
+    rows = []
+    for start in range(0, len(batch_ids), _BATCH_ID_CHUNK):
+        chunk = batch_ids[start:start + _BATCH_ID_CHUNK]
+        rows.extend(_select_all(lambda: supabase.table(table).select("*").in_("batch_id", chunk)))
+    # 나눠 읽은 묶음끼리도 id 순서로
+    if len(batch_ids) > _BATCH_ID_CHUNK:
+        rows.sort(key=lambda row: row['id'])
+    return rows
+
+def _load_history(username=None):
+    """신청 요약과 품목을 한 번에 불러와 batch_id 기준으로 묶기
+
+    요약 / 품목을 각각 id 순서로 나눠서 조회하므로 왕복 횟수는 batch 수가 아니라
+    행 수 / _MAX_ROWS에 비례함 (저장소의 최대 행 수 제한에 걸려 잘리지 않음).
+    username이 없으면 전체 사용자(관리자용)를 조회.
+    """
+    supabase = get_supabase_client()
+
+    def select(table):
+        query = supabase.table(table).select("*")
+        return query.eq("username", username) if username is not None else query
+
+    summaries = _select_all(lambda: select("submission_summary"))
+    if not summaries:
+        return _to_history([], [])
+
+    items = _select_all(lambda: select("submitted_items"))
+
+    # id 순서로 받았으므로 최신순으로 정렬 (같은 시각은 id 순서 유지)
+    history = _to_history(summaries, items)
+    return history._replace(
+        summaries=history.summaries.sort_values('submitted_date', ascending=False, kind='stable')
+    )
+
+def _load_history_since(history, username=None):
+    """캐시된 내역 이후에 새로 제출된 batch만 조회해서 앞에 붙이기
+
+    제출 내역은 추가만 되므로, 가장 최근 submitted_date(high-water mark)에서
+    _HISTORY_LOOKBACK만큼 앞선 시각 이후의 요약만 다시 조회하고 이미 가진 batch는 버림.
+    submitted_date는 트랜잭션 시작 시각(NOW())이라 동시에 제출된 batch가 시각 순서와 다르게
+    커밋될 수 있으므로, high-water mark보다 이른 시각으로 늦게 커밋된 batch도 놓치지 않게 함.
+    새 batch가 없으면 요약 1회 조회로 끝남.
+    """
+    if history.summaries.empty:
+        return _load_history(username)
+
+    supabase = get_supabase_client()
+
+    high_water_mark = history.summaries['submitted_date'].max()
+    since = high_water_mark - _HISTORY_LOOKBACK
+
+    def build_summary_query():
+        query = supabase.table("submission_summary")\
             .select("*")\
-            .eq("username", username)\
-            .order("submitted_date", desc=True)\
-            .execute()
+            .gte("submitted_date", since.isoformat())
+        if username is not None:
+            query = query.eq("username", username)
+        return query
 
-        if not summary_response.data:
-            return []
+    # 새 batch가 최대 행 수보다 많아도 빠지지 않도록 id 순서로 나눠서 조회
+    # (빠진 batch는 high-water mark가 지나가면 전체 재조회 전까지 다시 보이지 않음)
+    known_batch_ids = history.summaries.index
+    new_summaries = [
+        summary for summary in _select_all(build_summary_query)
+        if summary['batch_id'] not in known_batch_ids
+    ]
+    if not new_summaries:
+        return history
 
-        history = []
-
-        for summary in summary_response.data:
-            batch_id = summary['batch_id']
-
-            # 해당 batch_id의 submitted_items 조회
-            items_response = supabase.table("submitted_items")\
-                .select("*")\
-                .eq("batch_id", batch_id)\
-                .execute()
-
-            batch_items = []
-            if items_response.data:
-                batch_items = [
-                    {
-                        'item_name': item['item_name'],
-                        'purchase_link': item['purchase_link'],
-                        'option_name': item['option_name'],
-                        'quantity': item['quantity'],
-                        'unit_price': item['unit_price'],
-                        'total_price': item['total_price']
-                    }
-                    for item in items_response.data
-                ]
-
-            history.append({
-                'submitted_date': summary['submitted_date'],
-                'item_count': summary['item_count'],
-                'total_amount': summary['total_amount'],
-                'batch_id': batch_id,
-                'items': batch_items
-            })
+    new_batch_ids = [summary['batch_id'] for summary in new_summaries]
+    items = _select_by_batch_ids("submitted_items", new_batch_ids)
+
+    # 늦게 커밋된 batch는 기존 batch보다 이른 시각일 수 있으므로 최신순으로 다시 정렬
+    merged = concat_history([_to_history(new_summaries, items), history])
+    return merged._replace(
+        summaries=merged.summaries.sort_values('submitted_date', ascending=False, kind='stable')
+    )
+
+@instrument
+def _refresh_submission_history(history, username):
+    """get_submission_history 증분 갱신 (실패 시 기존 내역 유지)"""
+    try:
+        return _load_history_since(history, username)
 
+    except Exception as e:
+        record_error()
+        st.warning(_STALE_MESSAGE.format(error=e))
         return history
 
+@keyed_cache(ttl=30, refresh=_refresh_submission_history)  # 30초 후 새 내역만 추가 조회
+@instrument
+def get_submission_history(username):
+    """사용자의 신청 내역 조회"""
+    try:
+        return _load_history(username)
+
     except Exception as e:
+        record_error()
+        stale = _serve_stale(get_submission_history, username, error=e)
+        if stale is not None:
+            return stale
         st.error(f"내역 조회 오류: {str(e)}")
-        return []
+        return _to_history([], [])
 
 # ============================================
 # 관리자 전용: 전체 내역 조회
 # ============================================
 
-@st.cache_data(ttl=30)  # 30초 동안 캐시
-def get_all_submission_history():
-    """모든 사용자의 신청 내역 조회 (관리자용)"""
+HISTORY_PAGE_SIZE = 20
+
+@keyed_cache(ttl=30)  # 30초 동안 캐시 (인자별로 무효화 가능)
+@instrument
+def get_submission_history_page(cursor=None, page_size=HISTORY_PAGE_SIZE, username=None,
+                                date_from=None, date_to=None, min_amount=None, max_amount=None):
+    """신청 내역 한 페이지 조회 (관리자용)
+
+    (submitted_date, batch_id) 내림차순 커서로 페이지를 넘김.
+    cursor는 이전 페이지의 'next_cursor' 값이며, None이면 첫 페이지.
+    date_from/date_to는 날짜(한국 시간 기준 포함 범위), min_amount/max_amount는 총금액 범위.
+
+    반환값: {'history': History, 'next_cursor': (submitted_date, batch_id) 또는 None}
+    """
     try:
         supabase = get_supabase_client()
 
-        # submission_summary에서 모든 요약 정보 조회 (최신순)
-        summary_response = supabase.table("submission_summary")\
-            .select("*")\
+        # 필터는 모두 서버에서 적용
+        query = supabase.table("submission_summary").select("*")
+        if username:
+            query = query.eq("username", username)
+        if date_from:
+            query = query.gte("submitted_date", _kst_midnight(date_from))
+        if date_to:
+            query = query.lt("submitted_date", _kst_midnight(date_to + timedelta(days=1)))
+        if min_amount is not None:
+            query = query.gte("total_amount", min_amount)
+        if max_amount is not None:
+            query = query.lte("total_amount", max_amount)
+
+        # 키셋 페이지네이션: 커서보다 오래된 행만
+        if cursor:
+            cursor_date, cursor_batch_id = cursor
+            query = query.or_(
+                f'submitted_date.lt."{cursor_date}",'
+                f'and(submitted_date.eq."{cursor_date}",batch_id.lt."{cursor_batch_id}")'
+            )
+
+        # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+        summary_response = query\
             .order("submitted_date", desc=True)\
+            .order("batch_id", desc=True)\
+            .limit(page_size + 1)\
             .execute()
 
-        if not summary_response.data:
-            return []
+        summaries = summary_response.data or []
+        next_cursor = None
+        if len(summaries) > page_size:
+            summaries = summaries[:page_size]
+            last = summaries[-1]
+            next_cursor = (last['submitted_date'], last['batch_id'])
+
+        if not summaries:
+            return {'history': _to_history([], []), 'next_cursor': None}
+
+        # 이 페이지의 품목만 조회 (보통 1번, 품목이 _MAX_ROWS개를 넘으면 나눠서)
+        page_batch_ids = [summary['batch_id'] for summary in summaries]
+        items = _select_all(lambda: supabase.table("submitted_items").select("*").in_("batch_id", page_batch_ids))
+
+        return {
+            'history': _to_history(summaries, items),
+            'next_cursor': next_cursor
+        }
 
-        history = []
-
-        for summary in summary_response.data:
-            batch_id = summary['batch_id']
-            username = summary['username']
-
-            # 해당 batch_id의 submitted_items 조회
-            items_response = supabase.table("submitted_items")\
-                .select("*")\
-                .eq("batch_id", batch_id)\
-                .execute()
-
-            batch_items = []
-            if items_response.data:
-                batch_items = [
-                    {
-                        'item_name': item['item_name'],
-                        'purchase_link': item['purchase_link'],
-                        'option_name': item['option_name'],
-                        'quantity': item['quantity'],
-                        'unit_price': item['unit_price'],
-                        'total_price': item['total_price']
-                    }
-                    for item in items_response.data
-                ]
-
-            history.append({
-                'username': username,  # 사용자 이름 추가
-                'submitted_date': summary['submitted_date'],
-                'item_count': summary['item_count'],
-                'total_amount': summary['total_amount'],
-                'batch_id': batch_id,
-                'items': batch_items
-            })
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(get_submission_history_page, cursor, page_size, username,
+                             date_from, date_to, min_amount, max_amount, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"전체 내역 조회 오류: {str(e)}")
+        return {'history': _to_history([], []), 'next_cursor': None}
+
+@instrument
+def _refresh_all_submission_history(history):
+    """get_all_submission_history 증분 갱신 (실패 시 기존 내역 유지)"""
+    try:
+        return _load_history_since(history)
 
+    except Exception as e:
+        record_error()
+        st.warning(_STALE_MESSAGE.format(error=e))
         return history
 
+@keyed_cache(ttl=30, refresh=_refresh_all_submission_history)  # 30초 후 새 내역만 추가 조회
+@instrument
+def get_all_submission_history():
+    """모든 사용자의 신청 내역 조회 (관리자용)"""
+    try:
+        return _load_history()
+
     except Exception as e:
+        record_error()
+        stale = _serve_stale(get_all_submission_history, error=e)
+        if stale is not None:
+            return stale
         st.error(f"전체 내역 조회 오류: {str(e)}")
-        return []
+        return _to_history([], [])
+
+@keyed_cache(ttl=300, max_entries=32)  # 다운로드용, 선택 조합별 캐시
+@instrument
+def get_submissions_by_batch_ids(batch_ids):
+    """지정한 batch_id들의 신청 내역 조회 (관리자 다운로드용)
+
+    batch_ids는 캐시 키로 쓰이므로 정렬된 tuple로 넘길 것.
+    batch_id를 _BATCH_ID_CHUNK개씩 나눠서(요청 URL 길이 제한) 각각 id 순서로 끝까지 읽으므로
+    선택한 품목이 많아도 최대 행 수 제한에 걸려 빠지지 않음.
+    """
+    try:
+        if not batch_ids:
+            return _to_history([], [])
+
+        summaries = _select_by_batch_ids("submission_summary", batch_ids)
+        # 품목은 제출 순서(id)대로
+        items = _select_by_batch_ids("submitted_items", batch_ids)
+
+        history = _to_history(summaries, items)
+        return history._replace(
+            summaries=history.summaries.sort_values('submitted_date', ascending=False, kind='stable')
+        )
+
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(get_submissions_by_batch_ids, batch_ids, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"다운로드 내역 조회 오류: {str(e)}")
+        return _to_history([], [])
+
+# ============================================
+# 관리자 전용: 지출 통계
+# ============================================
+# 집계는 DB 함수(analytics.sql)에서 하고 그룹당 1행만 받아오므로
+# 품목이 아무리 많아도 앱으로 오는 데이터는 사용자 수 / 월 수 / 상위 품목 수만큼만 커짐.
+
+SPEND_ITEM_LIMIT = 20
+
+SPEND_BY_USER_COLUMNS = ['username', 'batch_count', 'item_count', 'total_amount']
+SPEND_BY_MONTH_COLUMNS = ['month', 'batch_count', 'item_count', 'total_amount']
+SPEND_BY_ITEM_COLUMNS = ['item_name', 'request_count', 'user_count', 'quantity', 'total_amount']
+
+# 관리자가 고르는 날짜는 한국 시간 기준 (Asia/Seoul은 서머타임이 없어 +09:00 고정)
+_KST = timezone(timedelta(hours=9))
+
+def _kst_midnight(day):
+    """날짜의 한국 시간 0시 (ISO 문자열, +09:00)
+
+    날짜만 보내면 DB가 UTC 0시(한국 시간 오전 9시)로 해석하므로 시각까지 붙여서 보냄.
+    """
+    return datetime(day.year, day.month, day.day, tzinfo=_KST).isoformat()
+
+def _spend_range(date_from, date_to):
+    """기간(날짜, 포함 범위)을 통계 함수 인자로 변환 (한국 시간 date_from 0시 이상, date_to 다음날 0시 미만)"""
+    return {
+        "p_from": _kst_midnight(date_from) if date_from else None,
+        "p_to": _kst_midnight(date_to + timedelta(days=1)) if date_to else None
+    }
+
+def _load_spend(function_name, params, columns):
+    """통계 함수 호출 결과를 DataFrame으로 변환"""
+    import pandas as pd
+
+    supabase = get_supabase_client()
+    response = supabase.rpc(function_name, params).execute()
+    return pd.DataFrame(response.data or [], columns=columns)
+
+def _empty_spend(columns):
+    import pandas as pd
+
+    return pd.DataFrame([], columns=columns)
+
+@keyed_cache(ttl=300, max_entries=32)  # 5분 캐시, 신청 제출 시 전체 무효화
+@instrument
+def get_spend_by_user(date_from=None, date_to=None):
+    """사용자별 합계 (금액 내림차순)"""
+    try:
+        return _load_spend("spend_by_user", _spend_range(date_from, date_to), SPEND_BY_USER_COLUMNS)
+
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(get_spend_by_user, date_from, date_to, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"통계 조회 오류: {str(e)}")
+        return _empty_spend(SPEND_BY_USER_COLUMNS)
+
+@keyed_cache(ttl=300, max_entries=32)  # 5분 캐시, 신청 제출 시 전체 무효화
+@instrument
+def get_spend_by_month(date_from=None, date_to=None):
+    """월별 합계 (month는 한국 시간 기준 'YYYY-MM', 월 오름차순)"""
+    try:
+        return _load_spend("spend_by_month", _spend_range(date_from, date_to), SPEND_BY_MONTH_COLUMNS)
+
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(get_spend_by_month, date_from, date_to, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"통계 조회 오류: {str(e)}")
+        return _empty_spend(SPEND_BY_MONTH_COLUMNS)
+
+@keyed_cache(ttl=300, max_entries=32)  # 5분 캐시, 신청 제출 시 전체 무효화
+@instrument
+def get_spend_by_item(date_from=None, date_to=None, limit=SPEND_ITEM_LIMIT):
+    """품목별 합계 (품목명 앞뒤 공백 무시, 금액 상위 limit개)"""
+    try:
+        params = _spend_range(date_from, date_to)
+        params["p_limit"] = limit
+        return _load_spend("spend_by_item", params, SPEND_BY_ITEM_COLUMNS)
+
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(get_spend_by_item, date_from, date_to, limit, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"통계 조회 오류: {str(e)}")
+        return _empty_spend(SPEND_BY_ITEM_COLUMNS)
+
+# ============================================
+# 관리자 전용: 전체 품목 검색
+# ============================================
+# 검색은 DB 함수(search.sql, trigram 색인)에서 하고 최근 순 결과만 받아옴.
+# 로컬 저장소는 같은 함수를 프로세스 안의 단어 색인으로 처리함 (utils/local_backend.py).
+
+SEARCH_LIMIT = 200
+
+SEARCH_COLUMNS = [
+    'submitted_date', 'username', 'item_name', 'option_name', 'quantity', 'unit_price', 'total_price',
+    'purchase_link', 'status', 'batch_id', 'batch_item_count', 'batch_total_amount'
+]
+
+@keyed_cache(ttl=60, max_entries=64)  # 같은 검색어 1분 캐시, 신청 제출 시 전체 무효화
+@instrument
+def search_submitted_items(query, limit=SEARCH_LIMIT):
+    """이름 / 옵션 / 링크 / 신청자에 검색어(공백으로 구분)가 모두 들어 있는 품목 (최근 순 limit개)
+
+    submitted_date는 표시용 문자열(submit_date_label 형식)로 변환됨.
+    """
+    import pandas as pd
+
+    terms = ' '.join(query.split())
+    if not terms:
+        return pd.DataFrame([], columns=SEARCH_COLUMNS)
+    try:
+        supabase = get_supabase_client()
+        response = supabase.rpc("search_submitted_items", {"p_query": terms, "p_limit": limit}).execute()
+        df = pd.DataFrame(response.data or [], columns=SEARCH_COLUMNS)
+        df['submitted_date'] = format_submit_dates(pd.to_datetime(df['submitted_date'], format='ISO8601'))
+        df['option_name'] = df['option_name'].fillna('')
+        return df
+
+    except Exception as e:
+        record_error()
+        stale = _serve_stale(search_submitted_items, query, limit, error=e)
+        if stale is not None:
+            return stale
+        st.error(f"품목 검색 오류: {str(e)}")
+        return pd.DataFrame([], columns=SEARCH_COLUMNS)
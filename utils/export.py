@@ -0,0 +1,150 @@
+from utils.cache import keyed_cache
+from utils.catalog import normalize_link, normalize_option
+from utils.database import get_submissions_by_batch_ids
+from utils.metrics import instrument
+
+# 이 크기를 넘으면 임시 파일(디스크)로 넘어감
+_SPOOL_MAX_SIZE = 4 * 1024 * 1024
+
+# ============================================
+# 관리자 전용: 선택 항목 ZIP 다운로드
+# ============================================
+
+def _item_markdown(item, username, submit_date):
+    """품목 1개를 옵시디언용 .md 내용으로 변환"""
+    return f"""---
+품목명: {item.item_name}
+신청자: {username}
+요청일: {submit_date}
+구매링크: {item.purchase_link}
+옵션명: {item.option_name if item.option_name else ''}
+수량: {item.quantity}
+개당금액: {item.unit_price}
+신청일:
+상태: 리스트업
+---
+
+"""
+
+@keyed_cache(ttl=300, max_entries=4)  # 같은 선택 조합은 다시 압축하지 않음
+@instrument
+def build_selected_zip(batch_ids):
+    """선택한 batch_id들의 품목을 .md 파일로 묶은 ZIP(bytes) 생성
+
+    batch_ids는 캐시 키로 쓰이므로 정렬된 tuple로 넘길 것.
+    파일을 하나씩 압축해서 SpooledTemporaryFile에 쓰므로, 큰 내보내기는
+    메모리 대신 임시 파일에 쌓임.
+    """
+    # 다운로드할 때만 필요하므로 여기서 import (앱 시작 시간 단축)
+    import tempfile
+    import zipfile
+
+    history = get_submissions_by_batch_ids(batch_ids)
+    summaries = history.summaries
+
+    with tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as spool:
+        with zipfile.ZipFile(spool, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            # 품목 표를 batch별로 한 번에 나눠서 순회
+            for batch_id, batch_items in history.items.groupby('batch_id', sort=False):
+                if batch_id not in summaries.index:
+                    continue
+                username = summaries.at[batch_id, 'username']
+                submit_date = summaries.at[batch_id, 'submit_date_label']
+
+                for item_idx, item in enumerate(batch_items.itertuples(index=False), 1):
+                    with zip_file.open(f"{batch_id}_{item_idx}.md", 'w') as md_file:
+                        md_file.write(_item_markdown(item, username, submit_date).encode('utf-8'))
+
+        spool.seek(0)
+        return spool.read()
+
+# ============================================
+# 관리자 전용: 같은 품목 합치기 (구매 정리)
+# ============================================
+# 선택한 신청들의 품목을 구매 링크 + 옵션(카탈로그와 같은 정규화) 기준으로 묶어서
+# 한 번에 주문할 수량 / 금액과 신청자 목록을 보여줌.
+# 품목을 한 번만 훑으면서 딕셔너리에 더하므로 시간은 품목 수에 비례함.
+
+CONSOLIDATION_COLUMNS = [
+    'item_name', 'option_name', 'purchase_link', 'quantity', 'total_price',
+    'line_count', 'requester_count', 'requesters'
+]
+
+# CSV 제목 줄 (엑셀에서 바로 열 수 있게 한글)
+_CONSOLIDATION_HEADERS = ['품목명', '옵션명', '구매링크', '총수량', '총금액', '신청 품목 수', '신청자 수', '신청자']
+
+def _memoized(normalize):
+    """같은 값은 한 번만 정규화하는 함수 (링크/옵션은 품목 수보다 종류가 훨씬 적음)"""
+    results = {}
+
+    def lookup(value):
+        result = results.get(value)
+        if result is None:
+            result = results[value] = normalize(value)
+        return result
+    return lookup
+
+@keyed_cache(ttl=300, max_entries=4)  # 같은 선택 조합은 다시 계산하지 않음
+@instrument
+def build_consolidation(batch_ids):
+    """선택한 batch_id들의 품목을 같은 품목끼리 합친 표 (DataFrame, 신청자 많은 순 → 수량 많은 순)
+
+    표시하는 이름/링크/옵션은 가장 최근에 신청된 품목 기준.
+    requesters: '신청자 수량개' 목록 (처음 신청한 순서, 같은 사람이 여러 번 신청하면 수량을 더함)
+    batch_ids는 캐시 키로 쓰이므로 정렬된 tuple로 넘길 것.
+    불러온 신청 / 품목 수가 요약(submission_summary.item_count)과 다르면 ValueError
+    (조회 오류나 최대 행 수 제한으로 빠진 품목이 있는 표로 주문하지 않도록, 캐시되지 않음)
+    """
+    import pandas as pd
+
+    history = get_submissions_by_batch_ids(batch_ids)
+    expected_items = int(history.summaries['item_count'].sum())
+    if len(history.summaries) != len(batch_ids) or len(history.items) != expected_items:
+        raise ValueError(
+            f"선택한 신청 {len(batch_ids):,}건 중 {len(history.summaries):,}건, "
+            f"품목 {expected_items:,}개 중 {len(history.items):,}개만 불러왔습니다"
+        )
+    usernames = history.summaries['username'].to_dict()
+
+    link_key = _memoized(normalize_link)
+    option_key = _memoized(normalize_option)
+    items = history.items
+    columns = ['batch_id', 'item_name', 'purchase_link', 'option_name', 'quantity', 'total_price']
+
+    groups = {}
+    # 품목은 id 순서(제출 순서)로 들어오므로 나중 값이 가장 최근 신청
+    for batch_id, item_name, purchase_link, option_name, quantity, total_price in zip(
+        *(items[column].tolist() for column in columns)
+    ):
+        # 같은 품목 판단 기준 (링크가 없으면 품목명으로 구분)
+        key = (link_key(purchase_link), option_key(option_name))
+        if not key[0]:
+            key += (' '.join((item_name or '').split()).lower(),)
+
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {'quantity': 0, 'total_price': 0, 'line_count': 0, 'requesters': {}}
+        group['item_name'] = item_name
+        group['option_name'] = option_name
+        group['purchase_link'] = purchase_link
+        group['quantity'] += int(quantity)
+        group['total_price'] += int(total_price)
+        group['line_count'] += 1
+        username = usernames.get(batch_id, '')
+        group['requesters'][username] = group['requesters'].get(username, 0) + int(quantity)
+
+    rows = [
+        dict(
+            group,
+            requester_count=len(group['requesters']),
+            requesters=', '.join(f"{username} {quantity}개" for username, quantity in group['requesters'].items())
+        )
+        for group in groups.values()
+    ]
+    rows.sort(key=lambda row: (-row['requester_count'], -row['quantity'], row['item_name']))
+    return pd.DataFrame(rows, columns=CONSOLIDATION_COLUMNS)
+
+def build_consolidation_csv(batch_ids):
+    """합친 표를 CSV(bytes)로 (엑셀에서 한글이 깨지지 않도록 UTF-8 BOM 포함)"""
+    consolidated = build_consolidation(batch_ids)
+    return consolidated.to_csv(index=False, header=_CONSOLIDATION_HEADERS).encode('utf-8-sig')
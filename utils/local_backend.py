@@ -0,0 +1,601 @@
+import json
+import re
+import sqlite3
+import threading
+import bisect
+from datetime import datetime, timezone
+
+# ============================================
+# 로컬 저장소 (SQLite / 메모리)
+# ============================================
+# utils/database.py가 쓰는 Supabase 클라이언트 기능만 그대로 흉내 낸 로컬 구현.
+# 저장소 인터페이스 = 아래 메서드 체인 (supabase-py와 같은 이름/의미):
+#
+#   client.table(name).select(columns) / .insert(rows) / .upsert(rows, on_conflict) / .delete()
+#       .eq / .neq / .gt / .gte / .lt / .lte / .like / .ilike / .in_ / .or_
+#       .order(column, desc) / .limit(n)
+#       .execute()  → .data (행 목록)
+#   client.rpc(name, params).execute()  → .data
+#
+# Supabase와 같은 테이블/기본값(added_date, submitted_date, status)/정렬을 사용하므로
+# 오프라인 개발, 부하 테스트, 벤치마크에서 Supabase 대신 쓸 수 있음.
+
+# 테이블 정의 (Supabase 스키마와 동일한 컬럼)
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT NOT NULL,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pending_cart (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    item_name TEXT NOT NULL,
+    purchase_link TEXT,
+    option_name TEXT,
+    quantity INTEGER NOT NULL,
+    unit_price INTEGER NOT NULL,
+    total_price INTEGER NOT NULL,
+    added_date TEXT NOT NULL,
+    client_id TEXT
+);
+CREATE INDEX IF NOT EXISTS pending_cart_username_idx ON pending_cart (username, added_date);
+
+CREATE TABLE IF NOT EXISTS submitted_items (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    batch_id TEXT NOT NULL,
+    item_name TEXT NOT NULL,
+    purchase_link TEXT,
+    option_name TEXT,
+    quantity INTEGER NOT NULL,
+    unit_price INTEGER NOT NULL,
+    total_price INTEGER NOT NULL,
+    submitted_date TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS submitted_items_batch_id_idx ON submitted_items (batch_id);
+CREATE INDEX IF NOT EXISTS submitted_items_username_idx ON submitted_items (username);
+CREATE INDEX IF NOT EXISTS submitted_items_submitted_date_idx ON submitted_items (submitted_date);
+
+CREATE TABLE IF NOT EXISTS submission_summary (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    batch_id TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    total_amount INTEGER NOT NULL,
+    submitted_date TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS submission_summary_date_idx ON submission_summary (submitted_date, batch_id);
+CREATE INDEX IF NOT EXISTS submission_summary_username_idx ON submission_summary (username, submitted_date);
+"""
+
+# 예전에 만든 로컬 DB 파일에 없는 컬럼 추가 (테이블, 컬럼, 타입) + 이후 실행할 SQL
+MIGRATIONS = [
+    ('pending_cart', 'client_id', 'TEXT'),
+]
+POST_MIGRATION_SCHEMA = """
+CREATE UNIQUE INDEX IF NOT EXISTS pending_cart_client_id_key ON pending_cart (client_id);
+"""
+
+# select / rpc 한 번에 돌려주는 최대 행 수 (Supabase/PostgREST 기본 max-rows와 같음, 넘는 행은 잘림)
+DEFAULT_MAX_ROWS = 1000
+
+# 제출 직후 상태 (submitted_items.status 기본값)
+DEFAULT_STATUS = '리스트업'
+
+def _now():
+    """DB의 NOW()에 해당하는 ISO 시각 (UTC, 마이크로초까지)"""
+    return datetime.now(timezone.utc).isoformat(timespec='microseconds')
+
+# INSERT 시 값이 없으면 채우는 기본값 (Supabase의 DEFAULT와 동일)
+DEFAULTS = {
+    'pending_cart': {'added_date': _now},
+    'submitted_items': {'submitted_date': _now, 'status': lambda: DEFAULT_STATUS},
+    'submission_summary': {'submitted_date': _now},
+}
+
+# 테이블별 기본키 (upsert 기본 충돌 컬럼)
+PRIMARY_KEYS = {
+    'users': 'username',
+    'pending_cart': 'id',
+    'submitted_items': 'id',
+    'submission_summary': 'id',
+}
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_OPERATORS = {
+    'eq': '=',
+    'neq': '!=',
+    'gt': '>',
+    'gte': '>=',
+    'lt': '<',
+    'lte': '<=',
+    'like': 'LIKE',
+    'ilike': 'LIKE',  # SQLite LIKE는 ASCII 대소문자를 구분하지 않음
+}
+
+def _column(name):
+    """SQL에 넣을 컬럼/테이블 이름 검증"""
+    if not _IDENTIFIER.match(name):
+        raise ValueError(f"잘못된 컬럼 이름: {name}")
+    return f'"{name}"'
+
+def _normalize_value(column, value):
+    """시각 컬럼(*_date)의 ISO 문자열을 저장 형식(UTC, 마이크로초)으로 맞춤
+
+    저장값과 비교값의 형식이 같아야 문자열 비교가 시간 순서와 일치함.
+    날짜만 있는 값(2025-12-18)은 그대로 두면 접두사 비교로 동작함.
+    """
+    if column.endswith('_date') and isinstance(value, str) and 'T' in value:
+        dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(timezone.utc).isoformat(timespec='microseconds')
+    return value
+
+def _condition(column, op, value):
+    """(SQL 조각, 파라미터) 생성"""
+    if op == 'in':
+        values = [_normalize_value(column, v) for v in value]
+        if not values:
+            return '0', []
+        return f"{_column(column)} IN ({', '.join('?' * len(values))})", values
+    if op == 'is':
+        return f"{_column(column)} IS NULL" if value in (None, 'null') else f"{_column(column)} IS NOT NULL", []
+    if op in ('like', 'ilike'):
+        value = value.replace('*', '%')
+    return f"{_column(column)} {_OPERATORS[op]} ?", [_normalize_value(column, value)]
+
+def _split_top_level(text):
+    """쉼표로 나누되 괄호/따옴표 안의 쉼표는 무시"""
+    parts, depth, quoted, current = [], 0, False, ''
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(current)
+            current = ''
+            continue
+        current += char
+    if current:
+        parts.append(current)
+    return parts
+
+def _parse_logic(filters, joiner):
+    """PostgREST 논리 필터 문자열(or_/and 안쪽) → (SQL 조각, 파라미터)"""
+    clauses, params = [], []
+    for part in _split_top_level(filters):
+        part = part.strip()
+        group = re.match(r'^(and|or)\((.*)\)$', part)
+        if group:
+            sql, sub_params = _parse_logic(group.group(2), group.group(1).upper())
+        else:
+            column, op, value = part.split('.', 2)
+            if value.startswith('"') and value.endswith('"'):
+                value = value[1:-1]
+            if op == 'in':
+                value = [v.strip('"') for v in _split_top_level(value.strip('()'))]
+            sql, sub_params = _condition(column, op, value)
+        clauses.append(f"({sql})")
+        params.extend(sub_params)
+    return f" {joiner} ".join(clauses), params
+
+class LocalResponse:
+    """execute() 결과 (Supabase APIResponse와 같은 .data)"""
+
+    def __init__(self, data):
+        self.data = data
+
+class LocalQuery:
+    """table(name) 이후의 메서드 체인"""
+
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._action = 'select'
+        self._columns = '*'
+        self._rows = None
+        self._on_conflict = None
+        self._where = []
+        self._params = []
+        self._order = []
+        self._limit = None
+
+    # --- 동작 ---
+    def select(self, columns='*'):
+        self._action = 'select'
+        self._columns = columns
+        return self
+
+    def insert(self, rows):
+        self._action = 'insert'
+        self._rows = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._action = 'upsert'
+        self._rows = rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict or PRIMARY_KEYS[self._table]
+        return self
+
+    def delete(self):
+        self._action = 'delete'
+        return self
+
+    # --- 필터 ---
+    def _filter(self, column, op, value):
+        sql, params = _condition(column, op, value)
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column, value):
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column, value):
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column, value):
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column, value):
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column, value):
+        return self._filter(column, 'lte', value)
+
+    def like(self, column, pattern):
+        return self._filter(column, 'like', pattern)
+
+    def ilike(self, column, pattern):
+        return self._filter(column, 'ilike', pattern)
+
+    def in_(self, column, values):
+        return self._filter(column, 'in', list(values))
+
+    def or_(self, filters):
+        sql, params = _parse_logic(filters, 'OR')
+        self._where.append(sql)
+        self._params.extend(params)
+        return self
+
+    # --- 정렬/개수 ---
+    def order(self, column, desc=False):
+        self._order.append(f"{_column(column)} {'DESC' if desc else 'ASC'}")
+        return self
+
+    def limit(self, size):
+        self._limit = int(size)
+        return self
+
+    # --- 실행 ---
+    def _where_sql(self):
+        return f" WHERE {' AND '.join(self._where)}" if self._where else ''
+
+    def execute(self):
+        with self._client.transaction() as conn:
+            return LocalResponse(getattr(self, f"_execute_{self._action}")(conn))
+
+    def _execute_select(self, conn):
+        if self._columns.strip() == '*':
+            columns = '*'
+        else:
+            columns = ', '.join(_column(c.strip()) for c in self._columns.split(','))
+        sql = f"SELECT {columns} FROM {_column(self._table)}{self._where_sql()}"
+        # 같은 값끼리의 순서는 id(추가 순서)로 고정
+        order = self._order + ([] if self._table == 'users' else ['"id" ASC'])
+        if order:
+            sql += f" ORDER BY {', '.join(order)}"
+        # 저장소 최대 행 수를 넘는 결과는 Supabase처럼 오류 없이 잘림
+        limit = self._limit
+        if self._client.max_rows is not None:
+            limit = self._client.max_rows if limit is None else min(limit, self._client.max_rows)
+        if limit is not None:
+            sql += f" LIMIT {limit}"
+        return [dict(row) for row in conn.execute(sql, self._params)]
+
+    def _prepare_rows(self):
+        """기본값 채우기 + 시각 형식 맞추기"""
+        defaults = DEFAULTS.get(self._table, {})
+        prepared = []
+        for row in self._rows:
+            row = {column: _normalize_value(column, value) for column, value in row.items()}
+            for column, default in defaults.items():
+                if row.get(column) is None:
+                    row[column] = default()
+            prepared.append(row)
+        return prepared
+
+    def _insert_rows(self, conn, rows, conflict_sql=''):
+        inserted = []
+        for row in rows:
+            columns = list(row)
+            sql = (
+                f"INSERT INTO {_column(self._table)} ({', '.join(_column(c) for c in columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))}){conflict_sql(columns) if conflict_sql else ''} "
+                f"RETURNING *"
+            )
+            inserted.extend(dict(r) for r in conn.execute(sql, [row[c] for c in columns]))
+        return inserted
+
+    def _execute_insert(self, conn):
+        return self._insert_rows(conn, self._prepare_rows())
+
+    def _execute_upsert(self, conn):
+        conflict = self._on_conflict
+
+        def conflict_sql(columns):
+            updates = [c for c in columns if c != conflict]
+            if not updates:
+                return f" ON CONFLICT ({_column(conflict)}) DO NOTHING"
+            assignments = ', '.join(f"{_column(c)} = excluded.{_column(c)}" for c in updates)
+            return f" ON CONFLICT ({_column(conflict)}) DO UPDATE SET {assignments}"
+
+        return self._insert_rows(conn, self._prepare_rows(), conflict_sql)
+
+    def _execute_delete(self, conn):
+        sql = f"DELETE FROM {_column(self._table)}{self._where_sql()} RETURNING *"
+        return [dict(row) for row in conn.execute(sql, self._params)]
+
+class LocalRpc:
+    """rpc(name, params) 호출"""
+
+    def __init__(self, client, name, params):
+        self._client = client
+        self._name = name
+        self._params = params or {}
+
+    def execute(self):
+        handler = getattr(self._client, f"_rpc_{self._name}", None)
+        if handler is None:
+            raise ValueError(f"알 수 없는 함수: {self._name}")
+        with self._client.transaction() as conn:
+            data = handler(conn, **self._params)
+        if isinstance(data, list) and self._client.max_rows is not None:
+            data = data[:self._client.max_rows]  # 집합을 돌려주는 함수도 최대 행 수 적용
+        return LocalResponse(data)
+
+class LocalClient:
+    """Supabase 클라이언트 대신 쓰는 SQLite 저장소
+
+    path가 ':memory:'(기본값)이면 프로세스 메모리에만 저장됨.
+    max_rows: select / rpc 한 번에 돌려주는 최대 행 수 (None이면 제한 없음)
+    여러 스레드(Streamlit 세션)가 한 연결을 공유하므로 모든 실행을 잠금으로 직렬화함.
+    """
+
+    def __init__(self, path=':memory:', max_rows=DEFAULT_MAX_ROWS):
+        self.path = path
+        self.max_rows = max_rows
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        self._lock = threading.RLock()
+        self._search_index = _SearchIndex()
+
+    def _migrate(self):
+        """SCHEMA 이후에 추가된 컬럼을 예전 DB 파일에 추가"""
+        for table, column, column_type in MIGRATIONS:
+            columns = {row['name'] for row in self._conn.execute(f'PRAGMA table_info({_column(table)})')}
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE {_column(table)} ADD COLUMN {_column(column)} {column_type}')
+        self._conn.executescript(POST_MIGRATION_SCHEMA)
+
+    def transaction(self):
+        """잠금 + BEGIN/COMMIT (오류 시 ROLLBACK)"""
+        return _Transaction(self)
+
+    def table(self, name):
+        return LocalQuery(self, name)
+
+    def rpc(self, name, params=None):
+        return LocalRpc(self, name, params)
+
+    # --- Supabase에 정의된 Postgres 함수들의 로컬 구현 ---
+    def _rpc_submit_cart_batch(self, conn, p_username, p_batch_id, p_idempotency_key, p_items):
+        """submit_cart.sql의 submit_cart_batch와 동일한 동작"""
+        if isinstance(p_items, str):
+            p_items = json.loads(p_items)
+
+        existing = conn.execute(
+            'SELECT batch_id FROM submission_summary WHERE idempotency_key = ?',
+            [p_idempotency_key]
+        ).fetchone()
+        if existing:
+            return existing['batch_id']
+
+        # 같은 트랜잭션의 NOW()는 모두 같은 값
+        submitted_date = _now()
+        conn.executemany(
+            'INSERT INTO submitted_items '
+            '(username, batch_id, item_name, purchase_link, option_name, quantity, unit_price, total_price, '
+            'submitted_date, status) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            [
+                (p_username, p_batch_id, item['item_name'], item['purchase_link'], item['option_name'],
+                 item['quantity'], item['unit_price'], item['total_price'], submitted_date, DEFAULT_STATUS)
+                for item in p_items
+            ]
+        )
+        conn.execute(
+            'INSERT INTO submission_summary '
+            '(username, batch_id, item_count, total_amount, submitted_date, idempotency_key) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            [p_username, p_batch_id, len(p_items), sum(item['total_price'] for item in p_items),
+             submitted_date, p_idempotency_key]
+        )
+        # 제출된 항목만 삭제 (client_id로, client_id가 없는 예전 항목은 id로)
+        client_ids = [item['client_id'] for item in p_items if item.get('client_id')]
+        item_ids = [item['id'] for item in p_items if item.get('id') is not None]
+        for column, values in (('client_id', client_ids), ('id', item_ids)):
+            if values:
+                conn.execute(
+                    f'DELETE FROM pending_cart WHERE username = ? AND {column} IN ({", ".join("?" * len(values))})',
+                    [p_username, *values]
+                )
+        return p_batch_id
+
+    # analytics.sql의 통계 함수들 (월은 한국 시간 기준)
+    def _spend_range(self, column, p_from, p_to):
+        """기간 조건 (WHERE 조각, 파라미터)"""
+        conditions, params = [], []
+        if p_from is not None:
+            conditions.append(f'{column} >= ?')
+            params.append(_normalize_value(column, p_from))
+        if p_to is not None:
+            conditions.append(f'{column} < ?')
+            params.append(_normalize_value(column, p_to))
+        return ('WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+    def _rpc_spend_by_user(self, conn, p_from=None, p_to=None):
+        where, params = self._spend_range('submitted_date', p_from, p_to)
+        rows = conn.execute(
+            'SELECT username, COUNT(*) AS batch_count, SUM(item_count) AS item_count, '
+            f'SUM(total_amount) AS total_amount FROM submission_summary {where} '
+            'GROUP BY username ORDER BY total_amount DESC, username',
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _rpc_spend_by_month(self, conn, p_from=None, p_to=None):
+        where, params = self._spend_range('submitted_date', p_from, p_to)
+        rows = conn.execute(
+            "SELECT strftime('%Y-%m', submitted_date, '+9 hours') AS month, COUNT(*) AS batch_count, "
+            f'SUM(item_count) AS item_count, SUM(total_amount) AS total_amount FROM submission_summary {where} '
+            'GROUP BY month ORDER BY month',
+            params
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def _rpc_spend_by_item(self, conn, p_from=None, p_to=None, p_limit=20):
+        where, params = self._spend_range('submitted_date', p_from, p_to)
+        rows = conn.execute(
+            'SELECT trim(item_name) AS item_name, COUNT(*) AS request_count, '
+            'COUNT(DISTINCT username) AS user_count, SUM(quantity) AS quantity, '
+            f'SUM(total_price) AS total_amount FROM submitted_items {where} '
+            'GROUP BY 1 ORDER BY total_amount DESC, 1 LIMIT ?',
+            params + [p_limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    # search.sql의 품목 검색 (trigram 색인 대신 프로세스 안의 단어 색인 사용)
+    def _rpc_search_submitted_items(self, conn, p_query, p_limit=200):
+        terms = (p_query or '').lower().split()
+        if not terms:
+            return []
+        self._search_index.refresh(conn)
+        ids = self._search_index.search(terms, p_limit)
+        if not ids:
+            return []
+        rows = conn.execute(
+            'SELECT i.id, i.batch_id, i.username, i.item_name, i.option_name, i.purchase_link, '
+            'i.quantity, i.unit_price, i.total_price, i.submitted_date, i.status, '
+            's.item_count AS batch_item_count, s.total_amount AS batch_total_amount '
+            'FROM submitted_items i LEFT JOIN submission_summary s ON s.batch_id = i.batch_id '
+            f'WHERE i.id IN ({", ".join("?" * len(ids))})',
+            ids
+        ).fetchall()
+        order = {item_id: index for index, item_id in enumerate(ids)}
+        return sorted((dict(row) for row in rows), key=lambda row: order[row['id']])
+
+# 검색 색인의 단어 (글자/숫자가 이어진 부분)
+_WORD = re.compile(r'\w+')
+
+def _search_document(row):
+    """search.sql의 검색 대상과 같은 문자열 (이름 / 옵션 / 링크 / 신청자를 소문자로 이어 붙임)"""
+    return ' '.join([
+        row['item_name'] or '', row['option_name'] or '', row['purchase_link'] or '', row['username'] or ''
+    ]).lower()
+
+class _SearchIndex:
+    """submitted_items 검색용 단어 역색인
+
+    검색어의 글자/숫자 조각은 반드시 문서의 어떤 단어 안에 들어 있으므로,
+    단어 목록(품목 수보다 훨씬 적음)에서 조각을 포함하는 단어를 찾아 후보를 좁힌 뒤
+    문서 문자열에 검색어가 들어 있는지로 최종 확인함 → 결과는 LIKE '%검색어%'와 같음.
+    submitted_items는 추가만 되므로 검색할 때마다 마지막 id 이후의 행만 더함.
+    """
+
+    def __init__(self):
+        self._documents = {}  # id -> (submitted_date, 문서)
+        self._postings = {}   # 단어 -> id 집합
+        self._order = []      # (submitted_date, id) 오름차순
+        self._last_id = 0
+
+    def refresh(self, conn):
+        rows = conn.execute(
+            'SELECT id, item_name, option_name, purchase_link, username, submitted_date '
+            'FROM submitted_items WHERE id > ? ORDER BY id',
+            [self._last_id]
+        ).fetchall()
+        for row in rows:
+            document = _search_document(row)
+            self._documents[row['id']] = (row['submitted_date'], document)
+            for word in set(_WORD.findall(document)):
+                self._postings.setdefault(word, set()).add(row['id'])
+            # 보통은 제출 순서 = 날짜 순서라 끝에 붙음
+            key = (row['submitted_date'], row['id'])
+            if self._order and key < self._order[-1]:
+                bisect.insort(self._order, key)
+            else:
+                self._order.append(key)
+            self._last_id = row['id']
+
+    def search(self, terms, limit):
+        """모든 검색어를 포함하는 id 목록 (submitted_date, id 내림차순 limit개)"""
+        candidates = None
+        for piece in sorted({piece for term in terms for piece in _WORD.findall(term)}, key=len, reverse=True):
+            # 긴 조각부터 (맞는 단어가 적어서 후보가 빨리 줄어듦)
+            ids = set()
+            for word, postings in self._postings.items():
+                if piece in word:
+                    ids |= postings if candidates is None else postings & candidates
+            candidates = ids
+            if not candidates:
+                return []
+        if candidates is None:
+            candidates = self._documents  # 검색어가 기호뿐이면 전체에서 확인
+
+        if len(candidates) * 16 < len(self._order):
+            # 후보가 적으면 후보만 정렬
+            ordered = sorted(candidates, key=lambda item_id: (self._documents[item_id][0], item_id), reverse=True)
+        else:
+            # 후보가 많으면 최근 순으로 훑다가 limit개를 채우면 멈춤
+            ordered = (item_id for _, item_id in reversed(self._order) if item_id in candidates)
+
+        matches = []
+        for item_id in ordered:
+            document = self._documents[item_id][1]
+            if all(term in document for term in terms):
+                matches.append(item_id)
+                if len(matches) >= limit:
+                    break
+        return matches
+
+class _Transaction:
+    def __init__(self, client):
+        self._client = client
+
+    def __enter__(self):
+        self._client._lock.acquire()
+        self._client._conn.execute('BEGIN')
+        return self._client._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self._client._conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+        finally:
+            self._client._lock.release()
+        return False
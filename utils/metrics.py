@@ -0,0 +1,199 @@
+import json
+import logging
+import threading
+import time
+from functools import wraps
+
+from utils.cache import get_cache_stats, reset_cache_stats
+
+# ============================================
+# 데이터 계층 호출 계측 (지연 시간 / 호출 수 / 오류 / 반환 행 수)
+# ============================================
+# database.py 함수들은 예외를 잡아서 st.error나 {'success': False}로 바꾸므로
+# 바깥에서는 실패 여부를 알 수 없음. 그래서 except 블록에서 record_error()를 직접 호출함.
+#
+# @instrument는 @keyed_cache 안쪽에 붙여서 실제로 저장소를 조회한 호출만 측정하고,
+# 캐시 hit/miss는 utils/cache.py 통계를 같은 이름(함수 이름)으로 합쳐서 보여줌.
+
+logger = logging.getLogger(__name__)
+
+# 이 시간(초)보다 오래 걸린 호출은 로그로 남김
+SLOW_CALL_SECONDS = 1.0
+
+# 지연 시간 히스토그램 구간 상한 (초, Prometheus 기본값과 같음)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class OperationStats:
+    """함수 1개의 누적 통계"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        # 구간별 개수 (마지막 칸은 +Inf)
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, elapsed, rows):
+        self.calls += 1
+        self.rows += rows
+        self.latency_sum += elapsed
+        self.latency_max = max(self.latency_max, elapsed)
+        for index, upper in enumerate(LATENCY_BUCKETS):
+            if elapsed <= upper:
+                self.bucket_counts[index] += 1
+                break
+        else:
+            self.bucket_counts[-1] += 1
+
+    def percentile(self, percent):
+        """히스토그램으로 추정한 백분위 (해당 구간 상한값, 초)"""
+        if not self.calls:
+            return 0.0
+        target = self.calls * percent / 100
+        cumulative = 0
+        for index, count in enumerate(self.bucket_counts[:-1]):
+            cumulative += count
+            if cumulative >= target:
+                return LATENCY_BUCKETS[index]
+        return self.latency_max
+
+_stats = {}
+_lock = threading.Lock()
+
+# 스레드별 현재 실행 중인 함수 이름 (record_error가 어느 함수의 오류인지 알기 위함)
+_current = threading.local()
+
+def _count_rows(result):
+    """반환값에서 행 수 추출 (History, {'history': ...}, 목록, DataFrame)"""
+    if isinstance(result, dict):
+        result = result.get('history')
+    if result is None or isinstance(result, (str, bytes)):
+        return 0
+    summaries = getattr(result, 'summaries', None)
+    if summaries is not None:
+        return len(summaries)
+    try:
+        return len(result)
+    except TypeError:
+        return 0
+
+def instrument(func):
+    """호출 시간/반환 행 수를 함수 이름별로 기록하는 데코레이터"""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = getattr(_current, 'stack', None)
+        if stack is None:
+            stack = _current.stack = []
+        stack.append(name)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            record_error()
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+        _observe(name, elapsed, _count_rows(result))
+        if elapsed >= SLOW_CALL_SECONDS:
+            logger.warning("느린 호출: %s %.2f초", name, elapsed)
+        return result
+
+    return wrapper
+
+def _observe(name, elapsed, rows):
+    with _lock:
+        stats = _stats.get(name)
+        if stats is None:
+            stats = _stats[name] = OperationStats()
+        stats.observe(elapsed, rows)
+
+def record_error():
+    """현재 실행 중인 계측 함수의 오류 수 증가 (except 블록에서 호출)"""
+    stack = getattr(_current, 'stack', None)
+    if not stack:
+        return
+    with _lock:
+        stats = _stats.get(stack[-1])
+        if stats is None:
+            stats = _stats[stack[-1]] = OperationStats()
+        stats.errors += 1
+
+def reset_metrics():
+    """누적 통계 초기화 (캐시 hit/miss 횟수 포함)"""
+    with _lock:
+        _stats.clear()
+    reset_cache_stats()
+
+# ============================================
+# 내보내기 (JSON / Prometheus)
+# ============================================
+
+def metrics_snapshot():
+    """현재 통계를 dict로 반환 (시간 단위: 밀리초)
+
+    {'operations': {함수 이름: {...}}, 'caches': {함수 이름: {...}}}
+    """
+    with _lock:
+        operations = {
+            name: {
+                'calls': stats.calls,
+                'errors': stats.errors,
+                'rows': stats.rows,
+                'avg_ms': stats.latency_sum / stats.calls * 1000 if stats.calls else 0.0,
+                'p50_ms': stats.percentile(50) * 1000,
+                'p95_ms': stats.percentile(95) * 1000,
+                'max_ms': stats.latency_max * 1000,
+                'buckets': dict(zip([str(upper) for upper in LATENCY_BUCKETS] + ['+Inf'],
+                                    stats.bucket_counts))
+            }
+            for name, stats in sorted(_stats.items())
+        }
+    return {'operations': operations, 'caches': get_cache_stats()}
+
+def metrics_json():
+    """metrics_snapshot()을 JSON 문자열로"""
+    return json.dumps(metrics_snapshot(), ensure_ascii=False, indent=2)
+
+def metrics_prometheus():
+    """Prometheus 텍스트 형식으로 내보내기"""
+    lines = [
+        "# HELP gym_db_call_duration_seconds 데이터 계층 호출 시간",
+        "# TYPE gym_db_call_duration_seconds histogram",
+    ]
+    with _lock:
+        items = sorted(_stats.items())
+        for name, stats in items:
+            cumulative = 0
+            for upper, count in zip(LATENCY_BUCKETS, stats.bucket_counts):
+                cumulative += count
+                lines.append(f'gym_db_call_duration_seconds_bucket{{operation="{name}",le="{upper}"}} {cumulative}')
+            lines.append(f'gym_db_call_duration_seconds_bucket{{operation="{name}",le="+Inf"}} {stats.calls}')
+            lines.append(f'gym_db_call_duration_seconds_sum{{operation="{name}"}} {stats.latency_sum:.6f}')
+            lines.append(f'gym_db_call_duration_seconds_count{{operation="{name}"}} {stats.calls}')
+
+        for metric, help_text, attr in (
+            ("gym_db_errors_total", "데이터 계층 오류 수", 'errors'),
+            ("gym_db_rows_total", "반환한 행 수", 'rows'),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stats in items:
+                lines.append(f'{metric}{{operation="{name}"}} {getattr(stats, attr)}')
+
+    cache_stats = get_cache_stats()
+    for metric, metric_type, help_text, key in (
+        ("gym_cache_hits_total", "counter", "캐시 hit 수", 'hits'),
+        ("gym_cache_misses_total", "counter", "캐시 miss 수", 'misses'),
+        ("gym_cache_entries", "gauge", "캐시 항목 수", 'entries'),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        for name, stats in sorted(cache_stats.items()):
+            lines.append(f'{metric}{{operation="{name}"}} {stats[key]}')
+
+    return "\n".join(lines) + "\n"
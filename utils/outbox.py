@@ -0,0 +1,372 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from utils.resilience import backoff_delay
+
+# ============================================
+# 장바구니 변경 outbox (로컬 SQLite 파일)
+# ============================================
+# 담기/삭제를 저장소에 바로 보내지 않고 로컬 파일에 먼저 기록한 뒤 바로 응답함.
+# 백그라운드 작업자(FlushWorker)가 쌓인 변경을 묶어서 pending_cart로 보내고,
+# 실패하면 지수 백오프로 계속 재시도함. 저장소 장애 중에도 입력이 사라지지 않음.
+#
+# - add: 새 항목 / 수정된 항목의 전체 행 (client_id로 식별, 저장소에는 client_id 기준 upsert
+#   → 재전송해도 중복 없음). 아직 안 보낸 add를 다시 수정하면 그 기록만 고침.
+# - remove: 지울 항목 (client_id, 없으면 예전 항목의 pending_cart.id)
+# - 저장소에 아직 없는 항목(안 보낸 add만 있음)을 지우면 두 변경 모두 보내지 않음
+# - 저장소가 일시적이지 않은 오류로 MAX_REJECTIONS번 거부한 변경은 더 보내지 않고 보류함
+#   (rejected_at 기록). 보류된 변경은 장바구니/전송에서 빠지고, 화면에서 다시 시도하거나 버림
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cart_outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    op TEXT NOT NULL,
+    client_id TEXT,
+    item_id INTEGER,
+    payload TEXT,
+    created_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    rejections INTEGER NOT NULL DEFAULT 0,
+    rejected_at TEXT
+);
+CREATE INDEX IF NOT EXISTS cart_outbox_username_idx ON cart_outbox (username, seq);
+CREATE INDEX IF NOT EXISTS cart_outbox_client_id_idx ON cart_outbox (client_id);
+CREATE TABLE IF NOT EXISTS cart_outbox_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+# SCHEMA 이후에 추가된 컬럼 (예전 outbox 파일에 추가)
+MIGRATIONS = [
+    ('rejections', 'INTEGER NOT NULL DEFAULT 0'),
+    ('rejected_at', 'TEXT'),
+]
+
+# 저장소가 이만큼 거부하면(일시적이지 않은 오류) 보류 (일시적 오류는 횟수 제한 없이 백오프로 재시도)
+MAX_REJECTIONS = 3
+
+def _now(offset=0):
+    """저장소의 added_date와 같은 형식의 현재 시각 (UTC ISO, offset: 더할 마이크로초)"""
+    return (datetime.now(timezone.utc) + timedelta(microseconds=offset)).isoformat(timespec='microseconds')
+
+class CartOutbox:
+    """장바구니 변경을 보내기 전까지 보관하는 로컬 큐
+
+    path가 ':memory:'이면 프로세스 메모리에만 저장됨 (벤치마크/오프라인 개발용).
+    여러 스레드가 한 연결을 공유하므로 모든 실행을 잠금으로 직렬화함.
+    storage: 변경을 보낼 저장소 구분 값. 처음 연 저장소를 파일에 기록하고,
+    다른 저장소로 열면 ValueError (다른 저장소에 쌓인 변경을 보내지 않음).
+    """
+
+    def __init__(self, path=':memory:', storage=None):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ':memory:':
+            # WAL: 쓰기 1번 = 파일 끝에 추가 (synchronous 기본값 FULL 유지 → 커밋하면 디스크에 남음)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+        if storage is not None:
+            self._claim(storage)
+        self._lock = threading.RLock()
+        self._sending = set()  # 전송 중인 seq (take ~ complete/fail 사이)
+        # 전송과 제출(submit_cart)이 겹치지 않게 하는 잠금 (저장소 호출 동안 잡고 있음)
+        self.flush_lock = threading.Lock()
+
+    def _migrate(self):
+        """SCHEMA 이후에 추가된 컬럼을 예전 outbox 파일에 추가"""
+        columns = {row['name'] for row in self._conn.execute('PRAGMA table_info(cart_outbox)')}
+        for column, column_type in MIGRATIONS:
+            if column not in columns:
+                self._conn.execute(f'ALTER TABLE cart_outbox ADD COLUMN {column} {column_type}')
+
+    def _claim(self, storage):
+        """파일을 storage 전용으로 기록 (이미 다른 저장소가 기록돼 있으면 ValueError)"""
+        self._conn.execute("INSERT OR IGNORE INTO cart_outbox_meta (key, value) VALUES ('storage', ?)", [storage])
+        claimed = self._conn.execute("SELECT value FROM cart_outbox_meta WHERE key = 'storage'").fetchone()['value']
+        if claimed != storage:
+            self._conn.close()
+            raise ValueError(f"장바구니 outbox {self.path}는 다른 저장소({claimed})의 파일입니다")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # --- 기록 (화면 스레드) ---
+    def add(self, username, row):
+        """새 항목 기록, client_id/added_date를 채운 행 반환"""
+        return self.add_many(username, [row])[0]
+
+    def add_many(self, username, rows):
+        """여러 항목을 한 트랜잭션으로 기록 (모두 기록되거나 하나도 안 됨), 채운 행 목록 반환"""
+        return self.apply_changes(username, added=rows)
+
+    def remove(self, username, items):
+        """항목 삭제 기록 (items: load_pending_cart의 행)"""
+        self.apply_changes(username, removed=items)
+
+    def apply_changes(self, username, added=(), updated=(), removed=()):
+        """추가 / 수정 / 삭제를 한 트랜잭션으로 기록, 추가된 행 목록(client_id/added_date 포함) 반환
+
+        updated: 수정된 전체 행 (load_pending_cart의 행에 새 값을 덮어쓴 것)
+        removed: load_pending_cart의 행
+        """
+        # 한 번에 담은 행도 added_date 순서가 입력 순서와 같도록 1마이크로초씩 차이를 둠
+        added = [
+            dict(row, username=username, client_id=str(uuid.uuid4()), added_date=_now(index))
+            for index, row in enumerate(added)
+        ]
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                for row in added:
+                    self._insert_upsert(username, row)
+                for item in updated:
+                    self._record_update(username, item)
+                for item in removed:
+                    self._record_remove(username, item)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return added
+
+    def _insert_upsert(self, username, row):
+        self._conn.execute(
+            'INSERT INTO cart_outbox (username, op, client_id, payload, created_at) VALUES (?, ?, ?, ?, ?)',
+            [username, 'add', row['client_id'], json.dumps(row, ensure_ascii=False), _now()]
+        )
+
+    def _pending_upserts(self, username, client_id):
+        """client_id의 아직 안 보낸 add 기록 seq 목록 (전송 중인 것 포함)"""
+        return [
+            row['seq'] for row in self._conn.execute(
+                "SELECT seq FROM cart_outbox WHERE op = 'add' AND username = ? AND client_id = ?",
+                [username, client_id]
+            )
+        ]
+
+    def _record_update(self, username, item):
+        client_id = item.get('client_id')
+        if not client_id:
+            # client_id가 없는 예전 항목은 client_id 기준 upsert를 할 수 없으므로 지우고 새로 추가
+            self._record_remove(username, item)
+            row = {key: value for key, value in item.items() if key != 'id'}
+            self._insert_upsert(username, dict(row, client_id=str(uuid.uuid4())))
+            return
+
+        # 보류된 예전 내용은 새로 고친 내용으로 대신함
+        self._conn.execute(
+            "DELETE FROM cart_outbox WHERE op = 'add' AND username = ? AND client_id = ? AND rejected_at IS NOT NULL",
+            [username, client_id]
+        )
+        row = {key: value for key, value in item.items() if key != 'id'}
+        payload = json.dumps(dict(row, username=username), ensure_ascii=False)
+        waiting = [seq for seq in self._pending_upserts(username, client_id) if seq not in self._sending]
+        if waiting:
+            # 아직 안 보낸 기록이 있으면 그 내용만 바꿈 (한 항목은 한 번만 전송)
+            self._conn.execute('UPDATE cart_outbox SET payload = ? WHERE seq = ?', [payload, waiting[-1]])
+        else:
+            self._insert_upsert(username, dict(row, username=username))
+
+    def _record_remove(self, username, item):
+        client_id = item.get('client_id')
+        if not client_id:
+            if item.get('id') is not None:
+                self._conn.execute(
+                    'INSERT INTO cart_outbox (username, op, item_id, created_at) VALUES (?, ?, ?, ?)',
+                    [username, 'remove', item['id'], _now()]
+                )
+            return
+
+        pending = self._pending_upserts(username, client_id)
+        waiting = [seq for seq in pending if seq not in self._sending]
+        self._conn.executemany('DELETE FROM cart_outbox WHERE seq = ?', [(seq,) for seq in waiting])
+        # 저장소에 아직 없는 항목(저장된 id 없음 + 보낸 적 없는 add만 있음)이면 remove를 보낼 필요 없음
+        if item.get('id') is None and waiting and len(waiting) == len(pending):
+            return
+        self._conn.execute(
+            'INSERT INTO cart_outbox (username, op, client_id, created_at) VALUES (?, ?, ?, ?)',
+            [username, 'remove', client_id, _now()]
+        )
+
+    def pending(self, username):
+        """아직 안 보낸 변경 (추가할 행 목록, 지울 client_id 집합, 지울 id 집합, 보류된 변경 제외)"""
+        rows = self._execute(
+            'SELECT op, client_id, item_id, payload FROM cart_outbox '
+            'WHERE username = ? AND rejected_at IS NULL ORDER BY seq',
+            [username]
+        )
+        adds = [json.loads(row['payload']) for row in rows if row['op'] == 'add']
+        removed_client_ids = {row['client_id'] for row in rows if row['op'] == 'remove' and row['client_id']}
+        removed_ids = {row['item_id'] for row in rows if row['op'] == 'remove' and row['item_id'] is not None}
+        return adds, removed_client_ids, removed_ids
+
+    # --- 전송 (작업자 스레드) ---
+    def take(self, limit):
+        """보낼 변경을 오래된 순으로 limit개까지 꺼냄 (complete/fail 전까지 전송 중으로 표시, 보류된 변경 제외)"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT seq, username, op, client_id, item_id, payload FROM cart_outbox '
+                'WHERE rejected_at IS NULL ORDER BY seq LIMIT ?',
+                [limit]
+            ).fetchall()
+            ops = []
+            for row in rows:
+                op = dict(row)
+                op['row'] = json.loads(op.pop('payload')) if op['op'] == 'add' else None
+                ops.append(op)
+            self._sending.update(op['seq'] for op in ops)
+            return ops
+
+    def complete(self, seqs):
+        """전송 완료된 변경 삭제"""
+        with self._lock:
+            self._conn.executemany('DELETE FROM cart_outbox WHERE seq = ?', [(seq,) for seq in seqs])
+            self._sending.difference_update(seqs)
+
+    def fail(self, seqs, error, rejected=False):
+        """전송 실패 기록 (다음 전송 때 다시 시도)
+
+        rejected: 저장소가 내용을 거부함 (일시적이지 않은 오류). MAX_REJECTIONS번째 거부면 보류.
+        """
+        with self._lock:
+            if rejected:
+                self._conn.executemany(
+                    'UPDATE cart_outbox SET attempts = attempts + 1, last_error = ?, rejections = rejections + 1, '
+                    'rejected_at = CASE WHEN rejections + 1 >= ? THEN ? ELSE rejected_at END WHERE seq = ?',
+                    [(str(error), MAX_REJECTIONS, _now(), seq) for seq in seqs]
+                )
+            else:
+                self._conn.executemany(
+                    'UPDATE cart_outbox SET attempts = attempts + 1, last_error = ? WHERE seq = ?',
+                    [(str(error), seq) for seq in seqs]
+                )
+            self._sending.difference_update(seqs)
+
+    # --- 보류된 변경 (화면 스레드) ---
+    def rejected(self, username):
+        """보류된 변경 목록 (오래된 순, {'seq', 'op', 'client_id', 'item_id', 'row', 'last_error', 'rejected_at'})"""
+        rows = self._execute(
+            'SELECT seq, op, client_id, item_id, payload, last_error, rejected_at FROM cart_outbox '
+            'WHERE username = ? AND rejected_at IS NOT NULL ORDER BY seq',
+            [username]
+        )
+        changes = []
+        for row in rows:
+            change = dict(row)
+            payload = change.pop('payload')
+            change['row'] = json.loads(payload) if change['op'] == 'add' else None
+            changes.append(change)
+        return changes
+
+    def retry_rejected(self, username, seqs):
+        """보류된 변경을 다시 보낼 대상으로 되돌림 (거부 횟수도 처음부터)"""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE cart_outbox SET rejections = 0, rejected_at = NULL '
+                'WHERE username = ? AND seq = ? AND rejected_at IS NOT NULL',
+                [(username, seq) for seq in seqs]
+            )
+
+    def discard_rejected(self, username, seqs):
+        """보류된 변경 버리기"""
+        with self._lock:
+            self._conn.executemany(
+                'DELETE FROM cart_outbox WHERE username = ? AND seq = ? AND rejected_at IS NOT NULL',
+                [(username, seq) for seq in seqs]
+            )
+
+    def discard_submitted(self, username, items):
+        """제출(submit_cart_batch)로 이미 처리된 변경 삭제 (items: 제출된 load_pending_cart의 행)
+
+        제출이 저장소에서 제출된 항목을 지우므로 그 항목의 add / remove는 보낼 필요가 없음.
+        제출 화면 이후에 담거나 지운 다른 항목의 변경은 남겨 둠.
+        """
+        client_ids = [item['client_id'] for item in items if item.get('client_id')]
+        item_ids = [item['id'] for item in items if not item.get('client_id') and item.get('id') is not None]
+        with self._lock:
+            self._conn.executemany(
+                'DELETE FROM cart_outbox WHERE username = ? AND client_id = ?',
+                [(username, client_id) for client_id in client_ids]
+            )
+            self._conn.executemany(
+                "DELETE FROM cart_outbox WHERE username = ? AND op = 'remove' AND item_id = ?",
+                [(username, item_id) for item_id in item_ids]
+            )
+
+    def stats(self):
+        """{'pending': 대기 수, 'oldest': 가장 오래된 기록 시각, 'max_attempts', 'last_error', 'rejected': 보류 수}
+        (진단 화면용)"""
+        row = self._execute(
+            'SELECT COUNT(*) AS pending, MIN(created_at) AS oldest, MAX(attempts) AS max_attempts '
+            'FROM cart_outbox WHERE rejected_at IS NULL'
+        )[0]
+        rejected = self._execute('SELECT COUNT(*) AS rejected FROM cart_outbox WHERE rejected_at IS NOT NULL')[0]
+        error = self._execute(
+            'SELECT last_error FROM cart_outbox WHERE last_error IS NOT NULL ORDER BY seq DESC LIMIT 1'
+        )
+        return {
+            'pending': row['pending'],
+            'oldest': row['oldest'],
+            'max_attempts': row['max_attempts'] or 0,
+            'last_error': error[0]['last_error'] if error else None,
+            'rejected': rejected['rejected'],
+        }
+
+class FlushWorker:
+    """flush()를 백그라운드 스레드에서 반복 실행
+
+    flush()는 {'sent', 'failed', 'remaining'}을 반환해야 함.
+    - 실패가 있으면 지수 백오프(base_delay ~ max_delay) 후 다시 시도
+      (보류된 변경은 flush()가 꺼내지 않으므로 계속 다시 보내지 않음)
+    - 남은 변경이 있으면 바로 이어서 전송
+    - 다 보냈으면 notify()가 올 때까지 대기 (놓친 알림 대비로 idle_interval마다 확인)
+    """
+
+    def __init__(self, flush, base_delay=1.0, max_delay=60.0, idle_interval=60.0):
+        self._flush = flush
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.idle_interval = idle_interval
+        self._wake = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cart-outbox", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def notify(self):
+        """새 변경이 기록됐음을 알림"""
+        self._wake.set()
+
+    def _run(self):
+        failures = 0
+        while True:
+            self._wake.clear()
+            try:
+                result = self._flush()
+            except Exception:
+                logger.exception("장바구니 outbox 전송 오류")
+                result = {'failed': 1, 'remaining': 1}
+
+            if result['failed']:
+                # 저장소 장애 중에는 알림과 상관없이 백오프 (서킷 브레이커가 열려 있으면 바로 실패함)
+                failures += 1
+                time.sleep(max(self.base_delay, backoff_delay(failures, self.base_delay, self.max_delay)))
+            elif result['remaining']:
+                failures = 0
+            else:
+                failures = 0
+                self._wake.wait(self.idle_interval)
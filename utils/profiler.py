@@ -0,0 +1,91 @@
+import cProfile
+import marshal
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# ============================================
+# rerun 1회 프로파일링 (관리자 진단용)
+# ============================================
+# 프로파일링이 꺼져 있으면 section()은 스레드 변수 1개만 확인하고 바로 넘어감.
+# 켜져 있으면 main() 한 번을 cProfile로 감싸고 구간(section)별 시간을 함께 기록함.
+#
+# 주의: cProfile은 호출한 스레드만 측정함 (fetch_concurrently 작업 스레드 안의 함수는
+# 프로파일에 안 나오지만, 그 구간의 전체 시간은 section 시간에 포함됨).
+# fragment만 다시 실행되는 rerun은 main()을 거치지 않으므로 측정되지 않음.
+
+# 세션별로 보관하는 최근 프로파일 수
+MAX_PROFILES = 5
+
+# 함수별 표에 보여줄 개수
+TOP_FUNCTIONS = 30
+
+# label: 측정한 화면, total: 전체 시간(초), sections: [(구간 이름, 초)],
+# functions: 누적 시간 상위 함수 목록, prof: pstats/snakeviz로 열 수 있는 .prof 내용
+Profile = namedtuple('Profile', ['label', 'started_at', 'total', 'sections', 'functions', 'prof'])
+
+_state = threading.local()
+
+@contextmanager
+def section(name):
+    """구간 시간 기록 (프로파일링 중이 아니면 아무것도 하지 않음)"""
+    timings = getattr(_state, 'timings', None)
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+def is_profiling():
+    """현재 스레드의 rerun이 프로파일링 중인지"""
+    return getattr(_state, 'timings', None) is not None
+
+def _top_functions(stats):
+    """cProfile 결과에서 누적 시간 상위 함수 목록"""
+    rows = [
+        {
+            'function': f"{func} ({filename.rsplit('/', 1)[-1]}:{line})",
+            'calls': calls,
+            'self_ms': self_time * 1000,
+            'cumulative_ms': cumulative * 1000,
+        }
+        for (filename, line, func), (_, calls, self_time, cumulative, _) in stats.items()
+    ]
+    rows.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+def profile_rerun(func, label, profiles):
+    """func() 1회를 프로파일링하고 결과를 profiles 목록 맨 앞에 추가
+
+    st.rerun() 등으로 예외가 나도 결과는 저장한 뒤 예외를 그대로 다시 던짐.
+    다른 프로파일러가 이미 동작 중이면(Python 3.12+는 프로세스당 1개) 구간 시간만 기록.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        profiler = None
+
+    _state.timings = {}
+    started_at = time.time()
+    start = time.perf_counter()
+    try:
+        return func()
+    finally:
+        total = time.perf_counter() - start
+        timings, _state.timings = _state.timings, None
+
+        functions, prof = [], b""
+        if profiler is not None:
+            profiler.disable()
+            profiler.create_stats()
+            functions = _top_functions(profiler.stats)
+            # Profile.dump_stats()와 같은 형식
+            prof = marshal.dumps(profiler.stats)
+
+        profiles.insert(0, Profile(label, started_at, total, sorted(timings.items()), functions, prof))
+        del profiles[MAX_PROFILES:]
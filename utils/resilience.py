@@ -0,0 +1,175 @@
+import random
+import sqlite3
+import threading
+import time
+
+# ============================================
+# 저장소 호출 재시도 + 서킷 브레이커
+# ============================================
+# 일시적인 오류(연결 끊김, 타임아웃, 5xx)는 지터를 준 지수 백오프로 재시도하고,
+# 연속으로 실패하면 한동안 저장소를 호출하지 않고 바로 실패(CircuitOpenError)시킴.
+# 그동안 database.py의 조회 함수들은 캐시에 남아 있는 이전 값을 보여줌.
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 저장소를 호출하지 않음"""
+
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+        super().__init__(f"저장소 응답이 불안정합니다. {retry_after:.0f}초 후 다시 시도합니다.")
+
+class CircuitBreaker:
+    """연속 실패 횟수 기반 서킷 브레이커
+
+    closed: 정상 호출
+    open: failure_threshold번 연속 실패 → reset_timeout초 동안 호출하지 않고 바로 실패
+    half_open: reset_timeout이 지나면 한 번만 시험 호출, 성공하면 closed / 실패하면 다시 open
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return 'open'
+        return 'half_open'
+
+    def before_call(self):
+        """호출 전 확인 (열려 있으면 CircuitOpenError)"""
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return
+            if state == 'half_open' and not self._trial_running:
+                # 시험 호출은 한 스레드만
+                self._trial_running = True
+                return
+            retry_after = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            raise CircuitOpenError(retry_after)
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+def is_transient(error):
+    """재시도하면 성공할 수 있는 오류인지 (연결/타임아웃/5xx, 로컬 DB 잠금)"""
+    # 오류가 났을 때만 필요하므로 여기서 import (로컬 저장소만 쓸 때는 supabase를 불러오지 않음)
+    import httpx
+    from postgrest.exceptions import APIError
+
+    if isinstance(error, httpx.TransportError):
+        # 연결 실패, 연결 끊김, 타임아웃 등
+        return True
+    if isinstance(error, APIError):
+        code = str(error.code or '')
+        # JSON이 아닌 응답(게이트웨이 오류 등)은 HTTP 상태 코드가 그대로 들어옴
+        # PGRST000~003: PostgREST가 DB에 연결하지 못함
+        return (code.isdigit() and code.startswith('5')) or code.startswith('PGRST00')
+    if isinstance(error, sqlite3.OperationalError):
+        return 'locked' in str(error)
+    return False
+
+def backoff_delay(attempt, base_delay, max_delay):
+    """지터를 준 지수 백오프 (full jitter: 0 ~ base * 2^attempt)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+def call_with_retry(func, breaker, retries=0, base_delay=0.2, max_delay=2.0):
+    """func()를 서킷 브레이커 아래에서 실행, 일시적 오류는 retries번까지 재시도
+
+    재시도는 같은 요청을 여러 번 보내도 결과가 같은 호출(조회, 삭제, 멱등 키가 있는 제출)에만 사용.
+    """
+    attempt = 0
+    while True:
+        breaker.before_call()
+        try:
+            result = func()
+        except Exception as e:
+            if not is_transient(e):
+                # 요청 자체의 문제(권한, 잘못된 값 등)는 저장소 상태와 무관
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            if attempt >= retries:
+                raise
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+            attempt += 1
+            continue
+        breaker.record_success()
+        return result
+
+# ============================================
+# 클라이언트 래퍼
+# ============================================
+
+# 여러 번 실행해도 결과가 같은 요청 종류 (재시도 대상)
+_IDEMPOTENT_METHODS = {'select', 'delete'}
+_NON_IDEMPOTENT_METHODS = {'insert', 'upsert', 'update'}
+
+class _ResilientQuery:
+    """메서드 체인을 그대로 전달하고 execute()만 call_with_retry로 실행"""
+
+    def __init__(self, query, client, retryable):
+        self._query = query
+        self._client = client
+        self._retryable = retryable
+
+    def __getattr__(self, name):
+        attr = getattr(self._query, name)
+        if not callable(attr):
+            return attr
+
+        retryable = self._retryable
+        if name in _IDEMPOTENT_METHODS and retryable is None:
+            retryable = True
+        elif name in _NON_IDEMPOTENT_METHODS:
+            retryable = False
+
+        def chained(*args, **kwargs):
+            return _ResilientQuery(attr(*args, **kwargs), self._client, retryable)
+
+        return chained
+
+    def execute(self):
+        retries = self._client.retries if self._retryable else 0
+        return call_with_retry(self._query.execute, self._client.breaker, retries=retries)
+
+class ResilientClient:
+    """table()/rpc()의 execute()에 재시도 + 서킷 브레이커를 적용하는 클라이언트 래퍼
+
+    idempotent_rpcs: 재시도해도 되는 RPC 이름 (예: 멱등 키가 있는 submit_cart_batch)
+    """
+
+    def __init__(self, client, breaker=None, retries=2, idempotent_rpcs=()):
+        self.client = client
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = retries
+        self.idempotent_rpcs = set(idempotent_rpcs)
+
+    def table(self, name):
+        return _ResilientQuery(self.client.table(name), self, None)
+
+    def rpc(self, name, params=None):
+        return _ResilientQuery(self.client.rpc(name, params), self, name in self.idempotent_rpcs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
@@ -0,0 +1,83 @@
+import hmac
+import os
+import threading
+import time
+
+import streamlit as st
+
+from utils.database import (
+    get_cart_outbox_status,
+    get_supabase_client,
+    get_submission_history_page,
+    load_item_catalog,
+)
+
+# ============================================
+# 콜드 스타트 준비 (warm-up)
+# ============================================
+# 앱이 잠들었다 깨어나면 첫 접속자가 pandas/supabase import, 클라이언트 생성,
+# 첫 조회를 모두 기다려야 함. 첫 화면(로그인)은 이것들 없이 그리고,
+# 나머지는 화면을 그린 뒤 백그라운드에서 미리 해 둠.
+#
+# ?warmup=1&token=...로 접속하면 화면 대신 준비만 하고 단계별 시간을 출력함
+# (keep-alive 워크플로우 / 배포 직후 확인용). 로그인 없이 실행되므로 설정한 토큰이 맞을 때만 허용하고,
+# 토큰을 설정하지 않으면 이 접속은 꺼져 있음 (일반 화면이 나옴).
+
+def _warm_up_token():
+    """?warmup 접속 토큰 (환경변수 WARMUP_TOKEN이 secrets [warmup] token보다 우선, 없으면 None)"""
+    token = os.environ.get("WARMUP_TOKEN")
+    if token:
+        return token
+    try:
+        return st.secrets.get("warmup", {}).get("token")
+    except FileNotFoundError:
+        return None
+
+def is_warm_up_request(query_params):
+    """?warmup=1이고 token이 설정한 토큰과 같은지 (토큰을 설정하지 않았으면 항상 False)"""
+    if query_params.get("warmup") != "1":
+        return False
+    token = _warm_up_token()
+    if not token:
+        return False
+    return hmac.compare_digest(query_params.get("token", "").encode(), str(token).encode())
+
+def warm_up():
+    """무거운 준비 작업 실행 (화면 출력 없음), 단계별 걸린 시간(초) 반환"""
+    timings = {}
+
+    start = time.perf_counter()
+    import pandas  # noqa: F401  (내역/다운로드 화면에서 사용)
+    timings['import pandas'] = time.perf_counter() - start
+
+    # 클라이언트 생성 (supabase import + 연결 풀 준비)
+    start = time.perf_counter()
+    get_supabase_client()
+    timings['client'] = time.perf_counter() - start
+
+    # 장바구니 outbox 열기 (이전 실행에서 못 보낸 담기/삭제가 있으면 바로 전송 시작)
+    start = time.perf_counter()
+    get_cart_outbox_status()
+    timings['cart outbox'] = time.perf_counter() - start
+
+    # 관리자 전체내역 첫 페이지 캐시 + 첫 조회로 keep-alive 연결 열기
+    start = time.perf_counter()
+    get_submission_history_page(None)
+    timings['first history page'] = time.perf_counter() - start
+
+    # 품목 카탈로그 (이전에 신청한 품목 찾기, 저장소를 한 번 훑음)
+    start = time.perf_counter()
+    load_item_catalog()
+    timings['item catalog'] = time.perf_counter() - start
+
+    return timings
+
+@st.cache_resource(show_spinner=False)  # 프로세스당 1번만 실행
+def start_background_warm_up():
+    """warm_up()을 백그라운드 스레드에서 1번 실행
+
+    스크립트 컨텍스트 없이 실행되므로 조회 실패 시 st.error는 화면에 나오지 않음.
+    """
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread